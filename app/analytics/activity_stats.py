@@ -0,0 +1,167 @@
+"""
+Vectorized activity analytics.
+
+Activities are fetched as two columns (epoch seconds, activity type ID) and
+every statistic is computed with NumPy array operations, never by looping
+over rows in Python.
+"""
+
+from datetime import datetime, timezone
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.cache.local import LocalCache
+from app.models.activity_log import ActivityLog
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
+
+# Per-pack results keyed by the bus key that invalidates them; each value maps
+# the request's parameters to its result
+_results = LocalCache(max_entries=1000)
+
+
+def fetch_columns(
+    db: Session, pack_id: int, start: datetime, end: datetime
+) -> tuple[np.ndarray, np.ndarray]:
+    """A pack's activities in [start, end) as (epoch seconds, type ID) arrays."""
+    if db.get_bind().dialect.name == "postgresql":
+        epoch = cast(func.extract("epoch", ActivityLog.logged_at), Integer)
+    else:
+        epoch = cast(func.strftime("%s", ActivityLog.logged_at), Integer)
+
+    # Executed on the connection rather than the session, which would wrap
+    # the cursor in ORM result handling
+    result = db.connection().execute(
+        select(epoch, ActivityLog.activity_type_id).where(
+            ActivityLog.pack_id == pack_id,
+            ActivityLog.logged_at >= start,
+            ActivityLog.logged_at < end,
+        )
+    )
+    try:
+        # Both columns are plain integers, so the DBAPI cursor's tuples go
+        # straight into one flat array without a Row object per activity
+        flat = np.fromiter(chain.from_iterable(result.cursor), dtype=np.int64)
+    finally:
+        result.close()
+
+    columns = flat.reshape(-1, 2)
+    return columns[:, 0], columns[:, 1]
+
+
+def hour_weekday_heatmap(timestamps: np.ndarray, tz_offset_minutes: int = 0):
+    """7x24 counts; rows are weekdays starting Monday, columns hours."""
+    local = timestamps + tz_offset_minutes * 60
+    # 1970-01-01 was a Thursday, weekday 3 with Monday as 0
+    weekday = (local // SECONDS_PER_DAY + 3) % 7
+    hour = (local // SECONDS_PER_HOUR) % 24
+    return np.bincount(weekday * 24 + hour, minlength=7 * 24).reshape(7, 24)
+
+
+def interval_stats(timestamps: np.ndarray) -> dict:
+    """
+    Statistics of the gaps between consecutive activities, in hours.
+
+    Regularity is 1 - coefficient of variation of the gaps, clipped to [0, 1]:
+    1 means perfectly even spacing, 0 means the spacing is all over the place.
+    """
+    if timestamps.size < 2:
+        return {"mean_hours": None, "p90_hours": None, "regularity": None}
+    gaps = np.diff(np.sort(timestamps)) / SECONDS_PER_HOUR
+    mean = gaps.mean()
+    regularity = 1.0 - gaps.std() / mean if mean > 0 else 0.0
+    return {
+        "mean_hours": round(float(mean), 2),
+        "p90_hours": round(float(np.percentile(gaps, 90)), 2),
+        "regularity": round(float(np.clip(regularity, 0.0, 1.0)), 3),
+    }
+
+
+def daily_counts(timestamps: np.ndarray, start: datetime, days: int) -> np.ndarray:
+    day = (timestamps - int(start.replace(tzinfo=timezone.utc).timestamp())) // (
+        SECONDS_PER_DAY
+    )
+    return np.bincount(day[(day >= 0) & (day < days)], minlength=days)
+
+
+def moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` values; shorter at the start of the series."""
+    if values.size == 0:
+        return values.astype(float)
+    cumulative = np.cumsum(values, dtype=float)
+    shifted = np.concatenate([np.zeros(window), cumulative[:-window]])[: values.size]
+    counts = np.minimum(np.arange(1, values.size + 1), window)
+    return (cumulative - shifted) / counts
+
+
+def compute_analytics(
+    timestamps: np.ndarray,
+    type_ids: np.ndarray,
+    start: datetime,
+    end: datetime,
+    window_days: int,
+    tz_offset_minutes: int = 0,
+) -> dict:
+    days = max(1, int((end - start).total_seconds() // SECONDS_PER_DAY))
+
+    order = np.argsort(type_ids, kind="stable")
+    sorted_types = type_ids[order]
+    unique_types, first_index = np.unique(sorted_types, return_index=True)
+    per_type = np.split(timestamps[order], first_index[1:])
+
+    activity_types = []
+    for activity_type_id, type_timestamps in zip(unique_types, per_type):
+        counts = daily_counts(type_timestamps, start, days)
+        activity_types.append(
+            {
+                "activity_type_id": int(activity_type_id),
+                "count": int(type_timestamps.size),
+                "intervals": interval_stats(type_timestamps),
+                "daily_counts": counts.tolist(),
+                "moving_average": np.round(
+                    moving_average(counts, window_days), 3
+                ).tolist(),
+            }
+        )
+
+    return {
+        "start": start,
+        "end": end,
+        "total": int(timestamps.size),
+        "heatmap": hour_weekday_heatmap(timestamps, tz_offset_minutes).tolist(),
+        "activity_types": activity_types,
+    }
+
+
+def pack_analytics(
+    db: Session,
+    pack_id: int,
+    start: datetime,
+    end: datetime,
+    window_days: int,
+    tz_offset_minutes: int = 0,
+) -> dict:
+    """
+    Analytics for a pack, cached per (pack, parameters) until the pack's
+    activities change.
+    """
+    cache_key = f"pack:{pack_id}:activities"
+    params = (start, end, window_days, tz_offset_minutes)
+    cached = _results.get(cache_key)
+    if cached is not None and params in cached:
+        return cached[params]
+
+    timestamps, type_ids = fetch_columns(db, pack_id, start, end)
+    result = compute_analytics(
+        timestamps, type_ids, start, end, window_days, tz_offset_minutes
+    )
+
+    if cached is None or len(cached) >= 32:
+        cached = {}
+        _results.set(cache_key, cached)
+    cached[params] = result
+    return result
@@ -0,0 +1,19 @@
+"""
+Measure bcrypt on this machine and suggest a cost for BCRYPT_ROUNDS.
+
+Usage: python -m app.auth [budget_ms]
+"""
+
+import sys
+
+from app.auth.password import calibrate
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 250.0
+    rounds = calibrate(budget_ms)
+    print(f"BCRYPT_ROUNDS={rounds}  # highest cost within {budget_ms:g} ms here")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,36 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 
 from app.auth.jwt import decode_token
-from app.db import get_db
+from app.auth.memberships import decode_memberships
+from app.config import settings
+from app.db import get_db, open_read_session
 from app.models.user import User
+from app.sharding import shards
 
 security = HTTPBearer()
 
+# Scope key holding the user a batch request authenticated, see routers.batch
+BATCH_USER_SCOPE_KEY = "neatdog.batch_user"
+
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db),
 ) -> User:
     """Dependency to get the current authenticated user from JWT token."""
+    # Sub-requests of a batch reuse the batch's user rather than load it again
+    batch_user = request.scope.get(BATCH_USER_SCOPE_KEY)
+    if batch_user is not None:
+        user = db.merge(batch_user, load=False)
+        user.pack_roles = batch_user.pack_roles
+        db.info["user_id"] = user.id
+        return user
+
     token = credentials.credentials
 
     try:
@@ -42,4 +59,66 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Trust the token's pack roles only if memberships haven't changed since
+    user.pack_roles = None
+    if token_data.pm is not None and token_data.mv == user.membership_version:
+        try:
+            user.pack_roles = decode_memberships(token_data.pm)
+        except ValueError:
+            pass
+
+    # Lets the session record this user's writes for read-your-writes routing
+    db.info["user_id"] = user.id
+
     return user
+
+
+def get_read_db(current_user: User = Depends(get_current_user)):
+    """
+    Dependency for read-only routes: a session on the read replica, or on the
+    primary if the current user has written recently.
+    """
+    db = open_read_session(current_user.last_write_at)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_db_for_pack(
+    pack_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Dependency for pack-scoped routes: a session on the shard holding the
+    pack. On the primary this is the request's existing session.
+    """
+    if shards.shard_for(pack_id) == 0:
+        yield db
+        return
+    shard_db = shards.session_for_pack(pack_id)
+    shard_db.info["user_id"] = current_user.id
+    try:
+        yield shard_db
+    finally:
+        shard_db.close()
+
+
+def get_read_db_for_pack(pack_id: int, current_user: User = Depends(get_current_user)):
+    """Read-only counterpart of get_db_for_pack, see get_read_db."""
+    db = shards.open_read_session(pack_id, current_user.last_write_at)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    """Dependency for operational endpoints, gated by the X-Admin-Token header."""
+    if settings.admin_token is None or x_admin_token is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    if not secrets.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token"
+        )
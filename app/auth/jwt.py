@@ -1,20 +1,189 @@
+import base64
+import hashlib
+import hmac
+import json
 import time
 
-from jose import JWTError, jwt
-
-from app.config import settings
+from app.auth.memberships import encode_memberships
+from app.config import Settings, settings
 from app.schemas.user import TokenPayload
 
+# Upper bound on distinct header segments remembered by a verifier. Legitimate
+# traffic only ever produces one header per kid, so this never fills up unless
+# someone is sending garbage.
+_HEADER_CACHE_SIZE = 64
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _json_dumps(data: dict) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+class TokenVerifier:
+    """
+    HS256 signer and verifier with precomputed HMAC state.
+
+    Each key is turned into an HMAC object once; signing and verifying only
+    copy it and feed the message. The encoded header for new tokens is built
+    once, and header segments of incoming tokens are mapped to their key so
+    the header JSON is parsed only the first time it is seen.
+
+    Args:
+        secret: Key for tokens without a ``kid`` header (legacy tokens, or
+            all tokens when no rotation keys are configured)
+        keys: Optional map of kid -> secret for key rotation
+        active_kid: kid used to sign new tokens; must be present in ``keys``
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        keys: dict[str, str] | None = None,
+        active_kid: str | None = None,
+    ):
+        self._default_key = hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256)
+        self._keys = {
+            kid: hmac.new(key.encode("utf-8"), digestmod=hashlib.sha256)
+            for kid, key in (keys or {}).items()
+        }
+
+        header = {"alg": "HS256", "typ": "JWT"}
+        if active_kid is not None:
+            if active_kid not in self._keys:
+                raise ValueError(f"Active JWT key id '{active_kid}' is not configured")
+            header["kid"] = active_kid
+            self._signing_key = self._keys[active_kid]
+        else:
+            self._signing_key = self._default_key
+        self._header_segment = _b64encode(_json_dumps(header))
+
+        self._header_keys: dict[str, hmac.HMAC] = {}
+
+    @classmethod
+    def from_settings(cls, config: Settings) -> "TokenVerifier":
+        return cls(
+            config.jwt_secret_key,
+            keys=config.jwt_keys,
+            active_kid=config.jwt_active_kid,
+        )
+
+    def encode(self, payload: dict) -> str:
+        """Sign a payload and return the compact JWT."""
+        signing_input = f"{self._header_segment}.{_b64encode(_json_dumps(payload))}"
+        mac = self._signing_key.copy()
+        mac.update(signing_input.encode("ascii"))
+        return f"{signing_input}.{_b64encode(mac.digest())}"
+
+    def decode(self, token: str) -> TokenPayload:
+        """
+        Verify a token's signature and claims.
+
+        Raises:
+            ValueError: If the token is malformed, forged, expired or is
+                missing one of the required claims
+        """
+        try:
+            signing_input, _, signature = token.rpartition(".")
+            header_segment, _, payload_segment = signing_input.partition(".")
+            if not header_segment or not payload_segment or "." in payload_segment:
+                raise ValueError("Not enough segments")
+
+            key = self._header_keys.get(header_segment)
+            if key is None:
+                key = self._resolve_key(header_segment)
+
+            mac = key.copy()
+            mac.update(signing_input.encode("ascii"))
+            if not hmac.compare_digest(mac.digest(), _b64decode(signature)):
+                raise ValueError("Signature verification failed")
+
+            claims = json.loads(_b64decode(payload_segment))
+        except ValueError as e:
+            raise ValueError(f"Invalid token: {e}")
+
+        # Validate claims by hand; this runs on every authenticated request
+        if not isinstance(claims, dict):
+            raise ValueError("Invalid token: payload is not an object")
+        sub = claims.get("sub")
+        exp = claims.get("exp")
+        token_type = claims.get("type")
+        if not isinstance(sub, str) or not isinstance(token_type, str):
+            raise ValueError("Invalid token: missing 'sub' or 'type' claim")
+        if not isinstance(exp, int) or isinstance(exp, bool):
+            raise ValueError("Invalid token: missing 'exp' claim")
+        if exp < time.time():
+            raise ValueError("Invalid token: Signature has expired")
+
+        # Optional pack roles; ignored unless both claims are well-formed
+        memberships = claims.get("pm")
+        membership_version = claims.get("mv")
+        if not isinstance(memberships, str) or type(membership_version) is not int:
+            memberships = membership_version = None
+
+        return TokenPayload.model_construct(
+            sub=sub,
+            exp=exp,
+            type=token_type,
+            pm=memberships,
+            mv=membership_version,
+        )
+
+    def _resolve_key(self, header_segment: str) -> hmac.HMAC:
+        header = json.loads(_b64decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != "HS256":
+            raise ValueError("The specified alg value is not allowed")
+
+        kid = header.get("kid")
+        if kid is None:
+            key = self._default_key
+        elif not isinstance(kid, str):
+            raise ValueError("The kid header is not a string")
+        elif kid in self._keys:
+            key = self._keys[kid]
+        else:
+            raise ValueError(f"Unknown key id '{kid}'")
+
+        if len(self._header_keys) < _HEADER_CACHE_SIZE:
+            self._header_keys[header_segment] = key
+        return key
+
+
+_verifier = TokenVerifier.from_settings(settings)
+
+
+def create_access_token(
+    user_id: int,
+    memberships: dict[int, str] | None = None,
+    membership_version: int | None = None,
+) -> str:
+    """
+    Create a JWT access token for the given user ID.
 
-def create_access_token(user_id: int) -> str:
-    """Create a JWT access token for the given user ID."""
+    With ``memberships`` (pack ID -> role) and the user's membership version,
+    the token carries the user's pack roles, unless there are more than
+    settings.token_max_packs of them.
+    """
     expire = int(time.time()) + (settings.access_token_expire_minutes * 60)
     payload = {
         "sub": str(user_id),
         "exp": expire,
         "type": "access",
     }
-    return jwt.encode(payload, settings.jwt_secret_key, algorithm="HS256")
+    if (
+        memberships is not None
+        and membership_version is not None
+        and 0 < len(memberships) <= settings.token_max_packs
+    ):
+        payload["pm"] = encode_memberships(memberships)
+        payload["mv"] = membership_version
+    return _verifier.encode(payload)
 
 
 def create_refresh_token(user_id: int) -> str:
@@ -25,13 +194,9 @@ def create_refresh_token(user_id: int) -> str:
         "exp": expire,
         "type": "refresh",
     }
-    return jwt.encode(payload, settings.jwt_secret_key, algorithm="HS256")
+    return _verifier.encode(payload)
 
 
 def decode_token(token: str) -> TokenPayload:
     """Decode and validate a JWT token."""
-    try:
-        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=["HS256"])
-        return TokenPayload(**payload)
-    except JWTError as e:
-        raise ValueError(f"Invalid token: {e}")
+    return _verifier.decode(token)
@@ -0,0 +1,112 @@
+"""
+Pack roles carried in access tokens.
+
+An access token can list the user's packs and their role in each, so
+verify_pack_member answers without a query. The list is kept small: pack IDs
+are sorted and stored as varint-encoded deltas, and roles take two bits
+each. The token also records the user's membership version; every change to
+the user's memberships bumps ``User.membership_version``, and a token whose
+version is behind is treated as carrying no roles at all.
+"""
+
+import base64
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.pack_member import PackMember
+from app.models.user import User
+from app.sharding import shards
+
+# Two-bit role codes
+ROLES = ("member", "admin", "owner")
+_ROLE_CODES = {role: code for code, role in enumerate(ROLES)}
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def encode_memberships(roles: dict[int, str]) -> str:
+    """
+    Encode pack ID -> role as ``<pack ID deltas>.<roles>``, both base64url.
+
+    Deltas between sorted pack IDs are unsigned LEB128 varints; roles are
+    packed four to a byte in pack ID order.
+    """
+    ids = bytearray()
+    codes = bytearray((len(roles) + 3) // 4)
+    previous = 0
+    for i, pack_id in enumerate(sorted(roles)):
+        delta = pack_id - previous
+        previous = pack_id
+        while delta >= 0x80:
+            ids.append(delta & 0x7F | 0x80)
+            delta >>= 7
+        ids.append(delta)
+        codes[i // 4] |= _ROLE_CODES[roles[pack_id]] << (i % 4 * 2)
+    return f"{_b64encode(bytes(ids))}.{_b64encode(bytes(codes))}"
+
+
+def decode_memberships(encoded: str) -> dict[int, str]:
+    """
+    Inverse of encode_memberships.
+
+    Raises:
+        ValueError: If the encoding is malformed
+    """
+    ids_segment, _, codes_segment = encoded.partition(".")
+    ids, codes = _b64decode(ids_segment), _b64decode(codes_segment)
+
+    pack_ids = []
+    value = shift = 0
+    for byte in ids:
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            pack_ids.append((pack_ids[-1] if pack_ids else 0) + value)
+            value = shift = 0
+    if shift or len(codes) != (len(pack_ids) + 3) // 4:
+        raise ValueError("Malformed pack memberships")
+
+    roles = {}
+    for i, pack_id in enumerate(pack_ids):
+        code = codes[i // 4] >> (i % 4 * 2) & 0b11
+        if code >= len(ROLES):
+            raise ValueError("Malformed pack memberships")
+        roles[pack_id] = ROLES[code]
+    return roles
+
+
+async def load_memberships(user_id: int) -> dict[int, str]:
+    """The user's role in each of their packs, read from every shard's primary."""
+    pages = await shards.fan_out(
+        lambda db: (
+            db.query(PackMember.pack_id, PackMember.role)
+            .filter(PackMember.user_id == user_id)
+            .all()
+        ),
+        primary=True,
+    )
+    return {pack_id: role for page in pages for pack_id, role in page}
+
+
+def bump_membership_version(db: Session, *user_ids: int) -> None:
+    """
+    Invalidate the pack roles in these users' tokens. Call it on the primary
+    after the membership change has committed, so no token can pair the old
+    memberships with the new version.
+    """
+    if not user_ids:
+        return
+    db.execute(
+        update(User)
+        .where(User.id.in_(user_ids))
+        .values(membership_version=User.membership_version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
@@ -1,11 +1,65 @@
+"""
+bcrypt password hashing with a tunable cost.
+
+The cost (log2 rounds) is bcrypt_rounds, or with bcrypt_calibrate_ms set,
+the highest cost hashing within that many milliseconds on this machine
+(see calibrate(), run at startup). Hashes made with a lower cost are
+upgraded on the user's next login: see needs_rehash().
+"""
+
+import threading
+import time
+
 import bcrypt
 
+from app.config import settings
+
+# bcrypt accepts costs 4..31; below 10 is too weak for passwords
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+
+# Upper bounds (ms) of the hash-time histogram buckets; the last is open
+TIME_BUCKETS_MS = (25, 50, 100, 200, 400, 800, 1600)
+
+_rounds: int | None = None
+_timings: dict[tuple[str, int], dict] = {}
+_timings_lock = threading.Lock()
+
+
+def current_rounds() -> int:
+    """The cost new hashes are made with."""
+    return _rounds if _rounds is not None else settings.bcrypt_rounds
+
+
+def hash_cost(hashed: str) -> int:
+    """The cost a hash was made with: ``$2b$<cost>$<salt and hash>``."""
+    return int(hashed.split("$")[2])
+
+
+def _record(operation: str, rounds: int, elapsed_ms: float) -> None:
+    with _timings_lock:
+        timing = _timings.setdefault(
+            (operation, rounds),
+            {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "buckets": [0] * 8},
+        )
+        timing["count"] += 1
+        timing["total_ms"] += elapsed_ms
+        timing["max_ms"] = max(timing["max_ms"], elapsed_ms)
+        bucket = next(
+            (i for i, bound in enumerate(TIME_BUCKETS_MS) if elapsed_ms <= bound),
+            len(TIME_BUCKETS_MS),
+        )
+        timing["buckets"][bucket] += 1
+
 
 def hash_password(password: str) -> str:
     """Hash a plain text password using bcrypt."""
+    rounds = current_rounds()
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    started = time.perf_counter()
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed = bcrypt.hashpw(password_bytes, salt)
+    _record("hash", rounds, (time.perf_counter() - started) * 1000)
     return hashed.decode("utf-8")
 
 
@@ -13,4 +67,67 @@ def verify_password(plain: str, hashed: str) -> bool:
     """Verify a plain text password against a hashed password."""
     plain_bytes = plain.encode("utf-8")
     hashed_bytes = hashed.encode("utf-8")
-    return bcrypt.checkpw(plain_bytes, hashed_bytes)
+    started = time.perf_counter()
+    valid = bcrypt.checkpw(plain_bytes, hashed_bytes)
+    _record("verify", hash_cost(hashed), (time.perf_counter() - started) * 1000)
+    return valid
+
+
+def needs_rehash(hashed: str) -> bool:
+    """
+    Whether a hash is weaker than the current cost. Hashes are only ever
+    upgraded, so workers calibrated slightly differently don't flip a user's
+    hash back and forth.
+    """
+    return hash_cost(hashed) < current_rounds()
+
+
+def _time_hash(rounds: int, samples: int = 3) -> float:
+    """Fastest of a few hashes at a cost, in milliseconds."""
+    fastest = float("inf")
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration password", bcrypt.gensalt(rounds=rounds))
+        fastest = min(fastest, (time.perf_counter() - started) * 1000)
+    return fastest
+
+
+def calibrate(budget_ms: float) -> int:
+    """
+    Pick the highest cost (at least MIN_ROUNDS) whose hash time on this
+    machine fits in budget_ms, and use it for new hashes. Each extra round
+    doubles the time, so costs are only measured until one is over budget.
+    """
+    global _rounds
+    rounds = MIN_ROUNDS
+    elapsed = _time_hash(rounds)
+    while rounds < MAX_ROUNDS and elapsed * 2 <= budget_ms:
+        candidate = _time_hash(rounds + 1, samples=2)
+        if candidate > budget_ms:
+            break
+        rounds, elapsed = rounds + 1, candidate
+    _rounds = rounds
+    return rounds
+
+
+def metrics() -> dict:
+    """Hash and verify time distributions per operation and cost."""
+    labels = [f"<={bound}ms" for bound in TIME_BUCKETS_MS] + [
+        f">{TIME_BUCKETS_MS[-1]}ms"
+    ]
+    with _timings_lock:
+        return {
+            "rounds": current_rounds(),
+            "calibrated": _rounds is not None,
+            "timings": [
+                {
+                    "operation": operation,
+                    "rounds": rounds,
+                    "count": timing["count"],
+                    "mean_ms": round(timing["total_ms"] / timing["count"], 2),
+                    "max_ms": round(timing["max_ms"], 2),
+                    "histogram": dict(zip(labels, timing["buckets"])),
+                }
+                for (operation, rounds), timing in sorted(_timings.items())
+            ],
+        }
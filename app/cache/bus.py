@@ -0,0 +1,314 @@
+"""
+Cross-worker cache invalidation bus.
+
+Write paths publish keys such as ``pack:{id}:members`` after they commit. Each
+worker's bus applies the invalidation to its own subscribers immediately and
+broadcasts it through a transport so the other workers drop the same keys:
+
+- ``memory``: in-process hub, for tests and single-worker deployments
+- ``unix``: datagram sockets in a shared directory, for several workers on
+  one host
+- ``postgres``: LISTEN/NOTIFY on the primary database, for several hosts
+
+Staleness is bounded: caches built on the bus (see ``app.cache.local``) never
+serve entries older than ``cache_max_staleness_seconds`` and serve nothing
+while the transport is disconnected.
+"""
+
+import json
+import logging
+import os
+import select
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[[list[str]], None]
+
+
+class Transport(ABC):
+    """Delivers encoded messages between the buses of different workers."""
+
+    @abstractmethod
+    def start(self, deliver: Callable[[str], None]) -> None: ...
+
+    @abstractmethod
+    def stop(self) -> None: ...
+
+    @abstractmethod
+    def send(self, message: str) -> None: ...
+
+    @property
+    def connected(self) -> bool:
+        return True
+
+
+class InMemoryHub:
+    """Connects the InMemoryTransports of several buses in one process."""
+
+    def __init__(self):
+        self.transports: list["InMemoryTransport"] = []
+
+
+class InMemoryTransport(Transport):
+    def __init__(self, hub: InMemoryHub | None = None):
+        self.hub = hub or InMemoryHub()
+        self._deliver: Callable[[str], None] | None = None
+
+    def start(self, deliver):
+        self._deliver = deliver
+        self.hub.transports.append(self)
+
+    def stop(self):
+        if self in self.hub.transports:
+            self.hub.transports.remove(self)
+
+    def send(self, message):
+        for transport in list(self.hub.transports):
+            if transport is not self and transport._deliver is not None:
+                transport._deliver(message)
+
+
+class UnixSocketTransport(Transport):
+    """
+    One datagram socket per worker in a shared directory; sending fans the
+    message out to every other socket found there.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.path = self.directory / f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock"
+        self._socket: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+
+    def start(self, deliver):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(str(self.path))
+        self._thread = threading.Thread(
+            target=self._listen, args=(deliver,), name="cache-bus-unix", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+        self.path.unlink(missing_ok=True)
+
+    def send(self, message):
+        data = message.encode("utf-8")
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            for peer in self.directory.glob("*.sock"):
+                if peer == self.path:
+                    continue
+                try:
+                    sender.sendto(data, str(peer))
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # Left behind by a worker that died without cleaning up
+                    peer.unlink(missing_ok=True)
+                except OSError as e:
+                    logger.warning("Cache bus could not reach %s: %s", peer, e)
+        finally:
+            sender.close()
+
+    @property
+    def connected(self):
+        return self._socket is not None
+
+    def _listen(self, deliver):
+        while self._socket is not None:
+            try:
+                data = self._socket.recv(65536)
+            except OSError:
+                break
+            deliver(data.decode("utf-8"))
+
+
+class PostgresNotifyTransport(Transport):
+    """LISTEN/NOTIFY on a dedicated connection, reconnecting when it drops."""
+
+    def __init__(self, dsn: str, channel: str, reconnect_delay: float = 1.0):
+        self.dsn = dsn
+        self.channel = channel
+        self.reconnect_delay = reconnect_delay
+        self._running = False
+        self._connected = False
+        self._send_lock = threading.Lock()
+        self._send_connection = None
+        self._thread: threading.Thread | None = None
+
+    def start(self, deliver):
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._listen, args=(deliver,), name="cache-bus-pg", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        with self._send_lock:
+            if self._send_connection is not None:
+                self._send_connection.close()
+                self._send_connection = None
+
+    def send(self, message):
+        import psycopg2
+
+        with self._send_lock:
+            try:
+                if self._send_connection is None or self._send_connection.closed:
+                    self._send_connection = psycopg2.connect(self.dsn)
+                    self._send_connection.autocommit = True
+                with self._send_connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, message))
+            except psycopg2.Error as e:
+                logger.warning("Cache bus NOTIFY failed: %s", e)
+                self._send_connection = None
+
+    @property
+    def connected(self):
+        return self._connected
+
+    def _listen(self, deliver):
+        import psycopg2
+
+        while self._running:
+            connection = None
+            try:
+                connection = psycopg2.connect(self.dsn)
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                self._connected = True
+                while self._running:
+                    if select.select([connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        deliver(connection.notifies.pop(0).payload)
+            except psycopg2.Error as e:
+                logger.warning("Cache bus listener disconnected: %s", e)
+            finally:
+                self._connected = False
+                if connection is not None:
+                    connection.close()
+            if self._running:
+                time.sleep(self.reconnect_delay)
+
+
+class InvalidationBus:
+    """
+    Fan-out of invalidated cache keys to local subscribers and other workers.
+
+    Subscribers are called with the list of keys, from the publishing thread
+    for local writes and from the transport thread for remote ones.
+    """
+
+    def __init__(self, transport: Transport, lag_samples: int = 1000):
+        self.transport = transport
+        self.origin = uuid.uuid4().hex
+        self._subscribers: list[Subscriber] = []
+        self._started = False
+        self._lags: deque[float] = deque(maxlen=lag_samples)
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if not self._started:
+            self.transport.start(self._receive)
+            self._started = True
+
+    def stop(self) -> None:
+        if self._started:
+            self.transport.stop()
+            self._started = False
+
+    @property
+    def healthy(self) -> bool:
+        """False while remote invalidations may be getting lost."""
+        return self._started and self.transport.connected
+
+    def subscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.append(subscriber)
+
+    def publish(self, *keys: str) -> None:
+        """Invalidate keys in this worker and broadcast them to the others."""
+        key_list = list(keys)
+        self._notify(key_list)
+        self.published += 1
+        if self._started:
+            message = {"keys": key_list, "origin": self.origin, "sent_at": time.time()}
+            self.transport.send(json.dumps(message))
+
+    def metrics(self) -> dict:
+        lags = sorted(self._lags)
+
+        def percentile(p: float) -> float | None:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(p * len(lags)))] * 1000, 3)
+
+        return {
+            "transport": type(self.transport).__name__,
+            "healthy": self.healthy,
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "lag_ms": {
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": percentile(1.0),
+                "samples": len(lags),
+            },
+        }
+
+    def _receive(self, raw: str) -> None:
+        try:
+            message = json.loads(raw)
+            keys = message["keys"]
+            origin = message["origin"]
+            sent_at = message["sent_at"]
+        except (ValueError, KeyError, TypeError):
+            self.dropped += 1
+            return
+        if origin == self.origin:
+            return
+        self.received += 1
+        self._lags.append(max(0.0, time.time() - sent_at))
+        self._notify(keys)
+
+    def _notify(self, keys: list[str]) -> None:
+        for subscriber in self._subscribers:
+            try:
+                subscriber(keys)
+            except Exception:
+                logger.exception("Cache invalidation subscriber failed")
+
+
+def create_transport() -> Transport:
+    if settings.cache_bus_transport == "unix":
+        return UnixSocketTransport(settings.cache_bus_socket_dir)
+    if settings.cache_bus_transport == "postgres":
+        # libpq wants a plain postgresql:// URL without the SQLAlchemy driver
+        dsn = make_url(settings.database_url).set(drivername="postgresql")
+        return PostgresNotifyTransport(
+            dsn.render_as_string(hide_password=False), settings.cache_bus_channel
+        )
+    return InMemoryTransport()
+
+
+bus = InvalidationBus(create_transport())
@@ -0,0 +1,123 @@
+"""
+Single-flight coalescing for idempotent reads.
+
+Concurrent identical requests (same route, parameters and scope) share one
+computation: the first starts it in a worker thread and the others await
+the same result, typically the serialized response body. An optional micro
+cache keeps results for a few hundred milliseconds more, to absorb the
+refresh storm that follows a write.
+
+Results are scoped by an invalidation bus key such as ``pack:3:activities``.
+Publishing that key moves the scope to a new generation, so requests that
+arrive after a write never join a computation (or cached result) started
+before it. Callers authorize the request first: everyone passing the same
+key is served the same bytes.
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.cache.bus import InvalidationBus, bus
+from app.config import settings
+
+
+class Coalescer:
+    def __init__(
+        self,
+        invalidation_bus: InvalidationBus = bus,
+        cache_seconds: float | None = None,
+        max_entries: int = 10_000,
+    ):
+        self.bus = invalidation_bus
+        self.cache_seconds = (
+            settings.coalesce_cache_seconds if cache_seconds is None else cache_seconds
+        )
+        self.max_entries = max_entries
+        self._flights: dict[Hashable, asyncio.Future] = {}
+        self._recent: dict[Hashable, tuple[float, Any]] = {}
+        # Generation per invalidated bus key; the epoch moves when the map is
+        # reset so it stays bounded
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, int]] = {}
+        self.bus.subscribe(self.invalidate)
+
+    async def run(
+        self, route: str, scope: str, params: Hashable, compute: Callable[[], Any]
+    ) -> Any:
+        """
+        ``compute()`` in a worker thread, or the result of an identical call
+        already in flight (or finished within cache_seconds).
+        """
+        key = (route, scope, self._epoch, self._generations.get(scope, 0), params)
+        stats = self._stats.setdefault(
+            route, {"requests": 0, "computed": 0, "joined": 0, "cached": 0}
+        )
+        stats["requests"] += 1
+
+        if self.cache_seconds > 0 and self.bus.healthy:
+            cached = self._recent.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                stats["cached"] += 1
+                return cached[1]
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            stats["joined"] += 1
+        else:
+            stats["computed"] += 1
+            flight = asyncio.ensure_future(run_in_threadpool(compute))
+            self._flights[key] = flight
+            flight.add_done_callback(lambda done: self._land(key, done))
+
+        # Shielded: a caller going away doesn't cancel the others' result
+        return await asyncio.shield(flight)
+
+    def _land(self, key: Hashable, flight: asyncio.Future) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if flight.cancelled() or flight.exception() is not None:
+            return
+        if self.cache_seconds > 0:
+            if len(self._recent) >= self.max_entries:
+                now = time.monotonic()
+                self._recent = {
+                    k: entry for k, entry in self._recent.items() if entry[0] > now
+                }
+                if len(self._recent) >= self.max_entries:
+                    self._recent.pop(next(iter(self._recent)))
+            self._recent[key] = (time.monotonic() + self.cache_seconds, flight.result())
+
+    def invalidate(self, keys: list[str]) -> None:
+        with self._lock:
+            if len(self._generations) >= self.max_entries:
+                self._generations = {}
+                self._epoch += 1
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def metrics(self) -> dict:
+        """Per route: requests, how they were served and the collapse ratio."""
+        routes = {}
+        for route, stats in self._stats.items():
+            requests = stats["requests"]
+            routes[route] = {
+                **stats,
+                "collapse_ratio": round(1 - stats["computed"] / requests, 4)
+                if requests
+                else 0.0,
+            }
+        return {
+            "in_flight": len(self._flights),
+            "cached_results": len(self._recent),
+            "routes": routes,
+        }
+
+
+coalescer = Coalescer()
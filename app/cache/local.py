@@ -0,0 +1,66 @@
+import threading
+import time
+from collections.abc import Hashable
+from typing import Any
+
+from app.cache.bus import InvalidationBus, bus
+from app.config import settings
+
+_MISSING = object()
+
+
+class LocalCache:
+    """
+    Per-worker cache whose entries are dropped by invalidation bus keys.
+
+    Entries are stored under the bus key that invalidates them, e.g.
+    ``cache.set("pack:3:members", members)``. Staleness is bounded by
+    ``max_staleness`` even if a remote invalidation is lost, and nothing is
+    served while the bus transport is unhealthy.
+    """
+
+    def __init__(
+        self,
+        invalidation_bus: InvalidationBus = bus,
+        max_staleness: float | None = None,
+        max_entries: int = 10_000,
+    ):
+        self.bus = invalidation_bus
+        self.max_staleness = (
+            settings.cache_max_staleness_seconds
+            if max_staleness is None
+            else max_staleness
+        )
+        self.max_entries = max_entries
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.bus.subscribe(self.invalidate)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if not self.bus.healthy:
+            return default
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.max_staleness:
+            with self._lock:
+                self._entries.pop(key, None)
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Oldest insertion first; dicts keep insertion order
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic(), value)
+
+    def invalidate(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
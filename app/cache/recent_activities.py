@@ -0,0 +1,169 @@
+"""
+Per-pack ring buffer of the latest serialized activities.
+
+Most activity history reads ask for the first page without filters. Each
+pack's latest ``per_pack`` activities are kept as serialized JSON, newest
+first, so such a page is a join of cached bytes with no query.
+
+A pack's ring is filled on its first read and kept exact: ``add`` inserts
+an activity logged by this worker at its place in (logged_at, id) order,
+and drops the oldest one when the ring is full. A backdated activity older
+than everything in a full ring is outside the window and isn't added. When
+another worker logs an activity its bus key drops the ring here, and the
+next read fills it again. Cold packs are evicted least recently used first
+to stay under ``max_bytes``.
+"""
+
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from app.cache.bus import InvalidationBus, bus
+from app.config import settings
+
+# Rough per-entry bookkeeping cost on top of the serialized bytes
+ENTRY_OVERHEAD = 120
+
+Entry = tuple[datetime, int, bytes]
+
+
+class _Ring:
+    def __init__(self, entries: list[Entry]):
+        # Oldest first, so bisect can place new activities
+        self.entries = sorted(entries)
+        self.size = sum(len(e[2]) + ENTRY_OVERHEAD for e in self.entries)
+        self.loaded_at = time.monotonic()
+        # Invalidations that are this worker's own add() being published
+        self.own_invalidations = 0
+
+
+class RecentActivities:
+    def __init__(
+        self,
+        per_pack: int,
+        max_bytes: int,
+        invalidation_bus: InvalidationBus = bus,
+        max_staleness: float | None = None,
+    ):
+        self.per_pack = per_pack
+        self.max_bytes = max_bytes
+        self.bus = invalidation_bus
+        self.max_staleness = (
+            settings.cache_max_staleness_seconds
+            if max_staleness is None
+            else max_staleness
+        )
+        self._rings: OrderedDict[int, _Ring] = OrderedDict()
+        self._size = 0
+        # Bumped on every invalidation of a pack, so a fill that raced with
+        # a write is discarded; the epoch moves when the map is reset
+        self._generations: dict[int, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bus.subscribe(self.invalidate)
+
+    def first_page(self, pack_id: int, limit: int) -> bytes | None:
+        """The newest ``limit`` activities as a JSON array, if cached."""
+        if limit > self.per_pack or not self.bus.healthy:
+            return None
+        with self._lock:
+            ring = self._rings.get(pack_id)
+            if (
+                ring is not None
+                and time.monotonic() - ring.loaded_at > self.max_staleness
+            ):
+                self._drop(pack_id)
+                ring = None
+            if ring is None:
+                self.misses += 1
+                return None
+            self._rings.move_to_end(pack_id)
+            self.hits += 1
+            newest = ring.entries[: -limit - 1 : -1]
+        return b"[" + b",".join(entry[2] for entry in newest) + b"]"
+
+    def generation(self, pack_id: int) -> tuple[int, int]:
+        """Token to pass to fill(), taken before loading a pack's activities."""
+        return self._epoch, self._generations.get(pack_id, 0)
+
+    def fill(
+        self, pack_id: int, generation: tuple[int, int], entries: list[Entry]
+    ) -> None:
+        """Cache a pack's newest per_pack activities, unless it changed since."""
+        ring = _Ring(entries[: self.per_pack])
+        with self._lock:
+            if self.generation(pack_id) != generation:
+                return
+            self._drop(pack_id)
+            self._rings[pack_id] = ring
+            self._size += ring.size
+            self._evict()
+
+    def add(self, pack_id: int, entry: Entry) -> None:
+        """
+        Insert an activity this worker just committed. Call it before
+        publishing the pack's activities key: that publication is then
+        recognised as this add and keeps the ring.
+        """
+        with self._lock:
+            ring = self._rings.get(pack_id)
+            if ring is None:
+                return
+            ring.own_invalidations += 1
+            if len(ring.entries) >= self.per_pack:
+                if entry < ring.entries[0]:
+                    return  # backdated past the window
+                dropped = ring.entries.pop(0)
+                ring.size -= len(dropped[2]) + ENTRY_OVERHEAD
+                self._size -= len(dropped[2]) + ENTRY_OVERHEAD
+            bisect.insort(ring.entries, entry)
+            ring.size += len(entry[2]) + ENTRY_OVERHEAD
+            self._size += len(entry[2]) + ENTRY_OVERHEAD
+            self._evict()
+
+    def invalidate(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                parts = key.split(":")
+                if len(parts) != 3 or parts[0] != "pack" or parts[2] != "activities":
+                    continue
+                pack_id = int(parts[1])
+                self._generations[pack_id] = self._generations.get(pack_id, 0) + 1
+                ring = self._rings.get(pack_id)
+                if ring is not None and ring.own_invalidations > 0:
+                    ring.own_invalidations -= 1
+                else:
+                    self._drop(pack_id)
+            if len(self._generations) > 100_000:
+                self._generations = {}
+                self._epoch += 1
+
+    def _drop(self, pack_id: int) -> None:
+        ring = self._rings.pop(pack_id, None)
+        if ring is not None:
+            self._size -= ring.size
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._rings:
+            _, ring = self._rings.popitem(last=False)
+            self._size -= ring.size
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "packs": len(self._rings),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+recent_activities = RecentActivities(
+    settings.recent_activities_per_pack, settings.recent_activities_max_bytes
+)
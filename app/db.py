@@ -1,19 +1,412 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+import hashlib
+import heapq
+import logging
+import re
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from datetime import date, datetime
+
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
 
 from app.config import settings
 
-engine = create_engine(settings.database_url)
+logger = logging.getLogger(__name__)
+
+# Statements that need SQLite's write lock
+_SQLITE_WRITES = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+# Parameter values that are logged as is; anything else (emails, tokens,
+# password hashes, notes) is redacted
+_LOGGED_PARAM_TYPES = (bool, int, float, date, datetime, type(None))
+
+_LITERALS = re.compile(
+    r"'(?:[^']|'')*'|%\(\w+\)s|%s|\$\d+|(?<!:):\w+|\b\d+(?:\.\d+)?\b"
+)
+_PLACEHOLDER_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+# The ASGI scope of the request being served, for attributing slow queries
+current_request: ContextVar[dict | None] = ContextVar("current_request", default=None)
+
+
+def fingerprint(statement: str) -> str:
+    """A statement with literals and placeholders replaced, IN lists collapsed."""
+    normalized = _LITERALS.sub("?", statement)
+    normalized = _PLACEHOLDER_LISTS.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+def redact(parameters):
+    if isinstance(parameters, dict):
+        return {name: redact(value) for name, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    if isinstance(parameters, _LOGGED_PARAM_TYPES):
+        return parameters
+    return "<redacted>"
+
+
+class SlowQueryLog:
+    """
+    Statements slower than slow_query_ms, aggregated per fingerprint.
+
+    The first slow_query_explain_count occurrences of each fingerprint get
+    their plan captured on the same connection: ``EXPLAIN (ANALYZE,
+    BUFFERS)`` for SELECTs on Postgres, inside a savepoint since it runs the
+    query again, and ``EXPLAIN QUERY PLAN`` on SQLite. At most
+    slow_query_max_fingerprints are tracked; a new one evicts the one with
+    the least total time.
+    """
+
+    def __init__(self, max_fingerprints: int, explain_count: int):
+        self.max_fingerprints = max_fingerprints
+        self.explain_count = explain_count
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, connection, statement, parameters, many, elapsed_ms) -> None:
+        key = fingerprint(statement)
+        scope = current_request.get()
+        route = None
+        if scope is not None:
+            matched = scope.get("route")
+            route = f"{scope['method']} {getattr(matched, 'path', scope['path'])}"
+        params = redact(parameters[0] if many and parameters else parameters)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.max_fingerprints:
+                    coldest = min(self._entries.values(), key=lambda e: e["total_ms"])
+                    del self._entries[coldest["fingerprint"]]
+                entry = self._entries[key] = {
+                    "id": hashlib.blake2b(key.encode(), digest_size=8).hexdigest(),
+                    "fingerprint": key,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": {},
+                    "last_params": None,
+                    "plans": [],
+                }
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["routes"][route] = entry["routes"].get(route, 0) + 1
+            entry["last_params"] = params
+            explain = entry["count"] <= self.explain_count
+
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s params=%s",
+            elapsed_ms,
+            route or "no route",
+            _WHITESPACE.sub(" ", statement).strip(),
+            params,
+        )
+        if explain and not many:
+            plan = self._explain(connection, statement, parameters)
+            if plan is not None:
+                with self._lock:
+                    entry["plans"].append(
+                        {"ms": round(elapsed_ms, 3), "route": route, "plan": plan}
+                    )
+
+    def _explain(self, connection, statement, parameters) -> str | None:
+        dialect = connection.dialect.name
+        if dialect == "postgresql":
+            if not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+                return None  # EXPLAIN ANALYZE would run the write again
+            explain = f"EXPLAIN (ANALYZE, BUFFERS) {statement}"
+        elif dialect == "sqlite":
+            explain = f"EXPLAIN QUERY PLAN {statement}"
+        else:
+            return None
+
+        # A fresh DBAPI cursor, leaving the original one's results untouched
+        cursor = connection.connection.dbapi_connection.cursor()
+        try:
+            if dialect == "postgresql":
+                cursor.execute("SAVEPOINT slow_query_explain")
+            try:
+                cursor.execute(explain, parameters)
+                rows = cursor.fetchall()
+            finally:
+                if dialect == "postgresql":
+                    cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+                    cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+        except Exception as e:
+            logger.debug("Couldn't explain slow query: %s", e)
+            return None
+        finally:
+            cursor.close()
+        return "\n".join(str(row[-1]) for row in rows)
+
+    def report(self, limit: int | None = None) -> list[dict]:
+        """The slowest fingerprints by total time."""
+        with self._lock:
+            top = heapq.nlargest(
+                limit or len(self._entries) or 1,
+                self._entries.values(),
+                key=lambda e: e["total_ms"],
+            )
+            return [
+                {
+                    **entry,
+                    "total_ms": round(entry["total_ms"], 3),
+                    "max_ms": round(entry["max_ms"], 3),
+                    "mean_ms": round(entry["total_ms"] / entry["count"], 3),
+                    "routes": dict(entry["routes"]),
+                    "plans": list(entry["plans"]),
+                }
+                for entry in top
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_queries = SlowQueryLog(
+    settings.slow_query_max_fingerprints, settings.slow_query_explain_count
+)
+
+
+def watch_slow_queries(watched: Engine, threshold_ms: float) -> None:
+    """Record statements on ``watched`` that take at least threshold_ms."""
+
+    @event.listens_for(watched, "before_cursor_execute")
+    def _start_timer(connection, cursor, statement, parameters, context, many):
+        connection.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(watched, "after_cursor_execute")
+    def _stop_timer(connection, cursor, statement, parameters, context, many):
+        elapsed_ms = (
+            time.perf_counter() - connection.info["query_started"].pop()
+        ) * 1000
+        if elapsed_ms >= threshold_ms:
+            slow_queries.record(connection, statement, parameters, many, elapsed_ms)
+
+    @event.listens_for(watched, "handle_error")
+    def _drop_timer(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            connection.info["query_started"].pop()
+
+
+class RequestContextMiddleware:
+    """Makes the request's scope (and so its route) visible to the DB hooks."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_request.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_request.reset(token)
+
+
+def is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def create_db_engine(url: str, readonly: bool = False) -> Engine:
+    """
+    create_engine, with SQLite file databases set up for concurrent use.
+
+    SQLite connections use WAL journaling so readers never block the writer
+    or each other, synchronous=NORMAL (durable at checkpoints, safe against
+    corruption), memory-mapped reads, a busy timeout and enforced foreign
+    keys. Transactions start lazily: reads run without holding a
+    transaction, and the first INSERT/UPDATE/DELETE opens BEGIN IMMEDIATE
+    behind a per-engine lock, so one writer at a time holds the database
+    lock and the others queue in-process instead of polling for it. A writer
+    that waits longer than the busy timeout fails with "database is locked",
+    as it would have from SQLite. The wait blocks the calling thread like any
+    other query here, so a write made on the event loop by an async handler
+    stalls the loop while another write transaction is open: keep write
+    transactions short, and move long ones to a thread or a job.
+    ``readonly`` engines serve read sessions on the same file (query_only).
+    """
+    if not is_sqlite_file(url):
+        new_engine = create_engine(url)
+        if settings.slow_query_ms > 0:
+            watch_slow_queries(new_engine, settings.slow_query_ms)
+        return new_engine
+
+    busy_timeout = settings.sqlite_busy_timeout_ms / 1000
+    new_engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False, "timeout": busy_timeout},
+        pool_size=settings.sqlite_reader_pool_size if readonly else 5,
+    )
+    write_lock = threading.Lock()
+
+    @event.listens_for(new_engine, "connect")
+    def _configure(dbapi_connection, connection_record):
+        # Transactions are managed below rather than by the sqlite3 module
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode = {settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size = {settings.sqlite_mmap_size}")
+        cursor.execute(f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}")
+        cursor.execute("PRAGMA foreign_keys = ON")
+        if readonly:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+    if settings.slow_query_ms > 0:
+        watch_slow_queries(new_engine, settings.slow_query_ms)
+
+    if readonly:
+
+        @event.listens_for(new_engine, "begin")
+        def _begin_snapshot(connection):
+            # One consistent snapshot per read session
+            connection.exec_driver_sql("BEGIN")
+
+        return new_engine
+
+    @event.listens_for(new_engine, "before_cursor_execute")
+    def _begin_write(connection, cursor, statement, parameters, context, many):
+        if cursor.connection.in_transaction:
+            return
+        if not statement.lstrip()[:7].upper().startswith(_SQLITE_WRITES):
+            return
+        if not write_lock.acquire(timeout=busy_timeout):
+            raise OperationalError(
+                statement,
+                parameters,
+                sqlite3.OperationalError("database is locked"),
+            )
+        connection.info["holds_write_lock"] = True
+        cursor.execute("BEGIN IMMEDIATE")
+
+    def _release(connection_info: dict) -> None:
+        if connection_info.pop("holds_write_lock", False):
+            write_lock.release()
+
+    event.listen(new_engine, "commit", lambda connection: _release(connection.info))
+    event.listen(new_engine, "rollback", lambda connection: _release(connection.info))
+    event.listen(
+        new_engine.pool,
+        "checkin",
+        lambda dbapi_connection, connection_record: _release(connection_record.info),
+    )
+    return new_engine
+
+
+engine = create_db_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica. A SQLite file gets a pool of read-only connections
+# instead, which see every commit immediately; otherwise reads go to the
+# primary engine.
+_sqlite_reader = None
+if settings.read_database_url:
+    read_engine = create_db_engine(settings.read_database_url)
+elif is_sqlite_file(settings.database_url):
+    read_engine = _sqlite_reader = create_db_engine(
+        settings.database_url, readonly=True
+    )
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
 
 class Base(DeclarativeBase):
     pass
 
 
+def _reads_can_lag() -> bool:
+    """Whether reads may be served by a replica that lags the primary."""
+    return read_engine is not engine and read_engine is not _sqlite_reader
+
+
+def _record_user_write(session: Session) -> None:
+    """
+    Stamp users.last_write_at in the writing transaction. It lives on the
+    user's row, which get_current_user loads from the primary on every
+    request, so whichever worker serves their next read sees it. Only
+    reads_use_primary reads it, and only with a lagging replica, so without
+    one no write pays for the extra UPDATE on the user's row.
+    """
+    # session.info["user_id"] is set by get_current_user
+    user_id = session.info.get("user_id")
+    if user_id is None or session.info.get("write_recorded"):
+        return
+    if not _reads_can_lag():
+        return
+    session.info["write_recorded"] = True
+    users = Base.metadata.tables["users"]
+    session.connection().execute(
+        users.update()
+        .where(users.c.id == user_id)
+        .values(last_write_at=datetime.utcnow())
+    )
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _record_flushed_write(session: Session, flush_context):
+    _record_user_write(session)
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _record_bulk_write(orm_execute_state):
+    # Bulk UPDATE/DELETE statements don't flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete:
+        _record_user_write(orm_execute_state.session)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+@event.listens_for(SessionLocal, "after_rollback")
+def _end_write_transaction(session: Session):
+    session.info.pop("write_recorded", None)
+
+
+def reads_use_primary(last_write_at: datetime | None) -> bool:
+    """
+    Whether a user's reads must go to the primary, given their
+    ``User.last_write_at``.
+
+    True when there is no replica, or when the user committed a write within
+    the last read_your_writes_seconds so they see their own changes even if
+    the replica is lagging. SQLite read connections never lag.
+    """
+    if not _reads_can_lag():
+        return read_engine is engine
+    return (
+        last_write_at is not None
+        and (datetime.utcnow() - last_write_at).total_seconds()
+        < settings.read_your_writes_seconds
+    )
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def open_read_session(last_write_at: datetime | None) -> Session:
+    """Open a session for read-only queries on behalf of a user."""
+    if reads_use_primary(last_write_at):
+        return SessionLocal()
+    return ReadSessionLocal()
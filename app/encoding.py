@@ -0,0 +1,70 @@
+"""Response encodings negotiated through the Accept header."""
+
+import json
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install "hackathon-api[msgpack]"
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+def _quality(params: list[str]) -> float:
+    """The q parameter of an Accept entry; a malformed one excludes it."""
+    for param in params:
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return min(max(float(value), 0.0), 1.0)
+            except ValueError:
+                return 0.0
+    return 1.0
+
+
+def wants_msgpack(request: Request) -> bool:
+    """
+    Whether the Accept header asks for MessagePack: a MessagePack media type
+    is listed with q > 0, and at least as high as application/json if that
+    is listed too. Wildcards don't count, JSON is the default either way.
+    """
+    msgpack_q = json_q = 0.0
+    for entry in request.headers.get("accept", "").split(","):
+        media_type, *params = entry.split(";")
+        media_type = media_type.strip().lower()
+        if media_type in MSGPACK_MEDIA_TYPES:
+            msgpack_q = max(msgpack_q, _quality(params))
+        elif media_type == "application/json":
+            json_q = max(json_q, _quality(params))
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def require_msgpack() -> None:
+    if msgpack is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="MessagePack encoding is not available",
+        )
+
+
+def encode_body(content, as_msgpack: bool) -> tuple[bytes, str]:
+    """Serialized content and its media type, for sharing between requests."""
+    if as_msgpack:
+        require_msgpack()
+        return msgpack.packb(content), "application/msgpack"
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+    return body.encode(), "application/json"
+
+
+def encode_response(request: Request, content) -> Response:
+    """
+    Encode JSON-compatible content as MessagePack if the client asked for
+    it, otherwise as JSON.
+    """
+    if not wants_msgpack(request):
+        return JSONResponse(content)
+    require_msgpack()
+    return Response(msgpack.packb(content), media_type="application/msgpack")
@@ -0,0 +1,24 @@
+"""
+Run job workers outside the API process.
+
+Usage: python -m app.jobs [concurrency]
+"""
+
+import asyncio
+import logging
+import sys
+
+from app.jobs.worker import run_forever
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    try:
+        asyncio.run(run_forever(concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Durable job queue backed by the jobs table.
+
+``enqueue`` adds a Job row to the caller's session, so the job exists if and
+only if the request's transaction commits (on the database that session is
+bound to: each shard has its own jobs table). When it does, in-process workers
+are woken up straight away; workers in other processes pick it up on their
+next poll.
+"""
+
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.job import Job
+from app.sharding import shards
+
+JobHandler = Callable[[Session, dict], None]
+
+handlers: dict[str, JobHandler] = {}
+
+_wake_callbacks: list[Callable[[], None]] = []
+
+
+def job(name: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register a handler: ``handler(db, payload)``, run in a worker thread. It
+    shouldn't commit: the worker commits its work with the job's status. Jobs
+    can run more than once (see worker), so handlers must be idempotent.
+    """
+
+    def register(handler: JobHandler) -> JobHandler:
+        handlers[name] = handler
+        return handler
+
+    return register
+
+
+def enqueue(
+    db: Session,
+    name: str,
+    payload: dict | None = None,
+    delay: timedelta | None = None,
+    max_attempts: int | None = None,
+) -> Job:
+    """Queue a job as part of the session's current transaction."""
+    if name not in handlers:
+        raise ValueError(f"Unknown job '{name}'")
+    new_job = Job(
+        name=name,
+        payload=payload or {},
+        run_at=datetime.utcnow() + (delay or timedelta()),
+        max_attempts=max_attempts or settings.job_max_attempts,
+    )
+    db.add(new_job)
+    db.info["enqueued_jobs"] = True
+    return new_job
+
+
+def on_enqueue_commit(callback: Callable[[], None]) -> None:
+    """Call ``callback`` after any transaction that enqueued jobs commits."""
+    _wake_callbacks.append(callback)
+
+
+def _wake_workers(session: Session):
+    if session.info.pop("enqueued_jobs", False):
+        for callback in _wake_callbacks:
+            callback()
+
+
+def _forget_enqueued(session: Session):
+    session.info.pop("enqueued_jobs", None)
+
+
+# Jobs are enqueued on the shard of the pack they concern
+for _sessionmaker in shards.sessionmakers:
+    event.listen(_sessionmaker, "after_commit", _wake_workers)
+    event.listen(_sessionmaker, "after_rollback", _forget_enqueued)
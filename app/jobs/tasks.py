@@ -0,0 +1,102 @@
+"""Job handlers. Each runs in a worker thread with its own session."""
+
+import logging
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.jobs.queue import enqueue, job
+from app.models.activity_log import ActivityLog
+from app.models.pack import Pack
+from app.models.pack_invitation import PackInvitation
+from app.models.user import User
+from app.sharding import shards
+
+logger = logging.getLogger(__name__)
+
+
+@job("send_invitation_email")
+def send_invitation_email(db: Session, payload: dict):
+    """Deliver a pack invitation to the invited email address."""
+    invitation = (
+        db.query(PackInvitation)
+        .filter(PackInvitation.id == payload["invitation_id"])
+        .first()
+    )
+    if invitation is None or invitation.accepted_at is not None:
+        return
+
+    # No mail provider is configured yet; log the delivery instead
+    logger.info(
+        "Invitation to pack %s for %s (token %s...)",
+        invitation.pack_id,
+        invitation.email,
+        invitation.token[:6],
+    )
+
+
+@job("purge_pack")
+def purge_pack(db: Session, payload: dict):
+    """
+    Remove a deleted pack's data, one batch of activities per run.
+
+    Each run deletes up to pack_purge_batch_size activities in its own short
+    transaction and queues the next run. Once no activities are left the pack
+    row is deleted and ON DELETE CASCADE removes the rest.
+    """
+    pack_id = payload["pack_id"]
+    batch = (
+        select(ActivityLog.id)
+        .where(ActivityLog.pack_id == pack_id)
+        .limit(settings.pack_purge_batch_size)
+    )
+    deleted = db.execute(
+        delete(ActivityLog)
+        .where(ActivityLog.id.in_(batch))
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if deleted:
+        enqueue(db, "purge_pack", payload)
+        return
+
+    db.execute(
+        delete(Pack)
+        .where(Pack.id == pack_id, Pack.deleted_at.is_not(None))
+        .execution_options(synchronize_session=False)
+    )
+    logger.info("Purged deleted pack %s", pack_id)
+
+
+@job("copy_user")
+def copy_user(db: Session, payload: dict):
+    """
+    Bring every other shard's copy of a user in line with the primary. The
+    row is read when the job runs, so a late or repeated run copies the
+    latest version.
+    """
+    user = db.get(User, payload["user_id"])
+    if user is not None:
+        shards.copy_user(user)
+
+
+def queue_user_copy(db: Session, user_id: int) -> None:
+    """
+    Refresh a user's copies on the other shards once the session's
+    transaction commits. Call it whenever a user row is created or changed.
+    """
+    if len(shards) > 1:
+        enqueue(db, "copy_user", {"user_id": user_id})
+
+
+def copy_user_now(user: User) -> None:
+    """
+    Copy a just-committed user to the other shards straight away, so their
+    first request finds it. A failure is left to the queued copy_user job.
+    """
+    if len(shards) == 1:
+        return
+    try:
+        shards.copy_user(user)
+    except Exception:
+        logger.exception("Copying user %s to the shards failed; will retry", user.id)
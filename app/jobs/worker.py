@@ -0,0 +1,217 @@
+"""
+Asyncio worker pool for the job queue.
+
+Workers claim runnable jobs with ``SELECT ... FOR UPDATE SKIP LOCKED`` on
+Postgres (a conditional UPDATE keeps claiming safe on other databases), run
+the handler in a thread, and retry failures with exponential backoff. Jobs
+left running by a crashed worker are claimed again after the visibility
+timeout.
+
+A claim is a lease: the job's ``locked_at`` at claim time. The outcome is
+only recorded while the worker still holds it, and a handler's work commits
+together with the "done" status, so a job reclaimed from a worker that was
+merely slow doesn't have its result recorded twice. Delivery is still at
+least once: a job that runs longer than job_visibility_timeout_seconds is
+run again by another worker, so handlers must be idempotent.
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_, select, update
+from sqlalchemy.orm import Session
+
+import app.jobs.tasks  # noqa: F401  (register handlers)
+from app.config import settings
+from app.jobs.queue import handlers, on_enqueue_commit
+from app.models.job import Job
+from app.sharding import shards
+
+logger = logging.getLogger(__name__)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter, capped at an hour."""
+    seconds = min(settings.job_retry_base_seconds * 2 ** (attempts - 1), 3600)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def claim_job(shard: int = 0) -> tuple[int, datetime] | None:
+    """
+    Mark the shard's next runnable job as running and return its ID and
+    lease (its new ``locked_at``).
+    """
+    db = shards.sessionmakers[shard]()
+    try:
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=settings.job_visibility_timeout_seconds)
+        runnable = or_(
+            and_(Job.status == "pending", Job.run_at <= now),
+            and_(Job.status == "running", Job.locked_at < stale_before),
+        )
+        candidate = db.execute(
+            select(Job.id, Job.status, Job.locked_at)
+            .where(runnable)
+            .order_by(Job.run_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).first()
+        if candidate is None:
+            return None
+
+        # Conditional on the state we read, so two workers can't both win
+        claimed = db.execute(
+            update(Job)
+            .where(
+                Job.id == candidate.id,
+                Job.status == candidate.status,
+                Job.locked_at.is_(None)
+                if candidate.locked_at is None
+                else Job.locked_at == candidate.locked_at,
+            )
+            .values(status="running", locked_at=now, attempts=Job.attempts + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        return (candidate.id, now) if claimed else None
+    finally:
+        db.close()
+
+
+def _finish(db: Session, job_id: int, lease: datetime, **values) -> bool:
+    """Record a job's outcome if the lease is still ours; False if it was lost."""
+    return bool(
+        db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "running", Job.locked_at == lease)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    )
+
+
+def run_job(job_id: int, lease: datetime, shard: int = 0) -> None:
+    """Run a claimed job's handler and record the outcome."""
+    db = shards.sessionmakers[shard]()
+    try:
+        claimed = db.get(Job, job_id)
+        if claimed is None:
+            logger.warning("Job %s disappeared before it could run", job_id)
+            return
+        name, payload = claimed.name, claimed.payload
+        attempts, max_attempts = claimed.attempts, claimed.max_attempts
+        try:
+            handler = handlers.get(name)
+            if handler is None:
+                raise LookupError(f"No handler registered for job '{name}'")
+            handler(db, payload)
+            # The handler's work commits only if the lease is still ours
+            if not _finish(
+                db, job_id, lease, status="done", finished_at=datetime.utcnow()
+            ):
+                db.rollback()
+                logger.warning("Job %s (%s) lost its lease; rolled back", job_id, name)
+                return
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            error = f"{type(e).__name__}: {e}"[:2000]
+            if attempts >= max_attempts:
+                values = {
+                    "status": "failed",
+                    "last_error": error,
+                    "finished_at": datetime.utcnow(),
+                }
+                logger.exception("Job %s (%s) failed permanently", job_id, name)
+            else:
+                values = {
+                    "status": "pending",
+                    "last_error": error,
+                    "run_at": datetime.utcnow() + retry_delay(attempts),
+                }
+                logger.warning("Job %s (%s) failed, will retry: %s", job_id, name, e)
+            if not _finish(db, job_id, lease, **values):
+                logger.warning("Job %s (%s) lost its lease", job_id, name)
+            db.commit()
+    finally:
+        db.close()
+
+
+class JobWorker:
+    """A pool of asyncio tasks that each claim and run one job at a time."""
+
+    def __init__(self, concurrency: int, poll_seconds: float):
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        on_enqueue_commit(self.wake)
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        # Stay registered for wake-ups, but ignore them once stopped
+        self._loop = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self) -> None:
+        """Thread-safe: called after a transaction that enqueued jobs commits."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _work(self) -> None:
+        shard = 0
+        idle_shards = 0
+        while True:
+            self._wakeup.clear()
+            try:
+                claimed = await run_in_threadpool(claim_job, shard)
+            except Exception:
+                logger.exception("Claiming a job on shard %s failed", shard)
+                claimed = None
+
+            if claimed is not None:
+                job_id, lease = claimed
+                # Recording the outcome can fail too (e.g. the database went
+                # away); the job is then retried after the visibility timeout
+                try:
+                    await run_in_threadpool(run_job, job_id, lease, shard)
+                except Exception:
+                    logger.exception("Running job %s on shard %s failed", job_id, shard)
+                idle_shards = 0
+                continue
+
+            # Try the other shards before going idle
+            shard = (shard + 1) % len(shards)
+            idle_shards += 1
+            if idle_shards < len(shards):
+                continue
+            idle_shards = 0
+
+            # Idle until the next poll or until new jobs are committed
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except TimeoutError:
+                pass
+
+
+async def run_forever(concurrency: int) -> None:
+    worker = JobWorker(concurrency, settings.job_poll_seconds)
+    worker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
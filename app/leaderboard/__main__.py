@@ -0,0 +1,27 @@
+"""
+Recompute the leaderboard counters from activity_logs.
+
+Usage: python -m app.leaderboard [workers] [chunk_size]
+"""
+
+import logging
+import sys
+
+import app.models  # noqa: F401  (register all tables)
+from app.db import Base
+from app.leaderboard.counters import rebuild
+from app.sharding import shards
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    for shard_engine in shards.engines:
+        Base.metadata.create_all(bind=shard_engine)
+    written = rebuild(chunk_size=chunk_size, workers=workers)
+    logging.info("Wrote %s counter rows", written)
+
+
+if __name__ == "__main__":
+    main()
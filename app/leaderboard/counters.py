@@ -0,0 +1,169 @@
+"""
+Materialized per-member contribution counters.
+
+One row per (pack, month, member, activity type). ``record_contribution``
+upserts the row inside log_activity's transaction, so a counter commits or
+rolls back together with the activity it counts. The leaderboard then reads
+at most members x activity types rows instead of grouping activity_logs.
+
+``rebuild`` recomputes every counter from activity_logs, a chunk of packs
+per transaction, with chunks running in parallel.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from sqlalchemy import Date, cast, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.activity_counter import ActivityCounter
+from app.models.activity_log import ActivityLog
+from app.models.pack import Pack
+from app.sharding import shards
+
+logger = logging.getLogger(__name__)
+
+KEY_COLUMNS = ("pack_id", "month", "user_id", "activity_type_id")
+
+
+def month_start(moment: datetime | date) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def _dialect_insert(db: Session):
+    """The dialect's INSERT supporting ON CONFLICT, if it has one."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert
+
+
+def record_contribution(
+    db: Session,
+    pack_id: int,
+    user_id: int,
+    activity_type_id: int,
+    logged_at: datetime,
+) -> None:
+    """Count a newly logged activity. Runs inside the caller's transaction."""
+    key = {
+        "pack_id": pack_id,
+        "month": month_start(logged_at),
+        "user_id": user_id,
+        "activity_type_id": activity_type_id,
+    }
+
+    dialect_insert = _dialect_insert(db)
+    if dialect_insert is not None:
+        db.execute(
+            dialect_insert(ActivityCounter)
+            .values(**key, count=1)
+            .on_conflict_do_update(
+                index_elements=list(KEY_COLUMNS),
+                set_={"count": ActivityCounter.count + 1},
+            )
+        )
+        return
+
+    updated = db.execute(
+        update(ActivityCounter)
+        .where(*(getattr(ActivityCounter, column) == key[column] for column in key))
+        .values(count=ActivityCounter.count + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        db.execute(insert(ActivityCounter).values(**key, count=1))
+
+
+def month_counters(db: Session, pack_id: int, month: date) -> list[ActivityCounter]:
+    """All of a pack's counters for one month."""
+    return (
+        db.query(ActivityCounter)
+        .filter(ActivityCounter.pack_id == pack_id, ActivityCounter.month == month)
+        .all()
+    )
+
+
+def _month_of_logged_at(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.date_trunc("month", ActivityLog.logged_at), Date)
+    return func.date(ActivityLog.logged_at, "start of month")
+
+
+def rebuild_packs(pack_ids: list[int], shard: int = 0) -> int:
+    """
+    Recompute the counters of some packs on one shard in one transaction.
+
+    Returns the number of counter rows written.
+    """
+    db = shards.sessionmakers[shard]()
+    try:
+        db.execute(delete(ActivityCounter).where(ActivityCounter.pack_id.in_(pack_ids)))
+        month = _month_of_logged_at(db)
+        totals = (
+            select(
+                ActivityLog.pack_id,
+                month,
+                ActivityLog.user_id,
+                ActivityLog.activity_type_id,
+                func.count(),
+            )
+            .where(ActivityLog.pack_id.in_(pack_ids))
+            .group_by(
+                ActivityLog.pack_id,
+                month,
+                ActivityLog.user_id,
+                ActivityLog.activity_type_id,
+            )
+        )
+        written = db.execute(
+            insert(ActivityCounter).from_select([*KEY_COLUMNS, "count"], totals)
+        ).rowcount
+        db.commit()
+        return written
+    finally:
+        db.close()
+
+
+def rebuild(chunk_size: int = 500, workers: int = 4) -> int:
+    """
+    Recompute all counters from activity_logs, shard by shard, ``chunk_size``
+    packs per transaction and up to ``workers`` chunks at a time (one on
+    SQLite, which has a single writer).
+
+    Activities logged for a chunk while it is being rebuilt may be counted
+    twice or not at all, so run this when writes are quiet (e.g. after a
+    bulk import or when deploying the counters table).
+
+    Returns the number of counter rows written.
+    """
+    written = 0
+    for shard, shard_engine in enumerate(shards.engines):
+        shard_workers = 1 if shard_engine.dialect.name == "sqlite" else workers
+
+        db = shards.sessionmakers[shard]()
+        try:
+            pack_ids = [pack_id for (pack_id,) in db.query(Pack.id).order_by(Pack.id)]
+        finally:
+            db.close()
+
+        chunks = [
+            pack_ids[i : i + chunk_size] for i in range(0, len(pack_ids), chunk_size)
+        ]
+        with ThreadPoolExecutor(max_workers=shard_workers) as pool:
+            results = pool.map(rebuild_packs, chunks, [shard] * len(chunks))
+            for chunk, rows in zip(chunks, results):
+                written += rows
+                logger.info(
+                    "Rebuilt counters for packs %s-%s on shard %s (%s rows)",
+                    chunk[0],
+                    chunk[-1],
+                    shard,
+                    rows,
+                )
+    return written
@@ -1,47 +1,116 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 
-from app.db import Base, engine, get_db
+from app.auth.password import calibrate as calibrate_bcrypt
+from app.cache.bus import bus
+from app.config import settings
+from app.db import Base, RequestContextMiddleware, get_db
+from app.jobs.worker import JobWorker
+from app.maintenance.runner import run_maintenance_loop
+from app.media.photos import shutdown_thumbnailer
 from app.models import Item as ItemModel
-from app.routers import activities, activity_types, auth, dogs, packs
+from app.profiling.middleware import ProfilingMiddleware
+from app.reminders.engine import run_reminder_loop
+from app.routers import (
+    activities,
+    activity_types,
+    admin,
+    analytics,
+    auth,
+    batch,
+    dashboard,
+    dogs,
+    leaderboard,
+    packs,
+    schedules,
+    webhooks,
+)
 from app.schemas.item import Item as ItemSchema
+from app.search.notes import ensure_search_index
 from app.seed.activity_types import seed_activity_types
-
-
-def seed_database(db: Session):
-    """Seed the database with sample items if empty"""
-    if db.query(ItemModel).count() == 0:
-        sample_items = [
-            ItemModel(
-                name="Widget", description="A useful widget for your desk", price=9.99
-            ),
-            ItemModel(
-                name="Gadget", description="A fancy gadget with buttons", price=19.99
-            ),
-            ItemModel(
-                name="Gizmo",
-                description="An amazing gizmo that does things",
-                price=29.99,
-            ),
-        ]
-        db.add_all(sample_items)
-        db.commit()
-        print("Database seeded with sample items")
+from app.seed.items import seed_items
+from app.sharding import shards
+from app.startup import StartupReport, verify_schema, warm_pool, warm_serializers
+from app.webhooks.sender import WebhookSender
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables and seed data
-    Base.metadata.create_all(bind=engine)
-    db = next(get_db())
-    seed_database(db)
-    seed_activity_types(db)
-    db.close()
+    report = StartupReport()
+
+    if settings.startup_mode == "verify":
+        # Startup: schema and seed data are managed by `python -m app.seed`
+        with report.phase("verify schema"):
+            for shard_engine in shards.engines:
+                verify_schema(shard_engine, settings.alembic_config)
+    else:
+        # Startup: create tables and seed data
+        with report.phase("create tables"):
+            for shard_engine in shards.engines:
+                Base.metadata.create_all(bind=shard_engine)
+                ensure_search_index(shard_engine)
+        with report.phase("seed"):
+            db = next(get_db())
+            seed_items(db)
+            db.close()
+            # Every shard needs the default activity types its packs refer to
+            for shard_sessionmaker in shards.sessionmakers:
+                db = shard_sessionmaker()
+                seed_activity_types(db)
+                db.close()
+
+    if settings.db_pool_warm_connections > 0:
+        with report.phase("warm pool"):
+            for shard_engine in shards.engines:
+                warm_pool(shard_engine, settings.db_pool_warm_connections)
+    if settings.bcrypt_calibrate_ms > 0:
+        with report.phase("calibrate bcrypt"):
+            calibrate_bcrypt(settings.bcrypt_calibrate_ms)
+    if settings.warm_serializers:
+        with report.phase("build OpenAPI schema"):
+            warm_serializers(app)
+
+    with report.phase("cache bus"):
+        bus.start()
+
+    job_worker = None
+    if settings.job_workers > 0:
+        job_worker = JobWorker(settings.job_workers, settings.job_poll_seconds)
+        job_worker.start()
+
+    webhook_sender = None
+    if settings.webhook_poll_seconds > 0:
+        webhook_sender = WebhookSender(settings.webhook_poll_seconds)
+        webhook_sender.start()
+
+    background_tasks = []
+    if settings.reminder_tick_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(run_reminder_loop(settings.reminder_tick_seconds))
+        )
+    if settings.maintenance_interval_seconds > 0:
+        background_tasks.append(
+            asyncio.create_task(
+                run_maintenance_loop(settings.maintenance_interval_seconds)
+            )
+        )
+
+    app.state.startup_report = report
+    print(report.format())
     yield
     # Shutdown: cleanup if needed
+    for task in background_tasks:
+        task.cancel()
+    if job_worker is not None:
+        await job_worker.stop()
+    if webhook_sender is not None:
+        await webhook_sender.stop()
+    shutdown_thumbnailer()
+    bus.stop()
 
 
 app = FastAPI(
@@ -50,6 +119,8 @@ app = FastAPI(
     version="0.1.0",
     lifespan=lifespan,
 )
+# Set by the lifespan once boot has finished
+app.state.startup_report = None
 
 app.add_middleware(
     CORSMiddleware,
@@ -57,7 +128,11 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Profile-Id"],
 )
+app.add_middleware(ProfilingMiddleware)
+if settings.slow_query_ms > 0:
+    app.add_middleware(RequestContextMiddleware)
 
 # Include routers
 app.include_router(auth.router, prefix="/api/v1")
@@ -65,6 +140,13 @@ app.include_router(packs.router, prefix="/api/v1")
 app.include_router(dogs.router, prefix="/api/v1")
 app.include_router(activity_types.router, prefix="/api/v1")
 app.include_router(activities.router, prefix="/api/v1")
+app.include_router(dashboard.router, prefix="/api/v1")
+app.include_router(schedules.router, prefix="/api/v1")
+app.include_router(analytics.router, prefix="/api/v1")
+app.include_router(leaderboard.router, prefix="/api/v1")
+app.include_router(webhooks.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
+app.include_router(batch.router, prefix="/api/v1")
 
 
 @app.get("/")
@@ -77,6 +159,14 @@ async def health():
     return {"status": "healthy"}
 
 
+@app.get("/health/startup")
+async def startup_report():
+    """Timing breakdown of this worker's boot phases"""
+    if app.state.startup_report is None:
+        raise HTTPException(status_code=503, detail="Startup has not finished")
+    return app.state.startup_report.as_dict()
+
+
 @app.get("/items", response_model=list[ItemSchema])
 async def get_items(db: Session = Depends(get_db)):
     """Get all items from the database"""
@@ -0,0 +1,27 @@
+"""
+Run one maintenance pass outside the API process, e.g. from cron.
+
+Usage: python -m app.maintenance [task ...]
+"""
+
+import json
+import logging
+import sys
+
+from app.maintenance.registry import tasks
+from app.maintenance.runner import run_maintenance
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    try:
+        results = run_maintenance(sys.argv[1:] or None)
+    except ValueError as e:
+        sys.exit(f"{e} (available: {', '.join(tasks)})")
+    if results is None:
+        sys.exit("Another process is running maintenance")
+    print(json.dumps(results, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Pluggable maintenance tasks.
+
+A task is ``task(db, budget) -> dict``: it does its work in small
+transactions, stops once ``budget.exhausted()``, and returns a report.
+"""
+
+import time
+from collections.abc import Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+
+class Budget:
+    """Wall-clock allowance for one task run."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def exhausted(self) -> bool:
+        return self.remaining() == 0.0
+
+    def limit_statements(self, db: Session) -> None:
+        """
+        Cap statements in the session's current transaction at the remaining
+        budget, so a single slow statement can't overrun it (Postgres only;
+        call again after each commit).
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            milliseconds = max(1, int(self.remaining() * 1000))
+            db.execute(text(f"SET LOCAL statement_timeout = {milliseconds}"))
+
+
+MaintenanceFunc = Callable[[Session, Budget], dict]
+
+
+class MaintenanceTask:
+    def __init__(self, name: str, func: MaintenanceFunc, budget_seconds: float | None):
+        self.name = name
+        self.func = func
+        self.budget_seconds = budget_seconds  # None: the configured default
+
+
+tasks: dict[str, MaintenanceTask] = {}
+
+
+def maintenance_task(
+    name: str, budget_seconds: float | None = None
+) -> Callable[[MaintenanceFunc], MaintenanceFunc]:
+    """Register a task run by every maintenance pass, in registration order."""
+
+    def register(func: MaintenanceFunc) -> MaintenanceFunc:
+        tasks[name] = MaintenanceTask(name, func, budget_seconds)
+        return func
+
+    return register
@@ -0,0 +1,120 @@
+"""
+Maintenance runner.
+
+Every pass runs the registered tasks one after another on each shard, each
+within its own time budget. When several API processes run the in-app loop, a
+Postgres advisory lock elects one of them to run each pass; the others
+skip it. Other databases have no cross-process lock, so the pass simply
+runs.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+
+import app.maintenance.tasks  # noqa: F401  (register tasks)
+from app.config import settings
+from app.db import engine
+from app.maintenance.registry import Budget, tasks
+from app.sharding import shards
+
+logger = logging.getLogger(__name__)
+
+# Application-wide key for pg_try_advisory_lock
+ADVISORY_LOCK_KEY = 7_283_746_001
+
+# Outcome of the latest pass in this process, for /admin/maintenance
+last_run: dict = {}
+
+
+@contextmanager
+def leader_lock() -> Iterator[bool]:
+    """Yield whether this process may run the pass; held until exit."""
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+
+    with engine.connect() as connection:
+        acquired = connection.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": ADVISORY_LOCK_KEY}
+        ).scalar()
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": ADVISORY_LOCK_KEY}
+                )
+                connection.commit()
+
+
+def run_task(name: str, shard: int = 0) -> dict:
+    """Run one task on a shard within its budget; failures are reported."""
+    task = tasks[name]
+    budget = Budget(task.budget_seconds or settings.maintenance_budget_seconds)
+    started = time.monotonic()
+    db = shards.sessionmakers[shard]()
+    try:
+        report = task.func(db, budget)
+        status = "ok"
+    except Exception as e:
+        db.rollback()
+        logger.exception("Maintenance task %s failed", name)
+        report = {"error": f"{type(e).__name__}: {e}"}
+        status = "failed"
+    finally:
+        db.close()
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        "Maintenance task %s on shard %s: %s in %.2fs %s",
+        name,
+        shard,
+        status,
+        elapsed,
+        report,
+    )
+    return {"status": status, "seconds": round(elapsed, 3), "report": report}
+
+
+def run_maintenance(names: list[str] | None = None) -> dict | None:
+    """
+    Run a maintenance pass over the given tasks (default: all of them).
+
+    Returns each task's outcome, or None if another process holds the lock.
+    """
+    unknown = set(names or []) - set(tasks)
+    if unknown:
+        raise ValueError(f"Unknown maintenance tasks: {', '.join(sorted(unknown))}")
+
+    with leader_lock() as leader:
+        if not leader:
+            logger.info("Maintenance pass skipped: another process is running it")
+            return None
+        results = {}
+        for name in names or list(tasks):
+            if len(shards) == 1:
+                results[name] = run_task(name)
+                continue
+            for shard in range(len(shards)):
+                results[f"{name}@shard-{shard}"] = run_task(name, shard)
+
+    last_run.clear()
+    last_run.update(finished_at=time.time(), tasks=results)
+    return results
+
+
+async def run_maintenance_loop(interval_seconds: float) -> None:
+    """Run a maintenance pass every interval_seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(run_maintenance)
+        except Exception:
+            logger.exception("Maintenance pass failed")
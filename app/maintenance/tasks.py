@@ -0,0 +1,162 @@
+"""Built-in maintenance tasks."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.maintenance.registry import Budget, maintenance_task
+from app.models.pack_invitation import PackInvitation
+from app.models.webhook import WebhookEvent
+
+# Tables written on every request whose planner statistics go stale first
+HOT_TABLES = [
+    "activity_logs",
+    "activity_counters",
+    "care_schedules",
+    "jobs",
+    "pack_invitations",
+    "pack_members",
+    "webhook_outbox",
+]
+
+# Dead tuples as a share of all tuples above which a table is reported
+BLOAT_RATIO_THRESHOLD = 0.2
+
+
+@maintenance_task("purge_invitations")
+def purge_invitations(db: Session, budget: Budget) -> dict:
+    """
+    Delete invitations that expired more than invitation_retention_days ago,
+    accepted or not, maintenance_batch_size rows per transaction.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.invitation_retention_days)
+    deleted = 0
+    complete = False
+    while not budget.exhausted():
+        budget.limit_statements(db)
+        batch = (
+            select(PackInvitation.id)
+            .where(PackInvitation.expires_at < cutoff)
+            .order_by(PackInvitation.expires_at)
+            .limit(settings.maintenance_batch_size)
+        )
+        ids = db.execute(batch).scalars().all()
+        if not ids:
+            complete = True
+            break
+        db.execute(delete(PackInvitation).where(PackInvitation.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+    return {"deleted": deleted, "complete": complete}
+
+
+@maintenance_task("purge_webhook_events")
+def purge_webhook_events(db: Session, budget: Budget) -> dict:
+    """
+    Delete webhook outbox rows that were delivered, or gave up, more than
+    webhook_retention_days ago, maintenance_batch_size rows per transaction.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=settings.webhook_retention_days)
+    deleted = 0
+    complete = False
+    while not budget.exhausted():
+        budget.limit_statements(db)
+        batch = (
+            select(WebhookEvent.id)
+            .where(
+                WebhookEvent.status.in_(["delivered", "failed"]),
+                WebhookEvent.created_at < cutoff,
+            )
+            .order_by(WebhookEvent.id)
+            .limit(settings.maintenance_batch_size)
+        )
+        ids = db.execute(batch).scalars().all()
+        if not ids:
+            complete = True
+            break
+        db.execute(delete(WebhookEvent).where(WebhookEvent.id.in_(ids)))
+        db.commit()
+        deleted += len(ids)
+    return {"deleted": deleted, "complete": complete}
+
+
+@maintenance_task("refresh_statistics")
+def refresh_statistics(db: Session, budget: Budget) -> dict:
+    """Refresh planner statistics for the hot tables, one table at a time."""
+    analyzed = []
+    for table in HOT_TABLES:
+        if budget.exhausted():
+            break
+        budget.limit_statements(db)
+        db.execute(text(f"ANALYZE {table}"))
+        db.commit()
+        analyzed.append(table)
+    return {"analyzed": analyzed, "complete": len(analyzed) == len(HOT_TABLES)}
+
+
+@maintenance_task("report_bloat")
+def report_bloat(db: Session, budget: Budget) -> dict:
+    """
+    Report dead-tuple ratios and table/index sizes, flagging tables that
+    would benefit from VACUUM. Reads statistics only; nothing is vacuumed.
+    """
+    budget.limit_statements(db)
+    if db.get_bind().dialect.name != "postgresql":
+        page_count = db.execute(text("PRAGMA page_count")).scalar()
+        free_pages = db.execute(text("PRAGMA freelist_count")).scalar()
+        ratio = free_pages / page_count if page_count else 0.0
+        return {
+            "pages": page_count,
+            "free_pages": free_pages,
+            "free_ratio": round(ratio, 3),
+            "vacuum_suggested": ratio > BLOAT_RATIO_THRESHOLD,
+        }
+
+    tables = db.execute(
+        text(
+            """
+            SELECT relname, n_live_tup, n_dead_tup, last_autovacuum,
+                   last_autoanalyze, pg_table_size(relid) AS table_bytes,
+                   pg_indexes_size(relid) AS index_bytes
+            FROM pg_stat_user_tables
+            ORDER BY n_dead_tup DESC
+            """
+        )
+    ).mappings()
+    report = []
+    for row in tables:
+        total = row["n_live_tup"] + row["n_dead_tup"]
+        ratio = row["n_dead_tup"] / total if total else 0.0
+        report.append(
+            {
+                "table": row["relname"],
+                "live_rows": row["n_live_tup"],
+                "dead_rows": row["n_dead_tup"],
+                "dead_ratio": round(ratio, 3),
+                "table_bytes": row["table_bytes"],
+                "index_bytes": row["index_bytes"],
+                "last_autovacuum": row["last_autovacuum"],
+                "last_autoanalyze": row["last_autoanalyze"],
+                "vacuum_suggested": ratio > BLOAT_RATIO_THRESHOLD,
+            }
+        )
+
+    # Indexes never used for a scan only cost writes and space
+    unused_indexes = (
+        db.execute(
+            text(
+                """
+                SELECT indexrelname
+                FROM pg_stat_user_indexes
+                JOIN pg_index USING (indexrelid)
+                WHERE idx_scan = 0 AND NOT indisunique
+                """
+            )
+        )
+        .scalars()
+        .all()
+    )
+    db.commit()
+    return {"tables": report, "unused_indexes": unused_indexes}
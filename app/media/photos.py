@@ -0,0 +1,266 @@
+"""
+Content-addressed storage for dog photos.
+
+Uploads are streamed straight from the request body to a temporary file while
+their SHA-256 is computed, then moved to ``originals/<hash>.<ext>`` once the
+caller knows they'll be used. The same
+photo uploaded twice is stored once. JPEG thumbnails are generated in a
+process pool after the upload has been answered.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from fastapi import HTTPException, Request, status
+
+from app.config import settings
+
+try:
+    from python_multipart import MultipartParser
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart import MultipartParser
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import parse_options_header
+
+logger = logging.getLogger(__name__)
+
+# Accepted upload types and the extension they are stored under
+PHOTO_TYPES = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+}
+MEDIA_TYPES = {extension: media_type for media_type, extension in PHOTO_TYPES.items()}
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def photos_root() -> Path:
+    return Path(settings.media_root) / "photos"
+
+
+def original_path(photo_key: str) -> Path:
+    return photos_root() / "originals" / photo_key
+
+
+def photo_version(photo_key: str) -> str:
+    """The ``v`` query parameter that makes a photo's URL change with it."""
+    return photo_key[:16]
+
+
+def photo_url(pack_id: int, photo_key: str, size: int | None = None) -> str:
+    url = f"/api/v1/packs/{pack_id}/dog/photo?v={photo_version(photo_key)}"
+    return url if size is None else f"{url}&size={size}"
+
+
+def thumbnail_path(photo_key: str, size: int) -> Path:
+    digest = photo_key.split(".")[0]
+    return photos_root() / "thumbnails" / str(size) / f"{digest}.jpg"
+
+
+class _PhotoPartWriter:
+    """MultipartParser callbacks writing the ``photo`` field to a file."""
+
+    def __init__(self, destination: Path, max_bytes: int):
+        self.destination = destination
+        self.max_bytes = max_bytes
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.content_type: str | None = None
+        self.found = False
+        self._file = None
+        self._headers: dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+    def on_part_begin(self):
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._value += data[start:end]
+
+    def on_header_end(self):
+        self._headers[self._field.lower()] = self._value
+        self._field = b""
+        self._value = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(self._headers.get(b"content-disposition"))
+        if self.found or options.get(b"name") != b"photo":
+            return
+        content_type = self._headers.get(b"content-type", b"").decode("latin-1")
+        self.content_type = content_type.split(";")[0].strip().lower()
+        if self.content_type not in PHOTO_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Photo must be one of: {', '.join(PHOTO_TYPES)}",
+            )
+        self._file = open(self.destination, "wb")
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if self._file is None:
+            return
+        chunk = data[start:end]
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Photo is larger than {self.max_bytes} bytes",
+            )
+        self.digest.update(chunk)
+        self._file.write(chunk)
+
+    def on_part_end(self):
+        if self._file is not None:
+            self.close()
+            self.found = True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class PhotoUpload:
+    """
+    A received photo, held in the temporary directory until it's stored.
+
+    Args:
+        tmp_path: Where the photo was streamed to
+        photo_key: Its key, ``<sha256>.<ext>``
+    """
+
+    def __init__(self, tmp_path: Path, photo_key: str):
+        self.tmp_path = tmp_path
+        self.photo_key = photo_key
+
+    def store(self) -> str:
+        """Move the photo to ``originals/`` (once per content) and return its key."""
+        destination = original_path(self.photo_key)
+        if not destination.exists():
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.tmp_path, destination)
+        self.discard()
+        return self.photo_key
+
+    def discard(self) -> None:
+        """Delete the temporary file unless it has been stored."""
+        self.tmp_path.unlink(missing_ok=True)
+
+
+async def receive_photo_upload(request: Request) -> PhotoUpload:
+    """
+    Stream the ``photo`` field of a multipart request to a temporary file.
+
+    The caller stores it with ``PhotoUpload.store`` once it knows the photo
+    will be used, and discards it otherwise.
+
+    Raises:
+        HTTPException: If the body isn't valid multipart, has no photo field,
+            or the photo has an unsupported type or is too large
+    """
+    content_type, options = parse_options_header(request.headers.get("content-type"))
+    boundary = options.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a multipart/form-data body with a 'photo' field",
+        )
+
+    tmp_dir = photos_root() / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = tmp_dir / uuid.uuid4().hex
+    writer = _PhotoPartWriter(tmp_path, settings.photo_max_bytes)
+    parser = MultipartParser(boundary, writer.callbacks())
+
+    try:
+        try:
+            async for chunk in request.stream():
+                parser.write(chunk)
+            parser.finalize()
+        except MultipartParseError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Malformed multipart body: {e}",
+            ) from e
+        if not writer.found:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Missing 'photo' field",
+            )
+    except BaseException:
+        writer.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    photo_key = f"{writer.digest.hexdigest()}.{PHOTO_TYPES[writer.content_type]}"
+    return PhotoUpload(tmp_path, photo_key)
+
+
+def make_thumbnails(original: str, photo_key: str, sizes: list[int], root: str):
+    """Write a JPEG thumbnail per size. Runs in a worker process."""
+    from PIL import Image, ImageOps
+
+    with Image.open(original) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        digest = photo_key.split(".")[0]
+        for size in sizes:
+            target = Path(root) / "thumbnails" / str(size) / f"{digest}.jpg"
+            if target.exists():
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            thumbnail = image.copy()
+            thumbnail.thumbnail((size, size))
+            tmp_target = target.parent / f"{target.name}.{uuid.uuid4().hex}.tmp"
+            thumbnail.save(tmp_target, "JPEG", quality=85, optimize=True)
+            os.replace(tmp_target, target)
+
+
+def schedule_thumbnails(photo_key: str) -> None:
+    """Generate thumbnails in the background without waiting for them."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=settings.photo_thumbnail_workers)
+
+    future = asyncio.get_running_loop().run_in_executor(
+        _executor,
+        make_thumbnails,
+        str(original_path(photo_key)),
+        photo_key,
+        list(settings.photo_thumbnail_sizes),
+        str(photos_root()),
+    )
+    future.add_done_callback(_log_thumbnail_failure)
+
+
+def _log_thumbnail_failure(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Thumbnail generation failed: %s", future.exception())
+
+
+def shutdown_thumbnailer() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,21 +1,32 @@
 """Import all models here so SQLAlchemy can create their tables."""
 
+from app.models.activity_counter import ActivityCounter
 from app.models.activity_log import ActivityLog
 from app.models.activity_type import ActivityType
+from app.models.care_schedule import CareSchedule
 from app.models.dog import Dog
 from app.models.item import Item
+from app.models.job import Job
 from app.models.pack import Pack
+from app.models.pack_id_allocation import PackIdAllocation
 from app.models.pack_invitation import PackInvitation
 from app.models.pack_member import PackMember
 from app.models.user import User
+from app.models.webhook import WebhookEvent, WebhookSubscription
 
 __all__ = [
+    "ActivityCounter",
     "ActivityLog",
     "ActivityType",
+    "CareSchedule",
     "Dog",
     "Item",
+    "Job",
     "Pack",
+    "PackIdAllocation",
     "PackInvitation",
     "PackMember",
     "User",
+    "WebhookEvent",
+    "WebhookSubscription",
 ]
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer
+
+from app.db import Base
+
+
+class ActivityCounter(Base):
+    """
+    Number of activities a member logged per activity type and month,
+    maintained alongside activity_logs so the leaderboard never has to
+    aggregate the full history.
+    """
+
+    __tablename__ = "activity_counters"
+
+    # Primary key order matches the leaderboard lookup: one pack, one month
+    pack_id = Column(
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), primary_key=True
+    )
+    month = Column(Date, primary_key=True)  # first day of the month
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    activity_type_id = Column(
+        Integer, ForeignKey("activity_types.id", ondelete="CASCADE"), primary_key=True
+    )
+    count = Column(Integer, nullable=False, default=0)
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy import DDL, Column, DateTime, ForeignKey, Index, Integer, String, event
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -10,9 +10,13 @@ class ActivityLog(Base):
     __tablename__ = "activity_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    pack_id = Column(Integer, ForeignKey("packs.id"), nullable=False)
-    dog_id = Column(Integer, ForeignKey("dogs.id"), nullable=False)
-    activity_type_id = Column(Integer, ForeignKey("activity_types.id"), nullable=False)
+    pack_id = Column(
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), nullable=False
+    )
+    dog_id = Column(Integer, ForeignKey("dogs.id", ondelete="CASCADE"), nullable=False)
+    activity_type_id = Column(
+        Integer, ForeignKey("activity_types.id", ondelete="CASCADE"), nullable=False
+    )
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # who logged it
     notes = Column(String, nullable=True)  # optional notes
     logged_at = Column(DateTime, nullable=False)  # when activity occurred
@@ -30,3 +34,20 @@ class ActivityLog(Base):
     __table_args__ = (
         Index("ix_activity_logs_pack_id_logged_at", "pack_id", "logged_at"),
     )
+
+
+# Full-text search over notes (Postgres only): a generated tsvector column with
+# a GIN index. It is not mapped on the model; see app/search/notes.py.
+NOTES_SEARCH_DDL = [
+    "ALTER TABLE activity_logs ADD COLUMN IF NOT EXISTS notes_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', coalesce(notes, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_activity_logs_notes_tsv "
+    "ON activity_logs USING gin (notes_tsv)",
+]
+
+for statement in NOTES_SEARCH_DDL:
+    event.listen(
+        ActivityLog.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
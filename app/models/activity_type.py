@@ -22,7 +22,7 @@ class ActivityType(Base):
     icon = Column(String, nullable=False)  # SF Symbol name
     color = Column(String, nullable=False)  # hex color
     pack_id = Column(
-        Integer, ForeignKey("packs.id"), nullable=True
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), nullable=True
     )  # null for default types
     is_default = Column(Boolean, nullable=False, default=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    UniqueConstraint,
+    or_,
+)
+from sqlalchemy.orm import relationship
+
+from app.db import Base
+
+
+class CareSchedule(Base):
+    __tablename__ = "care_schedules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pack_id = Column(
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), nullable=False
+    )
+    activity_type_id = Column(
+        Integer, ForeignKey("activity_types.id", ondelete="CASCADE"), nullable=False
+    )
+    interval_minutes = Column(Integer, nullable=False)  # e.g. 720 for every 12h
+    last_logged_at = Column(DateTime, nullable=True)  # latest matching activity
+    next_due_at = Column(DateTime, nullable=False)
+    # next_due_at value the overdue hook last fired for, so it fires once
+    notified_due_at = Column(DateTime, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Relationships
+    activity_type = relationship("ActivityType")
+
+    # One schedule per activity type per pack; next_due_at is indexed for
+    # listing overdue schedules
+    __table_args__ = (
+        UniqueConstraint(
+            "pack_id", "activity_type_id", name="uq_care_schedule_pack_type"
+        ),
+        Index("ix_care_schedules_next_due_at", "next_due_at"),
+    )
+
+
+# Schedules the overdue hook has yet to fire for at their current due time.
+# The partial index holds only these, so the reminder tick reads just the
+# rows it will fire for, however many notified ones are still overdue.
+UNNOTIFIED = or_(
+    CareSchedule.notified_due_at.is_(None),
+    CareSchedule.notified_due_at != CareSchedule.next_due_at,
+)
+Index(
+    "ix_care_schedules_unnotified_next_due_at",
+    CareSchedule.next_due_at,
+    postgresql_where=UNNOTIFIED,
+    sqlite_where=UNNOTIFIED,
+)
@@ -10,11 +10,14 @@ class Dog(Base):
     __tablename__ = "dogs"
 
     id = Column(Integer, primary_key=True, index=True)
-    pack_id = Column(Integer, ForeignKey("packs.id"), nullable=False, unique=True)
+    pack_id = Column(
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), nullable=False, unique=True
+    )
     name = Column(String, nullable=False)
     breed = Column(String, nullable=True)
     birth_date = Column(Date, nullable=True)
     photo_url = Column(String, nullable=True)
+    photo_key = Column(String, nullable=True)  # uploaded photo: "<sha256>.<ext>"
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     # Relationships
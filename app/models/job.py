@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+
+from app.db import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)  # registered handler name
+    payload = Column(JSON, nullable=False, default=dict)
+    status = Column(
+        String, nullable=False, default="pending"
+    )  # 'pending', 'running', 'done', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )  # not before this time (retry backoff)
+    locked_at = Column(DateTime, nullable=True)  # when a worker claimed it
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+    # Index for claiming the next runnable jobs
+    __table_args__ = (Index("ix_jobs_status_run_at", "status", "run_at"),)
@@ -13,18 +13,35 @@ class Pack(Base):
     name = Column(String, nullable=False)
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Set when the pack is deleted; its rows are purged in the background and
+    # the pack row itself goes last (see app/jobs/tasks.py)
+    deleted_at = Column(DateTime, nullable=True)
 
-    # Relationships
+    # Relationships. Child rows are removed by ON DELETE CASCADE in the
+    # database, so deleting a pack never loads them.
     creator = relationship("User", foreign_keys=[created_by])
     members = relationship(
-        "PackMember", back_populates="pack", cascade="all, delete-orphan"
+        "PackMember",
+        back_populates="pack",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     invitations = relationship(
-        "PackInvitation", back_populates="pack", cascade="all, delete-orphan"
+        "PackInvitation",
+        back_populates="pack",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     dog = relationship(
-        "Dog", back_populates="pack", uselist=False, cascade="all, delete-orphan"
+        "Dog",
+        back_populates="pack",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     activity_types = relationship(
-        "ActivityType", back_populates="pack", cascade="all, delete-orphan"
+        "ActivityType",
+        back_populates="pack",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
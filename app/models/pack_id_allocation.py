@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer
+
+from app.db import Base
+
+
+class PackIdAllocation(Base):
+    """
+    Source of globally unique pack IDs when packs are sharded; only the
+    primary database's table is used.
+    """
+
+    __tablename__ = "pack_id_allocations"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
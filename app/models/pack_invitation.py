@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -10,7 +10,9 @@ class PackInvitation(Base):
     __tablename__ = "pack_invitations"
 
     id = Column(Integer, primary_key=True, index=True)
-    pack_id = Column(Integer, ForeignKey("packs.id"), nullable=False)
+    pack_id = Column(
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), nullable=False
+    )
     email = Column(String, nullable=False)
     token = Column(String, unique=True, nullable=False, index=True)
     invited_by = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -18,6 +20,13 @@ class PackInvitation(Base):
     accepted_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
+    # The pending-invitation check in create_invitation looks up by pack and
+    # email; maintenance purges by expiry
+    __table_args__ = (
+        Index("ix_pack_invitations_pack_id_email", "pack_id", "email"),
+        Index("ix_pack_invitations_expires_at", "expires_at"),
+    )
+
     # Relationships
     pack = relationship("Pack", back_populates="invitations")
     inviter = relationship("User", foreign_keys=[invited_by])
@@ -1,6 +1,14 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -10,13 +18,19 @@ class PackMember(Base):
     __tablename__ = "pack_members"
 
     id = Column(Integer, primary_key=True, index=True)
-    pack_id = Column(Integer, ForeignKey("packs.id"), nullable=False)
+    pack_id = Column(
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), nullable=False
+    )
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     role = Column(String, nullable=False)  # 'owner', 'admin', 'member'
     joined_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
-    # Unique constraint on (pack_id, user_id)
-    __table_args__ = (UniqueConstraint("pack_id", "user_id", name="uq_pack_member"),)
+    # Unique constraint on (pack_id, user_id); the index serves per-user
+    # lookups such as listing a user's packs in pack ID order
+    __table_args__ = (
+        UniqueConstraint("pack_id", "user_id", name="uq_pack_member"),
+        Index("ix_pack_members_user_id_pack_id", "user_id", "pack_id"),
+    )
 
     # Relationships
     pack = relationship("Pack", back_populates="members")
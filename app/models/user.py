@@ -13,3 +13,12 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     name = Column(String, nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # When the user last committed a write on the primary; their reads stay
+    # there for read_your_writes_seconds after it
+    last_write_at = Column(DateTime, nullable=True)
+    # Bumped whenever the user's pack memberships change, see auth.memberships
+    membership_version = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Pack ID -> role from the access token, set by get_current_user when the
+    # token's memberships are current; None means ask the database
+    pack_roles = None
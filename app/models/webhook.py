@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+
+from app.db import Base
+
+
+class WebhookSubscription(Base):
+    __tablename__ = "webhook_subscriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pack_id = Column(
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    url = Column(String, nullable=False)
+    secret = Column(String, nullable=False)  # HMAC key for the signature header
+    event_types = Column(JSON, nullable=True)  # null for every event type
+    active = Column(Boolean, nullable=False, default=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class WebhookEvent(Base):
+    """
+    Outbox row: one event awaiting delivery to one subscription. Written in
+    the transaction that caused the event, so events exist if and only if
+    the change they describe was committed.
+    """
+
+    __tablename__ = "webhook_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    subscription_id = Column(
+        Integer,
+        ForeignKey("webhook_subscriptions.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    pack_id = Column(
+        Integer, ForeignKey("packs.id", ondelete="CASCADE"), nullable=False
+    )
+    event_id = Column(String, nullable=False)  # shared by the event's deliveries
+    event_type = Column(String, nullable=False)  # e.g. 'activity.logged'
+    data = Column(JSON, nullable=False)
+    status = Column(
+        String, nullable=False, default="pending"
+    )  # 'pending', 'delivered', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )  # retry backoff, or the lease of a sender delivering it
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    delivered_at = Column(DateTime, nullable=True)
+
+    # Index for claiming the next due events
+    __table_args__ = (
+        Index("ix_webhook_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
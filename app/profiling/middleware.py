@@ -0,0 +1,171 @@
+"""
+Opt-in request profiling.
+
+A request is profiled when it sends ``X-Profile: 1`` together with a valid
+``X-Admin-Token``, or when the profile_sample_rate coin flip fires. It then
+runs under cProfile while every SQL statement it executes is timed (failed
+ones with their error), and the result is saved to the profile store; the response carries the profile's ID
+in ``X-Profile-Id``.
+
+Requests that aren't profiled pay for a scan of their header names only: no
+profiler is enabled and the SQL timing listeners are only attached while a
+profile is being taken. One request is profiled at a time, since cProfile
+can't run twice at once; endpoint code run in worker threads doesn't show up
+in the function stats, and other requests interleaved on the event loop may.
+"""
+
+import cProfile
+import io
+import pstats
+import random
+import secrets
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+from app.profiling.store import store
+
+# Functions listed in a profile's summary, by cumulative time
+TOP_FUNCTIONS = 40
+
+_profiling = threading.Lock()
+_statements: ContextVar[list | None] = ContextVar("profiled_statements", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    # Kept on the statement's execution context rather than the connection,
+    # so a statement that fails leaves nothing behind on a pooled connection
+    if _statements.get() is not None and context is not None:
+        context.profile_started = time.perf_counter()
+
+
+def _record(context, statement: str, rows: int | None, error: str | None = None):
+    statements = _statements.get()
+    started = getattr(context, "profile_started", None)
+    if statements is None or started is None:
+        return
+    del context.profile_started
+    timing = {
+        "statement": statement,
+        "ms": round((time.perf_counter() - started) * 1000, 3),
+        "rows": rows,
+    }
+    if error is not None:
+        timing["error"] = error
+    statements.append(timing)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    _record(context, statement, cursor.rowcount)
+
+
+def _handle_error(exception_context):
+    error = exception_context.original_exception
+    _record(
+        exception_context.execution_context,
+        exception_context.statement,
+        None,
+        f"{type(error).__name__}: {error}",
+    )
+
+
+def _authorized(scope) -> bool:
+    wants_profile = False
+    token = None
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            wants_profile = value == b"1"
+        elif name == b"x-admin-token":
+            token = value.decode("latin-1")
+    return (
+        wants_profile
+        and token is not None
+        and settings.admin_token is not None
+        and secrets.compare_digest(token, settings.admin_token)
+    )
+
+
+def _function_stats(profiler: cProfile.Profile) -> str:
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    return output.getvalue()
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sample_rate = settings.profile_sample_rate
+        triggered = (sample_rate > 0 and random.random() < sample_rate) or (
+            settings.admin_token is not None and _authorized(scope)
+        )
+        if not triggered or not _profiling.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            _profiling.release()
+
+    async def _profile(self, scope, receive, send):
+        now = datetime.utcnow()
+        profile_id = f"{now:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+        status_code = None
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-profile-id", profile_id.encode()),
+                ]
+            await send(message)
+
+        statements: list[dict] = []
+        token = _statements.set(statements)
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - started
+            event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+            event.remove(Engine, "handle_error", _handle_error)
+            _statements.reset(token)
+
+            summary = {
+                "id": profile_id,
+                "started_at": now.isoformat(),
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status_code,
+                "ms": round(elapsed * 1000, 3),
+                "sql_count": len(statements),
+                "sql_ms": round(sum(s["ms"] for s in statements), 3),
+                "sql": statements,
+                "functions": _function_stats(profiler),
+            }
+            profiler.create_stats()
+            await run_in_threadpool(store.save, profile_id, summary, profiler.stats)
@@ -0,0 +1,71 @@
+"""Bounded on-disk ring of request profiles."""
+
+import json
+import marshal
+import re
+from pathlib import Path
+
+from app.config import settings
+
+# Profile IDs are generated by the middleware; anything else is rejected
+PROFILE_ID = re.compile(r"^\d{8}T\d{12}-[0-9a-f]{6}$")
+
+
+class ProfileStore:
+    """
+    Each profile is ``<id>.json`` (request, SQL, top functions) plus
+    ``<id>.prof`` (raw pstats data for snakeviz and friends). IDs sort
+    chronologically; only the newest ``max_profiles`` are kept.
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def save(self, profile_id: str, summary: dict, stats: dict) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / f"{profile_id}.prof", "wb") as f:
+            marshal.dump(stats, f)
+        (self.directory / f"{profile_id}.json").write_text(
+            json.dumps(summary, default=str)
+        )
+        self._prune()
+
+    def _prune(self) -> None:
+        summaries = sorted(self.directory.glob("*.json"))
+        for stale in summaries[: max(0, len(summaries) - self.max_profiles)]:
+            stale.unlink(missing_ok=True)
+            stale.with_suffix(".prof").unlink(missing_ok=True)
+
+    def list(self) -> list[dict]:
+        """Profile summaries without SQL or function stats, newest first."""
+        if not self.directory.is_dir():
+            return []
+        profiles = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                summary = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # pruned or still being written
+            summary.pop("sql", None)
+            summary.pop("functions", None)
+            profiles.append(summary)
+        return profiles
+
+    def get(self, profile_id: str) -> dict | None:
+        path = self.raw_path(profile_id)
+        if path is None:
+            return None
+        try:
+            return json.loads(path.with_suffix(".json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def raw_path(self, profile_id: str) -> Path | None:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.prof"
+        return path if path.is_file() else None
+
+
+store = ProfileStore(settings.profile_dir, settings.profile_max_files)
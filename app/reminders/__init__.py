@@ -0,0 +1 @@
+# Care reminders module
@@ -0,0 +1,185 @@
+"""
+Reminder engine for care schedules.
+
+Each schedule stores its ``next_due_at``, which is indexed. Finding what is
+overdue across all packs is then an index range scan over the k overdue
+rows, O(k log n), instead of a scan of activity_logs; the tick scans a
+partial index of the schedules it hasn't fired for yet. Schedules are updated
+in the same transaction as the ``log_activity`` call that satisfies them.
+"""
+
+import asyncio
+import logging
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app.models.activity_log import ActivityLog
+from app.models.care_schedule import UNNOTIFIED, CareSchedule
+from app.sharding import shards
+
+logger = logging.getLogger(__name__)
+
+OverdueHook = Callable[[CareSchedule], None]
+
+_overdue_hooks: list[OverdueHook] = []
+
+
+def on_overdue(hook: OverdueHook) -> OverdueHook:
+    """Register a function called once each time a schedule becomes overdue."""
+    _overdue_hooks.append(hook)
+    return hook
+
+
+def latest_logged_at(
+    db: Session, pack_id: int, activity_type_id: int
+) -> datetime | None:
+    """When the pack last logged an activity of this type, if ever."""
+    return (
+        db.query(ActivityLog.logged_at)
+        .filter(
+            ActivityLog.pack_id == pack_id,
+            ActivityLog.activity_type_id == activity_type_id,
+        )
+        .order_by(ActivityLog.logged_at.desc())
+        .limit(1)
+        .scalar()
+    )
+
+
+def next_due(last_logged_at: datetime | None, interval_minutes: int) -> datetime:
+    """A schedule nothing was logged for yet is due immediately."""
+    if last_logged_at is None:
+        return datetime.utcnow()
+    return last_logged_at + timedelta(minutes=interval_minutes)
+
+
+def record_activity(
+    db: Session, pack_id: int, activity_type_id: int, logged_at: datetime
+) -> None:
+    """
+    Move the matching schedule's due time forward for a newly logged activity.
+
+    Runs inside the caller's transaction. Backdated activities older than the
+    schedule's latest one leave it unchanged. The update is conditional on
+    that in the database, so concurrent logs can't move the schedule back.
+    """
+    interval_minutes = db.execute(
+        select(CareSchedule.interval_minutes).where(
+            CareSchedule.pack_id == pack_id,
+            CareSchedule.activity_type_id == activity_type_id,
+        )
+    ).scalar()
+    if interval_minutes is None:
+        return
+    db.execute(
+        update(CareSchedule)
+        .where(
+            CareSchedule.pack_id == pack_id,
+            CareSchedule.activity_type_id == activity_type_id,
+            or_(
+                CareSchedule.last_logged_at.is_(None),
+                CareSchedule.last_logged_at < logged_at,
+            ),
+        )
+        .values(
+            last_logged_at=logged_at,
+            next_due_at=next_due(logged_at, interval_minutes),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def find_overdue(
+    db: Session,
+    now: datetime | None = None,
+    pack_id: int | None = None,
+    limit: int | None = None,
+    unnotified: bool = False,
+) -> list[CareSchedule]:
+    """
+    Overdue schedules, most overdue first; with ``unnotified``, only those
+    the overdue hook hasn't fired for yet.
+    """
+    query = db.query(CareSchedule).filter(
+        CareSchedule.next_due_at <= (now or datetime.utcnow())
+    )
+    if unnotified:
+        query = query.filter(UNNOTIFIED)
+    if pack_id is not None:
+        query = query.filter(CareSchedule.pack_id == pack_id)
+    query = query.order_by(CareSchedule.next_due_at)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def tick(db: Session, now: datetime | None = None, batch_size: int = 500) -> int:
+    """
+    Fire the overdue hooks for schedules that became overdue since the last
+    tick. Safe to run in several workers at once: each schedule's due time is
+    claimed with a conditional UPDATE, so only one worker fires for it.
+
+    Returns the number of schedules the hooks fired for.
+    """
+    fired = 0
+    for schedule in find_overdue(db, now, limit=batch_size, unnotified=True):
+        claimed = db.execute(
+            update(CareSchedule)
+            .where(
+                CareSchedule.id == schedule.id,
+                CareSchedule.next_due_at == schedule.next_due_at,
+                or_(
+                    CareSchedule.notified_due_at.is_(None),
+                    CareSchedule.notified_due_at != schedule.next_due_at,
+                ),
+            )
+            .values(notified_due_at=schedule.next_due_at)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if not claimed:
+            continue
+
+        fired += 1
+        for hook in _overdue_hooks:
+            try:
+                hook(schedule)
+            except Exception:
+                logger.exception("Overdue hook failed for schedule %s", schedule.id)
+    return fired
+
+
+def _tick_once() -> int:
+    fired = 0
+    for shard_sessionmaker in shards.sessionmakers:
+        db = shard_sessionmaker()
+        try:
+            fired += tick(db)
+        finally:
+            db.close()
+    return fired
+
+
+async def run_reminder_loop(interval_seconds: float) -> None:
+    """Call tick() every interval_seconds until cancelled."""
+    while True:
+        try:
+            await run_in_threadpool(_tick_once)
+        except Exception:
+            logger.exception("Reminder tick failed")
+        await asyncio.sleep(interval_seconds)
+
+
+@on_overdue
+def _log_overdue(schedule: CareSchedule) -> None:
+    logger.info(
+        "Care schedule %s (pack %s, activity type %s) is overdue since %s",
+        schedule.id,
+        schedule.pack_id,
+        schedule.activity_type_id,
+        schedule.next_due_at,
+    )
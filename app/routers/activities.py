@@ -1,19 +1,36 @@
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session, joinedload
 
-from app.auth.deps import get_current_user
-from app.db import get_db
+from app.auth.deps import get_current_user, get_db_for_pack, get_read_db_for_pack
+from app.cache.bus import bus
+from app.cache.coalesce import coalescer
+from app.cache.recent_activities import recent_activities
+from app.config import settings
+from app.encoding import encode_body, require_msgpack, wants_msgpack
+from app.leaderboard.counters import record_contribution
 from app.models.activity_log import ActivityLog
 from app.models.activity_type import ActivityType
 from app.models.dog import Dog
 from app.models.user import User
+from app.reminders.engine import record_activity
 from app.routers.packs import verify_pack_member
+from app.schemas.activity_log import (
+    ActivityLog as ActivityLogSchema,
+)
 from app.schemas.activity_log import (
     ActivityLogCreate,
     ActivityLogWithDetails,
+    ActivitySearchHit,
+    CompactActivityHistory,
 )
+from app.schemas.activity_type import ActivityType as ActivityTypeSchema
+from app.schemas.user import User as UserSchema
+from app.search.notes import search_notes
+from app.sharding import shards
+from app.webhooks.outbox import record_event
 
 router = APIRouter()
 
@@ -28,7 +45,7 @@ async def log_activity(
     pack_id: int,
     activity_data: ActivityLogCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_for_pack),
 ):
     """
     Log an activity for the pack's dog. User must be a pack member.
@@ -73,6 +90,26 @@ async def log_activity(
         logged_at=activity_data.logged_at or datetime.utcnow(),
     )
     db.add(activity_log)
+
+    # Move the matching care schedule's due time in the same transaction
+    record_activity(db, pack_id, activity_log.activity_type_id, activity_log.logged_at)
+    # ...and count it towards the member's leaderboard totals
+    record_contribution(
+        db,
+        pack_id,
+        current_user.id,
+        activity_log.activity_type_id,
+        activity_log.logged_at,
+    )
+    # ...and notify the pack's webhooks once it commits
+    db.flush()
+    record_event(
+        db,
+        pack_id,
+        "activity.logged",
+        ActivityLogSchema.model_validate(activity_log).model_dump(mode="json"),
+    )
+
     db.commit()
     db.refresh(activity_log)
 
@@ -87,40 +124,239 @@ async def log_activity(
         .first()
     )
 
+    # This worker's recent-activities ring gets the new activity; the others
+    # drop theirs when the key is published
+    recent_activities.add(pack_id, _serialized(activity_log_with_details))
+    bus.publish(f"pack:{pack_id}:activities")
+
     return activity_log_with_details
 
 
+# Fields of an activity row that ?fields= can select
+ACTIVITY_FIELDS = (
+    "id",
+    "pack_id",
+    "dog_id",
+    "activity_type_id",
+    "user_id",
+    "notes",
+    "logged_at",
+    "created_at",
+)
+DETAIL_FIELDS = ("activity_type", "user")
+
+
+def _parse_fields(fields: str | None, allowed: tuple[str, ...]) -> list[str]:
+    if fields is None:
+        return list(allowed)
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}",
+        )
+    if "id" not in selected:
+        selected.insert(0, "id")
+    return selected
+
+
+_ACTIVITY_PAGE = TypeAdapter(list[ActivityLogWithDetails])
+HISTORY_ROUTE = "GET /packs/{pack_id}/activities"
+
+
+def _serialized(activity: ActivityLog) -> tuple[datetime, int, bytes]:
+    """A recent-activities ring entry."""
+    body = ActivityLogWithDetails.model_validate(activity).model_dump_json()
+    return activity.logged_at, activity.id, body.encode()
+
+
+def _recent_entries(pack_id: int) -> list[tuple[datetime, int, bytes]]:
+    """
+    A pack's newest activities for its ring, read from the primary: a lagging
+    replica could leave out an activity this worker has already published.
+    """
+    with shards.session_for_pack(pack_id) as db:
+        return _load_recent_entries(db, pack_id)
+
+
+def _load_recent_entries(
+    db: Session, pack_id: int
+) -> list[tuple[datetime, int, bytes]]:
+    activities = (
+        db.query(ActivityLog)
+        .options(
+            joinedload(ActivityLog.activity_type),
+            joinedload(ActivityLog.user),
+        )
+        .filter(ActivityLog.pack_id == pack_id)
+        .order_by(ActivityLog.logged_at.desc(), ActivityLog.id.desc())
+        .limit(settings.recent_activities_per_pack)
+        .all()
+    )
+    return [_serialized(activity) for activity in activities]
+
+
+def _compact_page(db: Session, query, fields: list[str]) -> dict:
+    """Rows with ids only, plus the users and activity types they refer to."""
+    rows = query.with_entities(*(getattr(ActivityLog, f) for f in fields)).all()
+    activities = [
+        {
+            field: value.isoformat() if isinstance(value, datetime) else value
+            for field, value in zip(fields, row)
+        }
+        for row in rows
+    ]
+
+    users = {}
+    if "user_id" in fields:
+        user_ids = {activity["user_id"] for activity in activities}
+        users = {
+            str(user.id): UserSchema.model_validate(user).model_dump(mode="json")
+            for user in db.query(User).filter(User.id.in_(user_ids))
+        }
+
+    activity_types = {}
+    if "activity_type_id" in fields:
+        type_ids = {activity["activity_type_id"] for activity in activities}
+        activity_types = {
+            str(activity_type.id): ActivityTypeSchema.model_validate(
+                activity_type
+            ).model_dump(mode="json")
+            for activity_type in db.query(ActivityType).filter(
+                ActivityType.id.in_(type_ids)
+            )
+        }
+
+    return {"activities": activities, "users": users, "activity_types": activity_types}
+
+
 @router.get(
     "/packs/{pack_id}/activities",
-    response_model=list[ActivityLogWithDetails],
+    response_model=list[ActivityLogWithDetails] | CompactActivityHistory,
+    responses={200: {"content": {"application/msgpack": {}}}},
     tags=["activities"],
 )
 async def get_activity_history(
     pack_id: int,
+    request: Request,
     activity_type_id: int | None = Query(None, description="Filter by activity type"),
     start_date: datetime | None = Query(None, description="Filter from this date"),
     end_date: datetime | None = Query(None, description="Filter to this date"),
     limit: int = Query(50, ge=1, le=200, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
+    response_format: str = Query(
+        "full",
+        alias="format",
+        pattern="^(full|compact)$",
+        description="'compact' returns ids only plus side-loaded users and types",
+    ),
+    fields: str | None = Query(
+        None, description="Comma-separated fields to include in each activity"
+    ),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db_for_pack),
 ):
     """
     Get activity history for a pack. User must be a pack member.
     Results are sorted by logged_at descending (newest first).
+
+    With format=compact the response is an object of the form
+    {"activities": [...], "users": {id: user}, "activity_types": {id: type}},
+    so each user and activity type is sent once per page. Send
+    Accept: application/msgpack for a MessagePack-encoded response.
+
+    Identical concurrent requests for a pack share one query and one
+    serialized body (see app/cache/coalesce.py), and unfiltered first pages
+    are served from the pack's recent activities held in memory (see
+    app/cache/recent_activities.py).
     """
     # Verify user is a member of the pack
     await verify_pack_member(pack_id, current_user, db)
 
-    # Build query
-    query = (
-        db.query(ActivityLog)
-        .options(
-            joinedload(ActivityLog.activity_type),
-            joinedload(ActivityLog.user),
-        )
-        .filter(ActivityLog.pack_id == pack_id)
+    as_msgpack = wants_msgpack(request)
+    if as_msgpack:
+        require_msgpack()
+
+    # Unfiltered first pages come from the pack's recent-activities ring
+    first_page = (
+        activity_type_id is None
+        and start_date is None
+        and end_date is None
+        and offset == 0
+        and response_format == "full"
+        and fields is None
+        and not as_msgpack
+        and limit <= settings.recent_activities_per_pack
     )
+    if first_page:
+        body = recent_activities.first_page(pack_id, limit)
+        if body is None:
+            generation = recent_activities.generation(pack_id)
+            entries = await coalescer.run(
+                HISTORY_ROUTE,
+                f"pack:{pack_id}:activities",
+                ("recent",),
+                lambda: _recent_entries(pack_id),
+            )
+            recent_activities.fill(pack_id, generation, entries)
+            body = b"[" + b",".join(entry[2] for entry in entries[:limit]) + b"]"
+        return Response(body, media_type="application/json")
+
+    if response_format == "compact":
+        selected = _parse_fields(fields, ACTIVITY_FIELDS)
+    elif fields is not None:
+        selected = _parse_fields(fields, ACTIVITY_FIELDS + DETAIL_FIELDS)
+    else:
+        selected = None
+
+    # Every member sees the same page, so the pack is the scope. Sessions on
+    # different databases (replica vs primary) don't share results.
+    params = (
+        str(db.get_bind().url),
+        activity_type_id,
+        start_date,
+        end_date,
+        limit,
+        offset,
+        response_format,
+        None if selected is None else tuple(selected),
+        as_msgpack,
+    )
+    body, media_type = await coalescer.run(
+        HISTORY_ROUTE,
+        f"pack:{pack_id}:activities",
+        params,
+        lambda: _activity_history_body(
+            db,
+            pack_id,
+            activity_type_id,
+            start_date,
+            end_date,
+            limit,
+            offset,
+            response_format,
+            selected,
+            as_msgpack,
+        ),
+    )
+    return Response(body, media_type=media_type)
+
+
+def _activity_history_body(
+    db: Session,
+    pack_id: int,
+    activity_type_id: int | None,
+    start_date: datetime | None,
+    end_date: datetime | None,
+    limit: int,
+    offset: int,
+    response_format: str,
+    selected: list[str] | None,
+    as_msgpack: bool,
+) -> tuple[bytes, str]:
+    # Build query
+    query = db.query(ActivityLog).filter(ActivityLog.pack_id == pack_id)
 
     # Apply filters
     if activity_type_id is not None:
@@ -131,9 +367,55 @@ async def get_activity_history(
         query = query.filter(ActivityLog.logged_at <= end_date)
 
     # Sort by logged_at descending (newest first)
-    query = query.order_by(ActivityLog.logged_at.desc())
+    query = query.order_by(ActivityLog.logged_at.desc(), ActivityLog.id.desc())
 
     # Apply pagination
-    activities = query.offset(offset).limit(limit).all()
+    query = query.offset(offset).limit(limit)
+
+    if response_format == "compact":
+        return encode_body(_compact_page(db, query, selected), as_msgpack)
+
+    activities = query.options(
+        joinedload(ActivityLog.activity_type),
+        joinedload(ActivityLog.user),
+    ).all()
+
+    if selected is None and not as_msgpack:
+        page = _ACTIVITY_PAGE.validate_python(activities, from_attributes=True)
+        return _ACTIVITY_PAGE.dump_json(page), "application/json"
+
+    include = None if selected is None else set(selected)
+    return encode_body(
+        [
+            ActivityLogWithDetails.model_validate(activity).model_dump(
+                mode="json", include=include
+            )
+            for activity in activities
+        ],
+        as_msgpack,
+    )
+
+
+@router.get(
+    "/packs/{pack_id}/activities/search",
+    response_model=list[ActivitySearchHit],
+    tags=["activities"],
+)
+async def search_activities(
+    pack_id: int,
+    q: str = Query(..., min_length=1, description="Words to find in notes"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, description="Pagination offset"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db_for_pack),
+):
+    """
+    Search the notes of a pack's activities. User must be a pack member.
+    Results are sorted by relevance, then by logged_at (newest first).
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    results = search_notes(db, pack_id, q, limit=limit, offset=offset)
 
-    return activities
+    return [{"activity": activity, "rank": rank} for activity, rank in results]
@@ -3,8 +3,8 @@ from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.auth.deps import get_current_user
-from app.db import get_db
+from app.auth.deps import get_current_user, get_db_for_pack, get_read_db_for_pack
+from app.cache.bus import bus
 from app.models.activity_type import ActivityType as ActivityTypeModel
 from app.models.user import User
 from app.routers.packs import verify_pack_member
@@ -21,7 +21,7 @@ router = APIRouter()
 async def list_activity_types(
     pack_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db_for_pack),
 ):
     """
     List all activity types available to a pack.
@@ -57,7 +57,7 @@ async def create_activity_type(
     pack_id: int,
     activity_type_data: ActivityTypeCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_for_pack),
 ):
     """
     Create a custom activity type for a pack.
@@ -85,5 +85,6 @@ async def create_activity_type(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Activity type '{activity_type_data.name}' already exists for this pack",
         )
+    bus.publish(f"pack:{pack_id}:activity_types")
 
     return new_activity_type
@@ -0,0 +1,83 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from app.auth import password
+from app.auth.deps import require_admin
+from app.cache.bus import bus
+from app.cache.coalesce import coalescer
+from app.cache.recent_activities import recent_activities
+from app.db import slow_queries
+from app.maintenance.runner import last_run
+from app.profiling.store import store as profile_store
+
+router = APIRouter(
+    prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)]
+)
+
+
+@router.get("/cache-bus")
+async def cache_bus_metrics():
+    """Invalidation bus health, message counts and propagation lag."""
+    return bus.metrics()
+
+
+@router.get("/coalescing")
+async def coalescing_metrics():
+    """How many reads were computed, joined in flight or served from cache."""
+    return coalescer.metrics()
+
+
+@router.get("/recent-activities")
+async def recent_activities_metrics():
+    """Recent-activity rings held in memory and their hit ratio."""
+    return recent_activities.metrics()
+
+
+@router.get("/password-hashing")
+async def password_hashing_metrics():
+    """bcrypt cost in use and the hash/verify time distribution per cost."""
+    return password.metrics()
+
+
+@router.get("/maintenance")
+async def maintenance_report():
+    """Outcome of this process's latest maintenance pass."""
+    return last_run
+
+
+@router.get("/slow-queries")
+async def slow_query_report(limit: int = Query(20, ge=1, le=500)):
+    """Statement fingerprints over the slow query threshold, by total time."""
+    return slow_queries.report(limit)
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Saved request profiles, newest first."""
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """A request profile: SQL statements with timings and the top functions."""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    return profile
+
+
+@router.get("/profiles/{profile_id}/raw")
+async def download_profile(profile_id: str):
+    """The raw pstats file, for snakeviz or ``python -m pstats``."""
+    path = profile_store.raw_path(profile_id)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found"
+        )
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename=f"{profile_id}.prof",
+    )
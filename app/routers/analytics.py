@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.analytics.activity_stats import pack_analytics
+from app.auth.deps import get_current_user, get_read_db_for_pack
+from app.models.user import User
+from app.routers.packs import verify_pack_member
+from app.schemas.analytics import PackAnalytics
+from app.schemas.datetimes import UTCDateTime
+
+router = APIRouter()
+
+
+@router.get(
+    "/packs/{pack_id}/analytics", response_model=PackAnalytics, tags=["analytics"]
+)
+async def get_analytics(
+    pack_id: int,
+    start: UTCDateTime | None = Query(
+        None, description="Range start (default: end - 90 days)"
+    ),
+    end: UTCDateTime | None = Query(None, description="Range end (default: now)"),
+    window_days: int = Query(7, ge=1, le=90, description="Moving average window"),
+    tz_offset_minutes: int = Query(
+        0, ge=-720, le=840, description="Client UTC offset for the heatmap"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db_for_pack),
+):
+    """
+    Get an hour-of-day x weekday heatmap, interval statistics and daily
+    trends for a pack's activities. User must be a member of the pack.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    # Default to the next full hour so repeated calls share a cache entry
+    if end is None:
+        end = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        end += timedelta(hours=1)
+    if start is None:
+        start = end - timedelta(days=90)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+    if end - start > timedelta(days=3660):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Range can be at most 10 years",
+        )
+
+    return await run_in_threadpool(
+        pack_analytics, db, pack_id, start, end, window_days, tz_offset_minutes
+    )
@@ -3,8 +3,10 @@ from sqlalchemy.orm import Session
 
 from app.auth.deps import get_current_user
 from app.auth.jwt import create_access_token, create_refresh_token, decode_token
-from app.auth.password import hash_password, verify_password
+from app.auth.memberships import load_memberships
+from app.auth.password import hash_password, needs_rehash, verify_password
 from app.db import get_db
+from app.jobs.tasks import copy_user_now, queue_user_copy
 from app.models.user import User as UserModel
 from app.schemas.user import AuthResponse, User, UserCreate, UserLogin
 
@@ -34,8 +36,13 @@ async def signup(user_data: UserCreate, db: Session = Depends(get_db)):
         name=user_data.name,
     )
     db.add(new_user)
+    db.flush()
+    # Pack queries on other shards join users, so each shard keeps a copy:
+    # queued with the signup so it can't be lost, and made now as well
+    queue_user_copy(db, new_user.id)
     db.commit()
     db.refresh(new_user)
+    copy_user_now(new_user)
 
     # Generate tokens
     access_token = create_access_token(new_user.id)
@@ -67,8 +74,18 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
             detail="Invalid email or password",
         )
 
-    # Generate tokens
-    access_token = create_access_token(user.id)
+    # Upgrade a hash made with an older, lower cost now we have the password
+    if needs_rehash(user.password_hash):
+        user.password_hash = hash_password(credentials.password)
+        queue_user_copy(db, user.id)
+        db.commit()
+
+    # Generate tokens. Read the version before the memberships: a change in
+    # between then leaves the roles behind the version, and they're ignored
+    version = user.membership_version
+    access_token = create_access_token(
+        user.id, await load_memberships(user.id), version
+    )
     refresh_token = create_refresh_token(user.id)
 
     return AuthResponse(
@@ -105,8 +122,11 @@ async def refresh(token: str, db: Session = Depends(get_db)):
             detail="User not found",
         )
 
-    # Generate new tokens
-    access_token = create_access_token(user.id)
+    # Generate new tokens, reading the version before the memberships
+    version = user.membership_version
+    access_token = create_access_token(
+        user.id, await load_memberships(user.id), version
+    )
     new_refresh_token = create_refresh_token(user.id)
 
     return AuthResponse(
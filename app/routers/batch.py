@@ -0,0 +1,173 @@
+"""
+Several API calls in one round trip.
+
+Each sub-request is dispatched in-process through the app itself, so it goes
+through the same routing, validation and error handling as a direct call.
+The batch authenticates once: sub-requests reuse its user instead of decoding
+the token and loading the user again. Consecutive GETs run concurrently;
+every other method runs on its own, after everything before it, so a batch
+reads its own writes.
+"""
+
+import asyncio
+import json
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.auth.deps import BATCH_USER_SCOPE_KEY, get_current_user
+from app.config import settings
+from app.models.user import User
+from app.schemas.batch import (
+    BatchRequest,
+    BatchResponse,
+    BatchSubRequest,
+    BatchSubResponse,
+)
+
+router = APIRouter()
+
+BATCH_PATH = "/api/v1/batch"
+
+
+def request_cost(sub_request: BatchSubRequest) -> int:
+    return 1 if sub_request.method == "GET" else settings.batch_write_cost
+
+
+async def dispatch(
+    request: Request, user: User, sub_request: BatchSubRequest
+) -> BatchSubResponse:
+    """Run one sub-request through the app and collect its response."""
+    url = urlsplit(sub_request.path)
+    headers = [(b"authorization", request.headers["authorization"].encode("latin-1"))]
+    body = b""
+    if sub_request.body is not None:
+        body = json.dumps(sub_request.body).encode()
+        headers += [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": sub_request.method,
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": headers,
+        BATCH_USER_SCOPE_KEY: user,
+    }
+
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    status_code = 500
+    response_headers: dict[str, str] = {}
+    chunks: list[bytes] = []
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+            for name, value in message.get("headers", []):
+                name = name.decode("latin-1").lower()
+                if name != "content-length":
+                    response_headers[name] = value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_done.set()
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The app already logged it; a failed sub-request doesn't fail the batch
+        if not response_done.is_set():
+            return BatchSubResponse(status=500, headers={})
+    finally:
+        response_done.set()
+
+    content = b"".join(chunks)
+    if not content:
+        decoded = None
+    elif response_headers.get("content-type", "").startswith("application/json"):
+        decoded = json.loads(content)
+    else:
+        decoded = content.decode("utf-8", errors="replace")
+    return BatchSubResponse(status=status_code, headers=response_headers, body=decoded)
+
+
+@router.post("/batch", response_model=BatchResponse, tags=["batch"])
+async def batch(
+    batch_data: BatchRequest,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Run several API calls and return their responses in order, each with its
+    own status. A sub-request failing doesn't stop the others.
+    """
+    # Check the batch is within its limits
+    sub_requests = batch_data.requests
+    if len(sub_requests) > settings.batch_max_requests:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch can hold at most {settings.batch_max_requests} requests",
+        )
+    cost = sum(request_cost(sub_request) for sub_request in sub_requests)
+    if cost > settings.batch_max_cost:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Batch costs {cost}, more than the limit of {settings.batch_max_cost}"
+                f" (reads cost 1, writes {settings.batch_write_cost})"
+            ),
+        )
+    if any(urlsplit(r.path).path.rstrip("/") == BATCH_PATH for r in sub_requests):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batches cannot be nested",
+        )
+
+    limit = asyncio.Semaphore(settings.batch_concurrency)
+
+    async def run(sub_request: BatchSubRequest) -> BatchSubResponse:
+        async with limit:
+            return await dispatch(request, current_user, sub_request)
+
+    # Runs of consecutive reads go concurrently, writes one at a time in order
+    responses: list[BatchSubResponse] = []
+    reads: list[BatchSubRequest] = []
+    for sub_request in [*sub_requests, None]:
+        if sub_request is not None and sub_request.method == "GET":
+            reads.append(sub_request)
+            continue
+        if reads:
+            responses += await asyncio.gather(*(run(read) for read in reads))
+            reads = []
+        if sub_request is not None:
+            response = await dispatch(request, current_user, sub_request)
+            responses.append(response)
+            # The sub-request may have stamped users.last_write_at and changed
+            # the user's memberships: later sub-requests must route and
+            # authorize as if this user had been loaded again
+            if response.status < 400:
+                set_committed_value(current_user, "last_write_at", datetime.utcnow())
+                current_user.pack_roles = None
+
+    return BatchResponse(responses=responses)
@@ -0,0 +1,138 @@
+import asyncio
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.auth.deps import get_current_user, get_read_db_for_pack
+from app.db import get_db
+from app.models.activity_log import ActivityLog
+from app.models.activity_type import ActivityType as ActivityTypeModel
+from app.models.dog import Dog as DogModel
+from app.models.pack import Pack
+from app.models.pack_member import PackMember
+from app.models.user import User
+from app.routers.packs import verify_pack_member
+from app.schemas.activity_log import ActivityLogWithDetails
+from app.schemas.activity_type import ActivityType
+from app.schemas.dashboard import PackDashboard
+from app.schemas.dog import Dog
+from app.schemas.pack import PackWithMembers
+from app.schemas.user import User as UserSchema
+from app.sharding import shards
+
+router = APIRouter()
+
+
+def _in_own_session(pack_id: int, last_write_at: datetime | None, query, *args):
+    """Run ``query(db, *args)`` on a fresh read session so queries can overlap."""
+    db = shards.open_read_session(pack_id, last_write_at)
+    try:
+        return query(db, *args)
+    finally:
+        db.close()
+
+
+def _pack_with_members(db: Session, pack_id: int) -> PackWithMembers:
+    pack = (
+        db.query(Pack)
+        .options(selectinload(Pack.members).joinedload(PackMember.user))
+        .filter(Pack.id == pack_id)
+        .first()
+    )
+    return PackWithMembers.model_validate(pack)
+
+
+def _dog(db: Session, pack_id: int) -> Dog | None:
+    dog = db.query(DogModel).filter(DogModel.pack_id == pack_id).first()
+    return Dog.model_validate(dog) if dog else None
+
+
+def _activity_types(db: Session, pack_id: int) -> list[ActivityType]:
+    activity_types = (
+        db.query(ActivityTypeModel)
+        .filter(
+            or_(
+                ActivityTypeModel.is_default.is_(True),
+                ActivityTypeModel.pack_id == pack_id,
+            )
+        )
+        .order_by(ActivityTypeModel.is_default.desc(), ActivityTypeModel.name)
+        .all()
+    )
+    return [ActivityType.model_validate(t) for t in activity_types]
+
+
+def _recent_activities(
+    db: Session, pack_id: int, limit: int
+) -> list[ActivityLogWithDetails]:
+    activities = (
+        db.query(ActivityLog)
+        .options(
+            joinedload(ActivityLog.activity_type),
+            joinedload(ActivityLog.user),
+        )
+        .filter(ActivityLog.pack_id == pack_id)
+        .order_by(ActivityLog.logged_at.desc(), ActivityLog.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [ActivityLogWithDetails.model_validate(a) for a in activities]
+
+
+@router.get(
+    "/packs/{pack_id}/dashboard", response_model=PackDashboard, tags=["dashboard"]
+)
+async def get_dashboard(
+    pack_id: int,
+    activities_limit: int = Query(
+        20, ge=1, le=200, description="Number of recent activities"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db_for_pack),
+    user_db: Session = Depends(get_db),
+):
+    """
+    Get the pack, its members, dog, activity types and latest activities in
+    one call. User must be a member of the pack.
+
+    Membership is checked once; the four lookups then run concurrently, each
+    on its own connection. The request's own sessions are closed first, so a
+    dashboard holds at most four connections.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    me = UserSchema.model_validate(current_user)
+    last_write_at = current_user.last_write_at
+    # user_db is the session get_current_user loaded the user on
+    db.close()
+    user_db.close()
+
+    pack, dog, activity_types, recent_activities = await asyncio.gather(
+        run_in_threadpool(
+            _in_own_session, pack_id, last_write_at, _pack_with_members, pack_id
+        ),
+        run_in_threadpool(_in_own_session, pack_id, last_write_at, _dog, pack_id),
+        run_in_threadpool(
+            _in_own_session, pack_id, last_write_at, _activity_types, pack_id
+        ),
+        run_in_threadpool(
+            _in_own_session,
+            pack_id,
+            last_write_at,
+            _recent_activities,
+            pack_id,
+            activities_limit,
+        ),
+    )
+
+    return PackDashboard(
+        me=me,
+        pack=pack,
+        dog=dog,
+        activity_types=activity_types,
+        recent_activities=recent_activities,
+    )
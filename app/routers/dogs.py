@@ -1,12 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session
 
-from app.auth.deps import get_current_user
-from app.db import get_db
+from app.auth.deps import get_current_user, get_db_for_pack, get_read_db_for_pack
+from app.cache.bus import bus
+from app.config import settings
+from app.media.photos import (
+    MEDIA_TYPES,
+    original_path,
+    photo_url,
+    photo_version,
+    receive_photo_upload,
+    schedule_thumbnails,
+    thumbnail_path,
+)
 from app.models.dog import Dog as DogModel
 from app.models.user import User
 from app.routers.packs import verify_pack_member
 from app.schemas.dog import Dog, DogCreate, DogUpdate
+from app.webhooks.outbox import record_event
 
 router = APIRouter()
 
@@ -21,7 +33,7 @@ async def add_dog(
     pack_id: int,
     dog_data: DogCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_for_pack),
 ):
     """
     Add a dog to a pack. User must be a member of the pack.
@@ -47,8 +59,13 @@ async def add_dog(
         photo_url=dog_data.photo_url,
     )
     db.add(new_dog)
+    db.flush()
+    record_event(
+        db, pack_id, "dog.created", Dog.model_validate(new_dog).model_dump(mode="json")
+    )
     db.commit()
     db.refresh(new_dog)
+    bus.publish(f"pack:{pack_id}:dog")
 
     return new_dog
 
@@ -57,7 +74,7 @@ async def add_dog(
 async def get_dog(
     pack_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db_for_pack),
 ):
     """
     Get the dog profile for a pack. User must be a member of the pack.
@@ -81,7 +98,7 @@ async def update_dog(
     pack_id: int,
     dog_data: DogUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_for_pack),
 ):
     """
     Update a dog's information. User must be a member of the pack.
@@ -107,7 +124,115 @@ async def update_dog(
     if dog_data.photo_url is not None:
         dog.photo_url = dog_data.photo_url
 
+    db.flush()
+    record_event(
+        db, pack_id, "dog.updated", Dog.model_validate(dog).model_dump(mode="json")
+    )
+    db.commit()
+    db.refresh(dog)
+    bus.publish(f"pack:{pack_id}:dog")
+
+    return dog
+
+
+@router.post("/packs/{pack_id}/dog/photo", response_model=Dog, tags=["dogs"])
+async def upload_dog_photo(
+    pack_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_for_pack),
+):
+    """
+    Upload the dog's photo as the 'photo' field of a multipart/form-data body.
+    User must be a member of the pack.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    # Get the dog
+    dog_id = db.query(DogModel.id).filter(DogModel.pack_id == pack_id).scalar()
+    if dog_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No dog found for this pack",
+        )
+
+    # Don't hold a pooled connection while a slow client streams the body
+    db.rollback()
+    upload = await receive_photo_upload(request)
+
+    # Only store the photo if the dog is still there, so none is orphaned
+    try:
+        dog = db.get(DogModel, dog_id)
+        if not dog:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No dog found for this pack",
+            )
+        photo_key = upload.store()
+    finally:
+        upload.discard()
+    schedule_thumbnails(photo_key)
+
+    # The URL changes with the content, so clients can cache it forever
+    dog.photo_key = photo_key
+    dog.photo_url = photo_url(pack_id, photo_key)
     db.commit()
     db.refresh(dog)
+    bus.publish(f"pack:{pack_id}:dog")
 
     return dog
+
+
+@router.get("/packs/{pack_id}/dog/photo", tags=["dogs"])
+async def get_dog_photo(
+    pack_id: int,
+    request: Request,
+    size: int | None = Query(None, description="Thumbnail size; omit for original"),
+    v: str | None = Query(None, description="Photo version, from photo_url"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db_for_pack),
+):
+    """
+    Get the dog's uploaded photo or one of its thumbnails.
+    User must be a member of the pack.
+    Supports ETag revalidation and Range requests. Responses are cacheable
+    forever only under the current photo's versioned URL; others must be
+    revalidated, so a new upload shows up straight away.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    dog = db.query(DogModel).filter(DogModel.pack_id == pack_id).first()
+    if not dog or not dog.photo_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No photo found for this dog",
+        )
+    if size is not None and size not in settings.photo_thumbnail_sizes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Size must be one of: {settings.photo_thumbnail_sizes}",
+        )
+
+    path = original_path(dog.photo_key)
+    media_type = MEDIA_TYPES[dog.photo_key.rsplit(".", 1)[1]]
+    etag = f'"{dog.photo_key.split(".")[0]}"'
+    immutable = v == photo_version(dog.photo_key)
+    if size is not None:
+        thumbnail = thumbnail_path(dog.photo_key, size)
+        if thumbnail.exists():
+            path, media_type = thumbnail, "image/jpeg"
+            etag = f'"{dog.photo_key.split(".")[0]}-{size}"'
+        else:
+            # Still being generated; serve the original for now
+            immutable = False
+    cache_control = (
+        "private, max-age=31536000, immutable" if immutable else "private, no-cache"
+    )
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -0,0 +1,67 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, joinedload
+
+from app.auth.deps import get_current_user, get_read_db_for_pack
+from app.leaderboard.counters import month_counters, month_start
+from app.models.pack_member import PackMember
+from app.models.user import User
+from app.routers.packs import verify_pack_member
+from app.schemas.leaderboard import Leaderboard
+
+router = APIRouter()
+
+
+@router.get(
+    "/packs/{pack_id}/leaderboard", response_model=Leaderboard, tags=["leaderboard"]
+)
+async def get_leaderboard(
+    pack_id: int,
+    month: str | None = Query(
+        None, pattern=r"^\d{4}-\d{2}$", description="YYYY-MM (default: this month)"
+    ),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db_for_pack),
+):
+    """
+    Get how many activities each member logged in a month, per activity
+    type. User must be a member of the pack.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    try:
+        first_day = month_start(
+            datetime.strptime(month, "%Y-%m") if month else datetime.utcnow()
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid month",
+        )
+
+    by_user: dict[int, dict[int, int]] = {}
+    for counter in month_counters(db, pack_id, first_day):
+        by_user.setdefault(counter.user_id, {})[counter.activity_type_id] = (
+            counter.count
+        )
+
+    # Current members only, including those who logged nothing this month
+    members = (
+        db.query(PackMember)
+        .options(joinedload(PackMember.user))
+        .filter(PackMember.pack_id == pack_id)
+        .all()
+    )
+    entries = [
+        {
+            "user": member.user,
+            "total": sum(by_user.get(member.user_id, {}).values()),
+            "by_activity_type": by_user.get(member.user_id, {}),
+        }
+        for member in members
+    ]
+    entries.sort(key=lambda entry: (-entry["total"], entry["user"].name))
+
+    return {"month": first_day, "entries": entries}
@@ -1,11 +1,18 @@
+import heapq
 import secrets
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
 
-from app.auth.deps import get_current_user
+from app.auth.deps import get_current_user, get_db_for_pack, get_read_db_for_pack
+from app.auth.memberships import bump_membership_version
+from app.cache.bus import bus
 from app.db import get_db
+from app.jobs.queue import enqueue
+from app.models.activity_log import ActivityLog
+from app.models.dog import Dog
 from app.models.pack import Pack
 from app.models.pack_invitation import PackInvitation
 from app.models.pack_member import PackMember
@@ -14,6 +21,7 @@ from app.schemas.pack import (
     AcceptInvitation,
     PackCreate,
     PackInvitationCreate,
+    PackOverview,
     PackWithMembers,
 )
 from app.schemas.pack import (
@@ -22,6 +30,8 @@ from app.schemas.pack import (
 from app.schemas.pack import (
     PackInvitation as PackInvitationSchema,
 )
+from app.sharding import shards
+from app.webhooks.outbox import record_event
 
 router = APIRouter(prefix="/packs", tags=["packs"])
 
@@ -47,9 +57,21 @@ async def verify_pack_member(
     Raises:
         HTTPException: If user is not a member or doesn't have the required role
     """
+    # Roles from the access token need no query. Packs it doesn't list (or a
+    # stale token) are checked in the database, which also tells 404 from 403.
+    role = user.pack_roles.get(pack_id) if user.pack_roles else None
+    if role is not None:
+        if required_roles and role not in required_roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Insufficient permissions. Required roles: {', '.join(required_roles)}",
+            )
+        # Not loaded from the session: only good for reading the role
+        return PackMember(pack_id=pack_id, user_id=user.id, role=role)
+
     # Check if pack exists
     pack = db.query(Pack).filter(Pack.id == pack_id).first()
-    if not pack:
+    if not pack or pack.deleted_at is not None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Pack not found"
         )
@@ -86,43 +108,108 @@ async def create_pack(
     """
     Create a new pack. The creator automatically becomes the owner.
     """
-    # Create the pack
-    new_pack = Pack(
-        name=pack_data.name,
-        created_by=current_user.id,
-    )
-    db.add(new_pack)
-    db.flush()  # Get the pack ID
+    # With several shards the ID is allocated first: it decides the shard
+    pack_id = shards.allocate_pack_id()
+
+    with shards.pack_session(pack_id, db) as pack_db:
+        # Create the pack
+        new_pack = Pack(
+            id=pack_id,
+            name=pack_data.name,
+            created_by=current_user.id,
+        )
+        pack_db.add(new_pack)
+        pack_db.flush()  # Get the pack ID
+
+        # Create the owner membership
+        owner_member = PackMember(
+            pack_id=new_pack.id,
+            user_id=current_user.id,
+            role="owner",
+        )
+        pack_db.add(owner_member)
+        pack_db.commit()
+        pack_db.refresh(new_pack)
+        bump_membership_version(db, current_user.id)
+        bus.publish(f"user:{current_user.id}:packs")
+
+        return PackSchema.model_validate(new_pack)
+
+
+def _pack_overviews(
+    db: Session, user_id: int, details: bool, limit: int | None, after_id: int | None
+) -> list[PackOverview]:
+    """One shard's page of a user's packs, ordered by pack ID (limit + 1 rows)."""
+    columns = [Pack, PackMember.role]
+    if details:
+        member_count = (
+            select(func.count(PackMember.id))
+            .where(PackMember.pack_id == Pack.id)
+            .correlate(Pack)
+            .scalar_subquery()
+        )
+        last_activity_at = (
+            select(func.max(ActivityLog.logged_at))
+            .where(ActivityLog.pack_id == Pack.id)
+            .correlate(Pack)
+            .scalar_subquery()
+        )
+        columns += [Dog.name, Dog.photo_url, member_count, last_activity_at]
 
-    # Create the owner membership
-    owner_member = PackMember(
-        pack_id=new_pack.id,
-        user_id=current_user.id,
-        role="owner",
+    # Memberships and packs in one query, keyset-paginated on pack ID
+    query = db.query(*columns).join(
+        PackMember,
+        and_(PackMember.pack_id == Pack.id, PackMember.user_id == user_id),
     )
-    db.add(owner_member)
-    db.commit()
-    db.refresh(new_pack)
-
-    return new_pack
+    if details:
+        query = query.outerjoin(Dog, Dog.pack_id == Pack.id)
+    if after_id is not None:
+        query = query.filter(Pack.id > after_id)
+    query = query.order_by(Pack.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    detail_fields = ("dog_name", "dog_photo_url", "member_count", "last_activity_at")
+    return [
+        PackOverview.model_validate(pack).model_copy(
+            update={"role": role, **dict(zip(detail_fields, extra))}
+        )
+        for pack, role, *extra in query.all()
+    ]
 
 
-@router.get("", response_model=list[PackSchema])
+@router.get("", response_model=list[PackOverview])
 async def list_packs(
+    response: Response,
+    details: bool = Query(
+        False, description="Include dog, member count and last activity"
+    ),
+    limit: int | None = Query(None, ge=1, le=200, description="Page size"),
+    after_id: int | None = Query(
+        None, description="Cursor: the X-Next-Cursor of the previous page"
+    ),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """
-    List all packs that the current user is a member of.
+    List all packs that the current user is a member of, ordered by pack ID,
+    with the user's role in each.
+
+    With details=true, each pack also carries its dog's name and photo, its
+    member count and the time of its last activity, all from one query.
+    With a limit, results are paginated by pack ID; the X-Next-Cursor header
+    holds the after_id for the next page.
+
+    Every shard is queried concurrently and the sorted pages are merged.
     """
-    # Get all pack memberships for the user
-    memberships = (
-        db.query(PackMember).filter(PackMember.user_id == current_user.id).all()
+    pages = await shards.fan_out(
+        lambda db: _pack_overviews(db, current_user.id, details, limit, after_id),
+        last_write_at=current_user.last_write_at,
     )
+    packs = list(heapq.merge(*pages, key=lambda pack: pack.id))
 
-    # Get the packs
-    pack_ids = [m.pack_id for m in memberships]
-    packs = db.query(Pack).filter(Pack.id.in_(pack_ids)).all()
+    if limit is not None and len(packs) > limit:
+        packs = packs[:limit]
+        response.headers["X-Next-Cursor"] = str(packs[-1].id)
 
     return packs
 
@@ -131,7 +218,7 @@ async def list_packs(
 async def get_pack(
     pack_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db_for_pack),
 ):
     """
     Get pack details with members. User must be a member of the pack.
@@ -145,6 +232,103 @@ async def get_pack(
     return pack
 
 
+@router.delete("/{pack_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_pack(
+    pack_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_for_pack),
+    primary_db: Session = Depends(get_db),
+):
+    """
+    Delete a pack. Only the owner can delete it.
+
+    The pack is marked deleted and its members and invitations removed
+    straight away; its
+    activity history is purged by a background job in small batches, so a
+    large pack doesn't hold locks for long.
+    """
+    # Verify user is the owner
+    await verify_pack_member(pack_id, current_user, db, required_roles=["owner"])
+
+    member_ids = [
+        user_id
+        for (user_id,) in db.query(PackMember.user_id).filter(
+            PackMember.pack_id == pack_id
+        )
+    ]
+    db.query(Pack).filter(Pack.id == pack_id).update(
+        {Pack.deleted_at: datetime.utcnow()}, synchronize_session=False
+    )
+    db.query(PackMember).filter(PackMember.pack_id == pack_id).delete(
+        synchronize_session=False
+    )
+    db.query(PackInvitation).filter(PackInvitation.pack_id == pack_id).delete(
+        synchronize_session=False
+    )
+    enqueue(db, "purge_pack", {"pack_id": pack_id})
+
+    db.commit()
+    bump_membership_version(primary_db, *member_ids)
+    bus.publish(
+        f"pack:{pack_id}:members",
+        f"pack:{pack_id}:dog",
+        f"pack:{pack_id}:activities",
+        f"pack:{pack_id}:activity_types",
+        f"pack:{pack_id}:invitations",
+        f"pack:{pack_id}:schedules",
+        *(f"user:{user_id}:packs" for user_id in member_ids),
+    )
+
+
+@router.delete("/{pack_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def remove_member(
+    pack_id: int,
+    user_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_for_pack),
+    primary_db: Session = Depends(get_db),
+):
+    """
+    Remove a member from a pack. Any member can leave; owners and admins can
+    remove members, and only the owner can remove admins. The owner can't be
+    removed: delete the pack instead.
+    """
+    # Verify user is a member of the pack
+    member = await verify_pack_member(pack_id, current_user, db)
+
+    if user_id != current_user.id and member.role not in ("owner", "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions. Required roles: owner, admin",
+        )
+    target = (
+        db.query(PackMember)
+        .filter(PackMember.pack_id == pack_id, PackMember.user_id == user_id)
+        .first()
+    )
+    if not target:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Member not found",
+        )
+    if user_id != current_user.id and target.role == "admin" and member.role != "owner":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the owner can remove admins",
+        )
+
+    if target.role == "owner":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The owner can't be removed from the pack",
+        )
+
+    db.delete(target)
+    db.commit()
+    bump_membership_version(primary_db, user_id)
+    bus.publish(f"pack:{pack_id}:members", f"user:{user_id}:packs")
+
+
 @router.post(
     "/{pack_id}/invitations",
     response_model=PackInvitationSchema,
@@ -154,7 +338,7 @@ async def create_invitation(
     pack_id: int,
     invitation_data: PackInvitationCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_db_for_pack),
 ):
     """
     Invite a user to a pack by email. Only owners and admins can invite.
@@ -207,12 +391,24 @@ async def create_invitation(
         expires_at=datetime.utcnow() + timedelta(days=7),
     )
     db.add(invitation)
+    db.flush()  # Get the invitation ID
+
+    # Email delivery runs in a job once the invitation is committed
+    enqueue(db, "send_invitation_email", {"invitation_id": invitation.id})
+
     db.commit()
     db.refresh(invitation)
+    bus.publish(f"pack:{pack_id}:invitations")
 
     return invitation
 
 
+def _invitation_pack_id(db: Session, token: str) -> int | None:
+    return (
+        db.query(PackInvitation.pack_id).filter(PackInvitation.token == token).scalar()
+    )
+
+
 @router.post("/invitations/accept", response_model=PackSchema)
 async def accept_invitation(
     accept_data: AcceptInvitation,
@@ -222,12 +418,25 @@ async def accept_invitation(
     """
     Accept a pack invitation using the invitation token.
     """
+    # Tokens don't say which shard holds them, so ask every shard
+    if len(shards) == 1:
+        pack_id = _invitation_pack_id(db, accept_data.token)
+    else:
+        found = await shards.fan_out(
+            lambda shard_db: _invitation_pack_id(shard_db, accept_data.token),
+            primary=True,
+        )
+        pack_id = next((p for p in found if p is not None), None)
+
+    with shards.pack_session(pack_id, db) as pack_db:
+        pack = _accept_invitation(pack_db, accept_data.token, current_user)
+    bump_membership_version(db, current_user.id)
+    return pack
+
+
+def _accept_invitation(db: Session, token: str, current_user: User) -> PackSchema:
     # Find the invitation
-    invitation = (
-        db.query(PackInvitation)
-        .filter(PackInvitation.token == accept_data.token)
-        .first()
-    )
+    invitation = db.query(PackInvitation).filter(PackInvitation.token == token).first()
 
     if not invitation:
         raise HTTPException(
@@ -283,8 +492,22 @@ async def accept_invitation(
     # Mark invitation as accepted
     invitation.accepted_at = datetime.utcnow()
 
+    db.flush()
+    record_event(
+        db,
+        invitation.pack_id,
+        "member.joined",
+        {
+            "user_id": current_user.id,
+            "name": current_user.name,
+            "role": new_member.role,
+            "joined_at": new_member.joined_at.isoformat(),
+        },
+    )
+
     db.commit()
+    bus.publish(f"pack:{invitation.pack_id}:members", f"user:{current_user.id}:packs")
 
     # Return the pack
     pack = db.query(Pack).filter(Pack.id == invitation.pack_id).first()
-    return pack
+    return PackSchema.model_validate(pack)
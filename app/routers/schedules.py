@@ -0,0 +1,157 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.auth.deps import get_current_user, get_db_for_pack, get_read_db_for_pack
+from app.cache.bus import bus
+from app.models.activity_type import ActivityType
+from app.models.care_schedule import CareSchedule as CareScheduleModel
+from app.models.user import User
+from app.reminders.engine import find_overdue, latest_logged_at, next_due
+from app.routers.packs import verify_pack_member
+from app.schemas.care_schedule import CareSchedule, CareScheduleCreate
+
+router = APIRouter()
+
+
+@router.post(
+    "/packs/{pack_id}/schedules",
+    response_model=CareSchedule,
+    status_code=status.HTTP_201_CREATED,
+    tags=["schedules"],
+)
+async def create_schedule(
+    pack_id: int,
+    schedule_data: CareScheduleCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_for_pack),
+):
+    """
+    Create a care schedule, e.g. "Medication every 12 hours".
+    User must be a member of the pack.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    # Verify activity type exists and is available to this pack
+    activity_type = (
+        db.query(ActivityType)
+        .filter(ActivityType.id == schedule_data.activity_type_id)
+        .first()
+    )
+    if not activity_type:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Activity type not found",
+        )
+    if activity_type.pack_id is not None and activity_type.pack_id != pack_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Activity type belongs to a different pack",
+        )
+
+    # Start from the latest matching activity
+    last_logged_at = latest_logged_at(db, pack_id, schedule_data.activity_type_id)
+    schedule = CareScheduleModel(
+        pack_id=pack_id,
+        activity_type_id=schedule_data.activity_type_id,
+        interval_minutes=schedule_data.interval_minutes,
+        last_logged_at=last_logged_at,
+        next_due_at=next_due(last_logged_at, schedule_data.interval_minutes),
+        created_by=current_user.id,
+    )
+
+    try:
+        db.add(schedule)
+        db.commit()
+        db.refresh(schedule)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This pack already has a schedule for this activity type",
+        )
+    bus.publish(f"pack:{pack_id}:schedules")
+
+    return schedule
+
+
+@router.get(
+    "/packs/{pack_id}/schedules",
+    response_model=list[CareSchedule],
+    tags=["schedules"],
+)
+async def list_schedules(
+    pack_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db_for_pack),
+):
+    """
+    List a pack's care schedules, soonest due first.
+    User must be a member of the pack.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    return (
+        db.query(CareScheduleModel)
+        .filter(CareScheduleModel.pack_id == pack_id)
+        .order_by(CareScheduleModel.next_due_at)
+        .all()
+    )
+
+
+@router.get(
+    "/packs/{pack_id}/schedules/overdue",
+    response_model=list[CareSchedule],
+    tags=["schedules"],
+)
+async def list_overdue_schedules(
+    pack_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db_for_pack),
+):
+    """
+    List a pack's overdue care schedules, most overdue first.
+    User must be a member of the pack.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    return find_overdue(db, pack_id=pack_id)
+
+
+@router.delete(
+    "/packs/{pack_id}/schedules/{schedule_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=["schedules"],
+)
+async def delete_schedule(
+    pack_id: int,
+    schedule_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_for_pack),
+):
+    """
+    Delete a care schedule. User must be a member of the pack.
+    """
+    # Verify user is a member of the pack
+    await verify_pack_member(pack_id, current_user, db)
+
+    schedule = (
+        db.query(CareScheduleModel)
+        .filter(
+            CareScheduleModel.id == schedule_id,
+            CareScheduleModel.pack_id == pack_id,
+        )
+        .first()
+    )
+    if not schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Schedule not found",
+        )
+
+    db.delete(schedule)
+    db.commit()
+    bus.publish(f"pack:{pack_id}:schedules")
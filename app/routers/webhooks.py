@@ -0,0 +1,121 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.auth.deps import get_current_user, get_db_for_pack, get_read_db_for_pack
+from app.models.user import User
+from app.models.webhook import WebhookSubscription as WebhookSubscriptionModel
+from app.routers.packs import verify_pack_member
+from app.schemas.webhook import (
+    WebhookSubscription,
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionCreated,
+)
+from app.webhooks.destinations import check_destination
+
+router = APIRouter()
+
+
+@router.post(
+    "/packs/{pack_id}/webhooks",
+    response_model=WebhookSubscriptionCreated,
+    status_code=status.HTTP_201_CREATED,
+    tags=["webhooks"],
+)
+async def create_webhook(
+    pack_id: int,
+    webhook_data: WebhookSubscriptionCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_for_pack),
+):
+    """
+    Subscribe a URL to the pack's events. Only owners and admins can manage
+    webhooks. The URL's host must be public. The response holds the secret
+    deliveries are signed with.
+    """
+    # Verify user is owner or admin
+    await verify_pack_member(
+        pack_id, current_user, db, required_roles=["owner", "admin"]
+    )
+
+    try:
+        await check_destination(str(webhook_data.url))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    subscription = WebhookSubscriptionModel(
+        pack_id=pack_id,
+        url=str(webhook_data.url),
+        secret=secrets.token_urlsafe(32),
+        event_types=webhook_data.event_types,
+        created_by=current_user.id,
+    )
+    db.add(subscription)
+    db.commit()
+    db.refresh(subscription)
+
+    return subscription
+
+
+@router.get(
+    "/packs/{pack_id}/webhooks",
+    response_model=list[WebhookSubscription],
+    tags=["webhooks"],
+)
+async def list_webhooks(
+    pack_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db_for_pack),
+):
+    """
+    List the pack's webhook subscriptions. Only owners and admins can manage
+    webhooks.
+    """
+    # Verify user is owner or admin
+    await verify_pack_member(
+        pack_id, current_user, db, required_roles=["owner", "admin"]
+    )
+
+    return (
+        db.query(WebhookSubscriptionModel)
+        .filter(WebhookSubscriptionModel.pack_id == pack_id)
+        .order_by(WebhookSubscriptionModel.id)
+        .all()
+    )
+
+
+@router.delete(
+    "/packs/{pack_id}/webhooks/{webhook_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    tags=["webhooks"],
+)
+async def delete_webhook(
+    pack_id: int,
+    webhook_id: int,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db_for_pack),
+):
+    """
+    Delete a webhook subscription and its undelivered events. Only owners and
+    admins can manage webhooks.
+    """
+    # Verify user is owner or admin
+    await verify_pack_member(
+        pack_id, current_user, db, required_roles=["owner", "admin"]
+    )
+
+    deleted = (
+        db.query(WebhookSubscriptionModel)
+        .filter(
+            WebhookSubscriptionModel.id == webhook_id,
+            WebhookSubscriptionModel.pack_id == pack_id,
+        )
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Webhook not found",
+        )
+    db.commit()
@@ -3,6 +3,7 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field
 
 from app.schemas.activity_type import ActivityType
+from app.schemas.datetimes import UTCDateTime
 from app.schemas.user import User
 
 
@@ -11,7 +12,7 @@ class ActivityLogCreate(BaseModel):
 
     activity_type_id: int
     notes: str | None = None
-    logged_at: datetime | None = Field(default_factory=datetime.utcnow)
+    logged_at: UTCDateTime | None = Field(default_factory=datetime.utcnow)
 
 
 class ActivityLog(BaseModel):
@@ -44,3 +45,24 @@ class ActivityLogWithDetails(BaseModel):
     created_at: datetime
     activity_type: ActivityType
     user: User
+
+
+class CompactActivityHistory(BaseModel):
+    """
+    Schema for a page of activity history with format=compact. Activities
+    carry ids only (narrowed further by ?fields=), and each user and activity
+    type they refer to is sent once, keyed by id.
+    """
+
+    activities: list[ActivityLog]
+    users: dict[str, User]
+    activity_types: dict[str, ActivityType]
+
+
+class ActivitySearchHit(BaseModel):
+    """Schema for an activity log matching a notes search."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    activity: ActivityLogWithDetails
+    rank: float
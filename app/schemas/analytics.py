@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class IntervalStats(BaseModel):
+    """Gaps between consecutive activities of one type."""
+
+    mean_hours: float | None
+    p90_hours: float | None
+    regularity: float | None  # 1 = perfectly even spacing, 0 = erratic
+
+
+class ActivityTypeTrend(BaseModel):
+    activity_type_id: int
+    count: int
+    intervals: IntervalStats
+    daily_counts: list[int]
+    moving_average: list[float]
+
+
+class PackAnalytics(BaseModel):
+    """Schema for pack activity analytics."""
+
+    start: datetime
+    end: datetime
+    total: int
+    heatmap: list[list[int]]  # 7 weekdays (Monday first) x 24 hours
+    activity_types: list[ActivityTypeTrend]
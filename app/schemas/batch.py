@@ -0,0 +1,31 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+
+class BatchSubRequest(BaseModel):
+    """One API call in a batch; path is relative to the server, e.g. /api/v1/packs."""
+
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(pattern=r"^/api/v1/")
+    body: Any = None
+
+
+class BatchRequest(BaseModel):
+    """Schema for a batch of API calls."""
+
+    requests: list[BatchSubRequest] = Field(min_length=1)
+
+
+class BatchSubResponse(BaseModel):
+    """The outcome of one sub-request: its status, headers and decoded body."""
+
+    status: int
+    headers: dict[str, str]
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    """Schema for batch response; responses are in request order."""
+
+    responses: list[BatchSubResponse]
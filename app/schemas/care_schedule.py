@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+
+class CareScheduleCreate(BaseModel):
+    """Schema for creating a care schedule."""
+
+    activity_type_id: int
+    interval_minutes: int = Field(gt=0)
+
+
+class CareSchedule(BaseModel):
+    """Schema for care schedule response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    pack_id: int
+    activity_type_id: int
+    interval_minutes: int
+    last_logged_at: datetime | None
+    next_due_at: datetime
+    created_at: datetime
+
+    @computed_field
+    @property
+    def is_overdue(self) -> bool:
+        return self.next_due_at <= datetime.utcnow()
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+
+from app.schemas.activity_log import ActivityLogWithDetails
+from app.schemas.activity_type import ActivityType
+from app.schemas.dog import Dog
+from app.schemas.pack import PackWithMembers
+from app.schemas.user import User
+
+
+class PackDashboard(BaseModel):
+    """Schema for everything the app shows when it opens a pack."""
+
+    me: User
+    pack: PackWithMembers
+    dog: Dog | None
+    activity_types: list[ActivityType]
+    recent_activities: list[ActivityLogWithDetails]
@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """
+    Timestamps are stored as naive UTC; convert aware ones (e.g. with a "Z"
+    or "+02:00" suffix) so they compare with stored values.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+# A datetime from a client, as naive UTC
+UTCDateTime = Annotated[datetime, AfterValidator(to_naive_utc)]
@@ -1,6 +1,9 @@
 from datetime import date, datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+from app.config import settings
+from app.media.photos import photo_url
 
 
 class DogCreate(BaseModel):
@@ -33,3 +36,15 @@ class Dog(BaseModel):
     birth_date: date | None
     photo_url: str | None
     created_at: datetime
+    photo_key: str | None = Field(default=None, exclude=True)
+
+    @computed_field
+    @property
+    def thumbnail_urls(self) -> dict[int, str]:
+        """Versioned URL per thumbnail size of the uploaded photo."""
+        if self.photo_key is None:
+            return {}
+        return {
+            size: photo_url(self.pack_id, self.photo_key, size)
+            for size in settings.photo_thumbnail_sizes
+        }
@@ -0,0 +1,20 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+from app.schemas.user import User
+
+
+class LeaderboardEntry(BaseModel):
+    """A member's activity counts for the month."""
+
+    user: User
+    total: int
+    by_activity_type: dict[int, int]  # activity type ID -> count
+
+
+class Leaderboard(BaseModel):
+    """Schema for a pack's monthly leaderboard, most active member first."""
+
+    month: date
+    entries: list[LeaderboardEntry]
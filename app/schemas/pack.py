@@ -19,6 +19,14 @@ class Pack(BaseModel):
         from_attributes = True
 
 
+class PackOverview(Pack):
+    role: str | None = None
+    dog_name: str | None = None
+    dog_photo_url: str | None = None
+    member_count: int | None = None
+    last_activity_at: datetime | None = None
+
+
 class PackMemberSchema(BaseModel):
     id: int
     user_id: int
@@ -41,6 +41,8 @@ class TokenPayload(BaseModel):
     sub: str  # user id as string
     exp: int
     type: str  # "access" or "refresh"
+    pm: str | None = None  # encoded pack roles, see auth.memberships
+    mv: int | None = None  # membership version the pack roles are from
 
     @property
     def user_id(self) -> int:
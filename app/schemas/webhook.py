@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import AnyHttpUrl, BaseModel, ConfigDict
+
+EventType = Literal["activity.logged", "dog.created", "dog.updated", "member.joined"]
+
+
+class WebhookSubscriptionCreate(BaseModel):
+    """Schema for creating a webhook subscription."""
+
+    url: AnyHttpUrl
+    event_types: list[EventType] | None = None  # every event type when omitted
+
+
+class WebhookSubscription(BaseModel):
+    """Schema for webhook subscription response."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    pack_id: int
+    url: str
+    event_types: list[str] | None
+    active: bool
+    created_at: datetime
+
+
+class WebhookSubscriptionCreated(WebhookSubscription):
+    """The new subscription, with the signing secret; it is only shown once."""
+
+    secret: str
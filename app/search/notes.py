@@ -0,0 +1,221 @@
+"""
+Ranked full-text search over ActivityLog.notes, scoped to one pack.
+
+On Postgres this uses the generated ``notes_tsv`` column and its GIN index
+(see ``NOTES_SEARCH_DDL``). Other databases (SQLite in tests and small
+deployments) use an in-process inverted index per pack, built lazily on the
+first search. Every search first indexes the pack's activities with IDs
+above the last one seen, a cheap range query, so new activities show up
+without relying on invalidation messages. Deletions are found by comparing
+row counts, after an invalidation or at least every
+cache_max_staleness_seconds; the index is then rebuilt.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import func, literal_column, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, joinedload
+
+from app.cache.bus import bus
+from app.config import settings
+from app.models.activity_log import NOTES_SEARCH_DDL, ActivityLog
+
+SEARCH_CONFIG = "english"
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(value: str) -> list[str]:
+    return _TOKEN_RE.findall(value.lower())
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Add the tsvector column and GIN index to an existing Postgres table."""
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        for statement in NOTES_SEARCH_DDL:
+            connection.execute(text(statement))
+
+
+class PackNotesIndex:
+    """Inverted index of one pack's notes: term -> {activity id: term count}."""
+
+    def __init__(self):
+        self.postings: dict[str, dict[int, int]] = {}
+        self.logged_at: dict[int, datetime] = {}
+        self.max_id = 0
+        # Whether deletions must be checked for before the next search
+        self.stale = True
+        self.checked_at = 0.0
+        # Held while catching up and searching; other packs aren't blocked
+        self.lock = threading.Lock()
+
+    def clear(self) -> None:
+        self.postings = {}
+        self.logged_at = {}
+        self.max_id = 0
+
+    def add(self, activity_id: int, notes: str, logged_at: datetime) -> None:
+        for term in tokenize(notes):
+            docs = self.postings.setdefault(term, {})
+            docs[activity_id] = docs.get(activity_id, 0) + 1
+        self.logged_at[activity_id] = logged_at
+        self.max_id = max(self.max_id, activity_id)
+
+    def search(self, query: str) -> list[tuple[int, float]]:
+        """
+        Return (activity id, score) for notes containing every query term,
+        best first. The last term also matches as a prefix ("vom" finds
+        "vomited"), so results update while the user is typing.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        total = max(len(self.logged_at), 1)
+        scores: dict[int, float] | None = None
+        for position, term in enumerate(terms):
+            if position == len(terms) - 1:
+                matching = [t for t in self.postings if t.startswith(term)]
+            else:
+                matching = [term] if term in self.postings else []
+
+            term_scores: dict[int, float] = {}
+            for match in matching:
+                docs = self.postings[match]
+                idf = math.log(1 + total / len(docs))
+                for activity_id, count in docs.items():
+                    term_scores[activity_id] = term_scores.get(
+                        activity_id, 0.0
+                    ) + idf * count / (count + 1)
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {
+                    activity_id: score + term_scores[activity_id]
+                    for activity_id, score in scores.items()
+                    if activity_id in term_scores
+                }
+            if not scores:
+                return []
+
+        return sorted(
+            scores.items(),
+            key=lambda item: (item[1], self.logged_at[item[0]]),
+            reverse=True,
+        )
+
+
+class NotesIndex:
+    """Per-pack PackNotesIndex objects, LRU-bounded by pack count."""
+
+    def __init__(self, max_packs: int = 256, max_staleness: float | None = None):
+        self.max_packs = max_packs
+        self.max_staleness = (
+            settings.cache_max_staleness_seconds
+            if max_staleness is None
+            else max_staleness
+        )
+        self._packs: OrderedDict[int, PackNotesIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pack_index(self, pack_id: int) -> PackNotesIndex:
+        with self._lock:
+            index = self._packs.get(pack_id)
+            if index is None:
+                index = self._packs[pack_id] = PackNotesIndex()
+                if len(self._packs) > self.max_packs:
+                    self._packs.popitem(last=False)
+            self._packs.move_to_end(pack_id)
+            return index
+
+    def search(self, db: Session, pack_id: int, query: str) -> list[tuple[int, float]]:
+        index = self._pack_index(pack_id)
+        with index.lock:
+            self._catch_up(db, pack_id, index)
+            return index.search(query)
+
+    def _catch_up(self, db: Session, pack_id: int, index: PackNotesIndex) -> None:
+        with_notes = (ActivityLog.pack_id == pack_id, ActivityLog.notes.isnot(None))
+
+        # Activities are only deleted with their pack; if the indexed range
+        # lost rows, start over
+        now = time.monotonic()
+        if index.stale or now - index.checked_at > self.max_staleness:
+            index.stale = False
+            index.checked_at = now
+            remaining = (
+                db.query(func.count(ActivityLog.id))
+                .filter(*with_notes, ActivityLog.id <= index.max_id)
+                .scalar()
+            )
+            if remaining != len(index.logged_at):
+                index.clear()
+
+        # Otherwise activities are append-only: index the rows written since
+        # the last one we saw
+        rows = (
+            db.query(ActivityLog.id, ActivityLog.notes, ActivityLog.logged_at)
+            .filter(*with_notes, ActivityLog.id > index.max_id)
+            .all()
+        )
+        for activity_id, notes, logged_at in rows:
+            index.add(activity_id, notes, logged_at)
+
+    def invalidate(self, keys: list[str]) -> None:
+        for key in keys:
+            parts = key.split(":")
+            if len(parts) == 3 and parts[0] == "pack" and parts[2] == "activities":
+                index = self._packs.get(int(parts[1]))
+                if index is not None:
+                    index.stale = True
+
+
+notes_index = NotesIndex()
+bus.subscribe(notes_index.invalidate)
+
+
+def search_notes(
+    db: Session, pack_id: int, query: str, limit: int, offset: int
+) -> list[tuple[ActivityLog, float]]:
+    """Return one page of a pack's activities matching ``query``, best first."""
+    details = (joinedload(ActivityLog.activity_type), joinedload(ActivityLog.user))
+
+    if db.get_bind().dialect.name == "postgresql":
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        notes_tsv = literal_column("activity_logs.notes_tsv")
+        rank = func.ts_rank_cd(notes_tsv, ts_query)
+        rows = (
+            db.query(ActivityLog, rank.label("rank"))
+            .options(*details)
+            .filter(ActivityLog.pack_id == pack_id, notes_tsv.op("@@")(ts_query))
+            .order_by(rank.desc(), ActivityLog.logged_at.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        return [(activity, float(score)) for activity, score in rows]
+
+    page = notes_index.search(db, pack_id, query)[offset : offset + limit]
+    if not page:
+        return []
+    activities = {
+        activity.id: activity
+        for activity in db.query(ActivityLog)
+        .options(*details)
+        .filter(ActivityLog.id.in_([activity_id for activity_id, _ in page]))
+        .all()
+    }
+    return [
+        (activities[activity_id], score)
+        for activity_id, score in page
+        if activity_id in activities
+    ]
@@ -0,0 +1,33 @@
+"""
+Create tables and seed default data.
+
+Run once per deploy (not per worker) with: python -m app.seed
+"""
+
+import app.models  # noqa: F401  (register all tables)
+from app.db import Base, SessionLocal
+from app.search.notes import ensure_search_index
+from app.seed.activity_types import seed_activity_types
+from app.seed.items import seed_items
+from app.sharding import shards
+
+
+def main():
+    for shard_engine in shards.engines:
+        Base.metadata.create_all(bind=shard_engine)
+        ensure_search_index(shard_engine)
+    db = SessionLocal()
+    try:
+        seed_items(db)
+    finally:
+        db.close()
+    for shard_sessionmaker in shards.sessionmakers:
+        db = shard_sessionmaker()
+        try:
+            seed_activity_types(db)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+from sqlalchemy.orm import Session
+
+from app.models.item import Item
+
+
+def seed_items(db: Session):
+    """Seed the database with sample items if empty"""
+    if db.query(Item).count() == 0:
+        sample_items = [
+            Item(
+                name="Widget", description="A useful widget for your desk", price=9.99
+            ),
+            Item(name="Gadget", description="A fancy gadget with buttons", price=19.99),
+            Item(
+                name="Gizmo",
+                description="An amazing gizmo that does things",
+                price=29.99,
+            ),
+        ]
+        db.add_all(sample_items)
+        db.commit()
+        print("Database seeded with sample items")
@@ -0,0 +1,170 @@
+"""
+Horizontal sharding of pack-scoped data by pack_id.
+
+Shard 0 is the primary database (database_url), which also holds the global
+tables (users, items, pack ID allocations). Extra shards are listed in
+shard_database_urls. Every shard has the full schema: a pack and all of its
+rows (members, invitations, dog, activity types and logs, schedules,
+counters, jobs enqueued with them) live on the shard its ID hashes to, and
+users are copied to every shard at signup so pack queries can still join
+them.
+
+pack_id -> shard is a consistent-hash ring with virtual nodes, so routing
+needs no lookup. Adding a shard remaps about 1/N of the packs, which have to
+be moved before it goes live; shards are named by position, so only ever
+append to shard_database_urls. With no extra shards every pack maps to the
+primary and nothing changes.
+"""
+
+import asyncio
+import bisect
+import hashlib
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.db import SessionLocal, create_db_engine, engine, open_read_session
+from app.models.pack_id_allocation import PackIdAllocation
+from app.models.user import User
+
+T = TypeVar("T")
+
+# Points per shard on the hash ring; more points even out the distribution
+VIRTUAL_NODES = 128
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class ShardRouter:
+    """Maps pack IDs to shards and opens sessions on them."""
+
+    def __init__(self, engines: list[Engine], sessionmakers: list[sessionmaker]):
+        self.engines = engines
+        self.sessionmakers = sessionmakers
+        self._ring = sorted(
+            (_hash(f"shard-{index}#{node}"), index)
+            for index in range(len(engines))
+            for node in range(VIRTUAL_NODES)
+        )
+        self._points = [point for point, _ in self._ring]
+
+    def __len__(self) -> int:
+        return len(self.engines)
+
+    def shard_for(self, pack_id: int) -> int:
+        """Index of the shard holding a pack."""
+        if len(self.engines) == 1:
+            return 0
+        position = bisect.bisect(self._points, _hash(f"pack-{pack_id}"))
+        return self._ring[position % len(self._ring)][1]
+
+    def session_for_pack(self, pack_id: int) -> Session:
+        return self.sessionmakers[self.shard_for(pack_id)]()
+
+    @contextmanager
+    def pack_session(self, pack_id: int | None, primary: Session) -> Iterator[Session]:
+        """
+        A session on a pack's shard, reusing ``primary`` when the pack lives
+        on the primary (or has no ID yet and there is a single database).
+        """
+        if pack_id is None or self.shard_for(pack_id) == 0:
+            yield primary
+            return
+        db = self.session_for_pack(pack_id)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def open_read_session(
+        self, pack_id: int | None, last_write_at: datetime | None
+    ) -> Session:
+        """
+        A read-only session for a pack's shard; on the primary this honours
+        the read replica and read-your-writes routing.
+        """
+        shard = 0 if pack_id is None else self.shard_for(pack_id)
+        if shard == 0:
+            return open_read_session(last_write_at)
+        return self.sessionmakers[shard]()
+
+    def allocate_pack_id(self) -> int | None:
+        """
+        A new globally unique pack ID, or None when there is a single database
+        and the packs table can number packs itself.
+        """
+        if len(self.engines) == 1:
+            return None
+        db = SessionLocal()
+        try:
+            allocation = PackIdAllocation()
+            db.add(allocation)
+            db.commit()
+            return allocation.id
+        finally:
+            db.close()
+
+    def copy_user(self, user: User) -> None:
+        """
+        Copy a user row from the primary to every other shard, inserting or
+        overwriting each copy, so copying again is harmless.
+        """
+        values = {column.key: getattr(user, column.key) for column in User.__table__.c}
+        for factory in self.sessionmakers[1:]:
+            db = factory()
+            try:
+                db.merge(User(**values))
+                db.commit()
+            finally:
+                db.close()
+
+    async def fan_out(
+        self,
+        query: Callable[[Session], T],
+        last_write_at: datetime | None = None,
+        primary: bool = False,
+    ) -> list[T]:
+        """
+        Run ``query(db)`` on every shard concurrently, each in its own session,
+        and return the results in shard order. Shard 0 is read through the
+        read replica routing unless ``primary`` is set.
+        """
+
+        def run(shard: int) -> T:
+            if shard == 0 and not primary:
+                db = open_read_session(last_write_at)
+            else:
+                db = self.sessionmakers[shard]()
+            try:
+                return query(db)
+            finally:
+                db.close()
+
+        if len(self.engines) == 1:
+            return [await run_in_threadpool(run, 0)]
+        return await asyncio.gather(
+            *(run_in_threadpool(run, shard) for shard in range(len(self.engines)))
+        )
+
+
+def _create_router() -> ShardRouter:
+    engines = [engine]
+    sessionmakers = [SessionLocal]
+    for url in settings.shard_database_urls:
+        shard_engine = create_db_engine(url)
+        engines.append(shard_engine)
+        sessionmakers.append(
+            sessionmaker(autocommit=False, autoflush=False, bind=shard_engine)
+        )
+    return ShardRouter(engines, sessionmakers)
+
+
+shards = _create_router()
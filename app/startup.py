@@ -0,0 +1,145 @@
+"""Application boot phases: schema check, pool warm-up and OpenAPI warm-up."""
+
+import time
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+from app.db import Base
+
+
+class StartupReport:
+    """Wall-clock timings of the named phases of one boot."""
+
+    def __init__(self):
+        self.phases: list[tuple[str, float]] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - started))
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self._started
+
+    def as_dict(self) -> dict:
+        return {
+            "phases": [
+                {"name": name, "ms": round(seconds * 1000, 2)}
+                for name, seconds in self.phases
+            ],
+            "total_ms": round(self.total * 1000, 2),
+        }
+
+    def format(self) -> str:
+        lines = ["Startup timing:"]
+        for name, seconds in self.phases:
+            lines.append(f"  {name:<24} {seconds * 1000:>9.1f} ms")
+        lines.append(f"  {'total':<24} {self.total * 1000:>9.1f} ms")
+        return "\n".join(lines)
+
+
+def verify_schema(engine: Engine, alembic_config: str) -> None:
+    """
+    Check that the database schema is current without changing it.
+
+    With an Alembic config, the database revision must equal the script
+    heads. Without one, every table known to the models must exist.
+
+    Raises:
+        RuntimeError: If the schema is behind (or ahead of) the code
+    """
+    if Path(alembic_config).is_file():
+        from alembic.config import Config
+        from alembic.runtime.migration import MigrationContext
+        from alembic.script import ScriptDirectory
+
+        script = ScriptDirectory.from_config(Config(alembic_config))
+        expected = set(script.get_heads())
+        with engine.connect() as connection:
+            current = set(MigrationContext.configure(connection).get_current_heads())
+        if current != expected:
+            raise RuntimeError(
+                f"Database is at revision {sorted(current) or 'base'}, "
+                f"expected {sorted(expected)}. Run `alembic upgrade head`."
+            )
+        return
+
+    existing = set(inspect(engine).get_table_names())
+    missing = sorted(set(Base.metadata.tables) - existing)
+    if missing:
+        raise RuntimeError(
+            f"Database is missing tables: {', '.join(missing)}. "
+            "Run `python -m app.seed` or apply migrations first."
+        )
+
+
+def warm_pool(engine: Engine, connections: int) -> int:
+    """
+    Open up to ``connections`` pool connections concurrently and check them
+    back in, so the first requests don't pay for connection setup.
+
+    Returns the number of connections opened.
+    """
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        connections = min(connections, size())
+    if connections <= 0:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        opened = list(executor.map(lambda _: engine.connect(), range(connections)))
+    for connection in opened:
+        connection.close()
+    return len(opened)
+
+
+def _response_models(annotation) -> typing.Iterator[type[BaseModel]]:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        yield annotation
+    for arg in typing.get_args(annotation):
+        yield from _response_models(arg)
+
+
+def _api_routes(routes) -> typing.Iterator[APIRoute]:
+    for route in routes:
+        if isinstance(route, APIRoute):
+            yield route
+        # Routers included lazily keep their routes on the original router
+        original_router = getattr(route, "original_router", None)
+        if original_router is not None:
+            yield from _api_routes(original_router.routes)
+
+
+def warm_serializers(app: FastAPI) -> int:
+    """
+    Build the OpenAPI schema up front instead of on the first request for
+    /docs, and complete any response model whose schema pydantic deferred
+    (e.g. on a forward reference) instead of on its first use.
+
+    FastAPI already builds each route's response serializer when the route
+    is registered, so models that are complete need nothing here.
+
+    Returns the number of response models that had to be completed.
+    """
+    models: set[type[BaseModel]] = set()
+    for route in _api_routes(app.routes):
+        models.update(_response_models(route.response_model))
+
+    deferred = [model for model in models if not model.__pydantic_complete__]
+    for model in deferred:
+        model.model_rebuild()
+    app.openapi()
+    return len(deferred)
@@ -0,0 +1 @@
+# Webhooks module
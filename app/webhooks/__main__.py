@@ -0,0 +1,24 @@
+"""
+Run the webhook sender outside the API process.
+
+Usage: python -m app.webhooks [poll_seconds]
+"""
+
+import asyncio
+import logging
+import sys
+
+from app.webhooks.sender import run_forever
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    poll_seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    try:
+        asyncio.run(run_forever(poll_seconds))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
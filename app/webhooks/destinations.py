@@ -0,0 +1,140 @@
+"""
+Webhook destinations must be public hosts.
+
+Pack admins choose webhook URLs, and the sender runs inside the deployment's
+network: a URL on localhost, a private range or a cloud metadata address
+would let them make it call internal services. The host is checked when a
+subscription is created. At delivery, the sender's transport resolves the
+host once, vets every address and dials a vetted address itself, so a name
+that starts resolving somewhere else between the check and the connection
+(DNS rebinding) can't redirect the request. Host header, SNI and certificate
+checks still use the URL's host name.
+"""
+
+import asyncio
+import ipaddress
+import socket
+import ssl
+from urllib.parse import urlsplit
+
+import certifi
+import httpcore
+import httpx
+
+from app.config import settings
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable unicast."""
+    ip = ipaddress.ip_address(address.partition("%")[0])  # drop an IPv6 zone
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def _resolve(host: str, port: int) -> list[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
+    )
+    return [sockaddr[0] for *_, sockaddr in infos]
+
+
+async def resolve_public(host: str, port: int) -> list[str]:
+    """
+    The addresses to connect to for a webhook host, all of them public.
+
+    Raises:
+        ValueError: If the host doesn't resolve, or resolves to a loopback,
+            private, link-local or otherwise non-public address
+    """
+    try:
+        addresses = await _resolve(host, port)
+    except (OSError, UnicodeError) as e:
+        raise ValueError(f"Webhook host {host} cannot be resolved") from e
+    if not addresses or not all(is_public_address(a) for a in addresses):
+        raise ValueError(f"Webhook host {host} is not a public address")
+    return addresses
+
+
+async def check_destination(url: str) -> None:
+    """
+    Check that every address a webhook URL's host resolves to is public.
+
+    Raises:
+        ValueError: If the URL has no host or resolve_public rejects it
+    """
+    if settings.webhook_allow_private_hosts:
+        return
+    parts = urlsplit(url)
+    host = parts.hostname
+    if not host:
+        raise ValueError("Webhook URL has no host")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError as e:
+        raise ValueError(f"Webhook URL has an invalid port: {e}") from e
+    await resolve_public(host, port)
+
+
+class PublicNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    Opens TCP connections only to public addresses: the host is resolved
+    and vetted here, and the connection dials the vetted address rather than
+    the name.
+
+    Args:
+        backend: The backend that makes the connections (default: AnyIO)
+    """
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend | None = None):
+        self._backend = backend or httpcore.AnyIOBackend()
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        if settings.webhook_allow_private_hosts:
+            addresses = [host]
+        else:
+            try:
+                addresses = await resolve_public(host, port)
+            except ValueError as e:
+                raise httpcore.ConnectError(str(e)) from e
+
+        error: Exception | None = None
+        for address in dict.fromkeys(addresses):
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error
+
+    async def connect_unix_socket(self, *args, **kwargs):
+        raise httpcore.ConnectError("Webhooks can't be sent over Unix sockets")
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+class PublicHTTPTransport(httpx.AsyncHTTPTransport):
+    """An HTTP transport whose connections go through PublicNetworkBackend."""
+
+    def __init__(
+        self,
+        limits: httpx.Limits = httpx.Limits(),
+        network_backend: httpcore.AsyncNetworkBackend | None = None,
+    ):
+        super().__init__(limits=limits, trust_env=False)
+        self._pool = httpcore.AsyncConnectionPool(
+            ssl_context=ssl.create_default_context(cafile=certifi.where()),
+            max_connections=limits.max_connections,
+            max_keepalive_connections=limits.max_keepalive_connections,
+            keepalive_expiry=limits.keepalive_expiry,
+            network_backend=PublicNetworkBackend(network_backend),
+        )
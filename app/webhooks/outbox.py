@@ -0,0 +1,65 @@
+"""
+Webhook outbox.
+
+``record_event`` adds one outbox row per matching subscription to the
+caller's session, so an event is queued if and only if the change it
+describes commits. When it does, in-process senders are woken up.
+"""
+
+import uuid
+from collections.abc import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.webhook import WebhookEvent, WebhookSubscription
+from app.sharding import shards
+
+# Event types subscriptions can filter on
+EVENT_TYPES = ("activity.logged", "dog.created", "dog.updated", "member.joined")
+
+_wake_callbacks: list[Callable[[], None]] = []
+
+
+def record_event(db: Session, pack_id: int, event_type: str, data: dict) -> None:
+    """Queue an event for the pack's webhooks in the session's transaction."""
+    subscriptions = db.query(
+        WebhookSubscription.id, WebhookSubscription.event_types
+    ).filter(
+        WebhookSubscription.pack_id == pack_id,
+        WebhookSubscription.active.is_(True),
+    )
+    event_id = uuid.uuid4().hex
+    for subscription_id, event_types in subscriptions:
+        if event_types and event_type not in event_types:
+            continue
+        db.add(
+            WebhookEvent(
+                subscription_id=subscription_id,
+                pack_id=pack_id,
+                event_id=event_id,
+                event_type=event_type,
+                data=data,
+            )
+        )
+        db.info["webhook_events"] = True
+
+
+def on_outbox_commit(callback: Callable[[], None]) -> None:
+    """Call ``callback`` after any transaction that queued events commits."""
+    _wake_callbacks.append(callback)
+
+
+def _wake_senders(session: Session):
+    if session.info.pop("webhook_events", False):
+        for callback in _wake_callbacks:
+            callback()
+
+
+def _forget_events(session: Session):
+    session.info.pop("webhook_events", None)
+
+
+for _sessionmaker in shards.sessionmakers:
+    event.listen(_sessionmaker, "after_commit", _wake_senders)
+    event.listen(_sessionmaker, "after_rollback", _forget_events)
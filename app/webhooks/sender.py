@@ -0,0 +1,311 @@
+"""
+Asynchronous webhook sender.
+
+Each pass claims up to webhook_claim_limit due outbox rows per shard (with
+``FOR UPDATE SKIP LOCKED`` on Postgres) and leases them by pushing their
+next_attempt_at past the request timeout. The rows are grouped per
+subscription into batches of up to webhook_batch_size events, one HTTP POST
+per batch, sent concurrently over a pooled client with at most
+webhook_endpoint_concurrency requests in flight per endpoint URL. Failed
+batches are retried with exponential backoff. Connections only dial public
+addresses vetted at connect time; a host resolving to anything else is
+never reached and counts as a failure, see app/webhooks/destinations.py.
+
+Delivery is at least once: a receiver may see an event again (a timeout
+after it was processed, a sender crashing mid-batch) and should deduplicate
+on the event ``id``. Retries can also reorder events; ``occurred_at`` gives
+their order.
+
+Request body::
+
+    {"events": [{"id": "...", "type": "activity.logged", "pack_id": 1,
+                 "occurred_at": "...", "data": {...}}, ...]}
+
+Signature header, HMAC-SHA256 keyed with the subscription's secret::
+
+    X-Neatdog-Signature: t=<unix time>,v1=<hex hmac of "<t>.<body>">
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+
+from app.config import settings
+from app.models.webhook import WebhookEvent, WebhookSubscription
+from app.sharding import shards
+from app.webhooks.destinations import PublicHTTPTransport
+from app.webhooks.outbox import on_outbox_commit
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Neatdog-Signature"
+
+
+def sign(secret: str, timestamp: int, body: bytes) -> str:
+    digest = hmac.new(
+        secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256
+    ).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify_signature(
+    secret: str, header: str, body: bytes, tolerance_seconds: int = 300
+) -> bool:
+    """Check a signature header the way a receiver should."""
+    try:
+        fields = dict(part.split("=", 1) for part in header.split(","))
+        timestamp = int(fields["t"])
+    except (KeyError, ValueError):
+        return False
+    if abs(time.time() - timestamp) > tolerance_seconds:
+        return False
+    return hmac.compare_digest(sign(secret, timestamp, body), header)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Exponential backoff with jitter, capped at an hour."""
+    seconds = min(settings.webhook_retry_base_seconds * 2 ** (attempts - 1), 3600)
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+class Batch:
+    """Events of one subscription sent in one HTTP call."""
+
+    def __init__(self, shard: int, url: str, secret: str, events: list[dict]):
+        self.shard = shard
+        self.url = url
+        self.secret = secret
+        self.events = events
+
+    @property
+    def row_ids(self) -> list[int]:
+        return [e["row_id"] for e in self.events]
+
+    def body(self) -> bytes:
+        events = [{k: v for k, v in e.items() if k != "row_id"} for e in self.events]
+        return json.dumps({"events": events}, separators=(",", ":")).encode()
+
+
+def claim_batches(shard: int, limit: int) -> list[Batch]:
+    """Lease the shard's due outbox rows and group them into batches."""
+    db = shards.sessionmakers[shard]()
+    try:
+        now = datetime.utcnow()
+        rows = (
+            db.query(WebhookEvent)
+            .filter(
+                WebhookEvent.status == "pending", WebhookEvent.next_attempt_at <= now
+            )
+            .order_by(WebhookEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not rows:
+            db.commit()
+            return []
+
+        lease = now + timedelta(seconds=settings.webhook_timeout_seconds * 3)
+        db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id.in_([row.id for row in rows]))
+            .values(next_attempt_at=lease)
+            .execution_options(synchronize_session=False)
+        )
+        subscriptions = {
+            s.id: s
+            for s in db.query(WebhookSubscription).filter(
+                WebhookSubscription.id.in_({row.subscription_id for row in rows})
+            )
+        }
+
+        per_subscription: dict[int, list[dict]] = defaultdict(list)
+        for row in rows:
+            per_subscription[row.subscription_id].append(
+                {
+                    "row_id": row.id,
+                    "id": row.event_id,
+                    "type": row.event_type,
+                    "pack_id": row.pack_id,
+                    "occurred_at": row.created_at.isoformat() + "Z",
+                    "data": row.data,
+                }
+            )
+        db.commit()
+
+        batches = []
+        size = settings.webhook_batch_size
+        for subscription_id, events in per_subscription.items():
+            subscription = subscriptions[subscription_id]
+            for start in range(0, len(events), size):
+                batches.append(
+                    Batch(
+                        shard,
+                        subscription.url,
+                        subscription.secret,
+                        events[start : start + size],
+                    )
+                )
+        return batches
+    finally:
+        db.close()
+
+
+def record_outcome(shard: int, row_ids: list[int], error: str | None) -> None:
+    """Mark a batch delivered, or schedule its retry."""
+    db = shards.sessionmakers[shard]()
+    try:
+        now = datetime.utcnow()
+        if error is None:
+            db.execute(
+                update(WebhookEvent)
+                .where(WebhookEvent.id.in_(row_ids))
+                .values(
+                    status="delivered",
+                    delivered_at=now,
+                    attempts=WebhookEvent.attempts + 1,
+                    last_error=None,
+                )
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            for row in db.query(WebhookEvent).filter(WebhookEvent.id.in_(row_ids)):
+                row.attempts += 1
+                row.last_error = error[:2000]
+                if row.attempts >= settings.webhook_max_attempts:
+                    row.status = "failed"
+                else:
+                    row.next_attempt_at = now + retry_delay(row.attempts)
+        db.commit()
+    finally:
+        db.close()
+
+
+class WebhookSender:
+    """Delivers outbox events until stopped, woken early by new commits."""
+
+    def __init__(
+        self,
+        poll_seconds: float,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.poll_seconds = poll_seconds
+        self.transport = transport
+        self.client: httpx.AsyncClient | None = None
+        self._endpoint_limits: dict[str, asyncio.Semaphore] = {}
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        on_outbox_commit(self.wake)
+
+    def _client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            # Environment proxies would dial the webhook host themselves
+            self.client = httpx.AsyncClient(
+                transport=self.transport
+                or PublicHTTPTransport(
+                    httpx.Limits(
+                        max_connections=settings.webhook_max_connections,
+                        max_keepalive_connections=settings.webhook_max_connections,
+                    )
+                ),
+                timeout=settings.webhook_timeout_seconds,
+                trust_env=False,
+            )
+        return self.client
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="webhook-sender")
+
+    async def stop(self) -> None:
+        # Stay registered for wake-ups, but ignore them once stopped
+        self._loop = None
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def wake(self) -> None:
+        """Thread-safe: called after a transaction that queued events commits."""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def deliver_due(self) -> int:
+        """One pass over every shard; returns the number of events delivered."""
+        batches = []
+        for shard in range(len(shards)):
+            batches += await run_in_threadpool(
+                claim_batches, shard, settings.webhook_claim_limit
+            )
+        delivered = await asyncio.gather(*(self._deliver(b) for b in batches))
+        return sum(delivered)
+
+    async def _deliver(self, batch: Batch) -> int:
+        limit = self._endpoint_limits.setdefault(
+            batch.url, asyncio.Semaphore(settings.webhook_endpoint_concurrency)
+        )
+        body = batch.body()
+        error = None
+        async with limit:
+            try:
+                response = await self._client().post(
+                    batch.url,
+                    content=body,
+                    headers={
+                        "Content-Type": "application/json",
+                        SIGNATURE_HEADER: sign(batch.secret, int(time.time()), body),
+                    },
+                )
+                if not response.is_success:
+                    error = f"HTTP {response.status_code}"
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+
+        if error is not None:
+            logger.warning(
+                "Webhook delivery of %s events to %s failed: %s",
+                len(batch.events),
+                batch.url,
+                error,
+            )
+        await run_in_threadpool(record_outcome, batch.shard, batch.row_ids, error)
+        return 0 if error else len(batch.events)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                if await self.deliver_due():
+                    continue
+            except Exception:
+                logger.exception("Webhook delivery pass failed")
+
+            # Idle until the next poll or until new events are committed
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except TimeoutError:
+                pass
+
+
+async def run_forever(poll_seconds: float) -> None:
+    sender = WebhookSender(poll_seconds)
+    sender.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sender.stop()
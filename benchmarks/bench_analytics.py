@@ -0,0 +1,129 @@
+"""
+Benchmark: pack analytics over 1M activities, vectorized vs. a Python loop,
+and fetching the activity columns from SQLite through the cursor vs. as ORM
+result rows.
+
+Run with: python -m benchmarks.bench_analytics
+"""
+
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import Integer, cast, create_engine, func, select
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401
+from app.analytics.activity_stats import compute_analytics, fetch_columns
+from app.models.activity_log import ActivityLog
+
+ROWS = 1_000_000
+DAYS = 365
+TYPES = 8
+
+
+def synthetic_pack(rows: int, start: datetime) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(42)
+    origin = int(start.replace(tzinfo=timezone.utc).timestamp())
+    timestamps = origin + rng.integers(0, DAYS * 86400, rows)
+    type_ids = rng.integers(1, TYPES + 1, rows)
+    return timestamps, type_ids
+
+
+def python_loop(timestamps, type_ids, start: datetime, window_days: int) -> dict:
+    """The same statistics computed row by row, for comparison."""
+    origin = int(start.replace(tzinfo=timezone.utc).timestamp())
+    heatmap = [[0] * 24 for _ in range(7)]
+    per_type = defaultdict(list)
+    for ts, type_id in zip(timestamps.tolist(), type_ids.tolist()):
+        moment = datetime.fromtimestamp(ts, timezone.utc)
+        heatmap[moment.weekday()][moment.hour] += 1
+        per_type[type_id].append(ts)
+
+    result = {}
+    for type_id, values in per_type.items():
+        values.sort()
+        gaps = [(b - a) / 3600 for a, b in zip(values, values[1:])]
+        mean = sum(gaps) / len(gaps)
+        days = Counter((ts - origin) // 86400 for ts in values)
+        daily = [days.get(day, 0) for day in range(DAYS)]
+        moving = []
+        for day in range(DAYS):
+            window = daily[max(0, day - window_days + 1) : day + 1]
+            moving.append(sum(window) / len(window))
+        result[type_id] = (mean, daily, moving)
+    return {"heatmap": heatmap, "types": result}
+
+
+def activity_db(timestamps, type_ids) -> Session:
+    """An in-memory SQLite database holding the activities of pack 1."""
+    engine = create_engine("sqlite://")
+    ActivityLog.__table__.create(engine)
+    # The format SQLAlchemy stores DateTime values in on SQLite
+    logged_at = np.char.replace(
+        np.datetime_as_string(timestamps.astype("datetime64[s]"), unit="us"),
+        "T",
+        " ",
+    )
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO activity_logs"
+            " (pack_id, dog_id, activity_type_id, user_id, logged_at, created_at)"
+            " VALUES (1, 1, ?, 1, ?, ?)",
+            [
+                (type_id, moment, moment)
+                for type_id, moment in zip(type_ids.tolist(), logged_at.tolist())
+            ],
+        )
+    return Session(engine)
+
+
+def fetch_rows(db: Session, start: datetime, end: datetime):
+    """The same columns fetched as result rows, for comparison."""
+    epoch = cast(func.strftime("%s", ActivityLog.logged_at), Integer)
+    rows = db.execute(
+        select(epoch, ActivityLog.activity_type_id).where(
+            ActivityLog.pack_id == 1,
+            ActivityLog.logged_at >= start,
+            ActivityLog.logged_at < end,
+        )
+    ).all()
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 2)
+    return columns[:, 0], columns[:, 1]
+
+
+def timed(name: str, func) -> float:
+    began = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - began
+    print(f"{name:<24} {elapsed * 1000:>10,.1f} ms")
+    return elapsed
+
+
+def main():
+    start = datetime(2025, 1, 1)
+    end = start + timedelta(days=DAYS)
+    timestamps, type_ids = synthetic_pack(ROWS, start)
+    print(f"{ROWS:,} activities, {TYPES} types, {DAYS} days\n")
+
+    vectorized = timed(
+        "numpy",
+        lambda: compute_analytics(timestamps, type_ids, start, end, window_days=7),
+    )
+    looped = timed(
+        "python loop", lambda: python_loop(timestamps, type_ids, start, window_days=7)
+    )
+    print(f"\nspeedup: {looped / vectorized:.1f}x\n")
+
+    db = activity_db(timestamps, type_ids)
+    fetched = fetch_columns(db, 1, start, end)
+    assert np.array_equal(np.sort(fetched[0]), np.sort(timestamps))
+    cursor = timed("fetch via cursor", lambda: fetch_columns(db, 1, start, end))
+    rows = timed("fetch via rows", lambda: fetch_rows(db, start, end))
+    print(f"\nspeedup: {rows / cursor:.1f}x")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
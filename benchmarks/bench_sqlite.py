@@ -0,0 +1,212 @@
+"""
+Benchmark: concurrent read/write throughput of the API on SQLite.
+
+Several worker processes, each running the app in-process with concurrent
+clients, hit the same database file with a mix of the pack routes (list,
+pack, dashboard, dog, activity types, history, leaderboard, analytics) and
+writes (log activity, update dog). The tuned setup (WAL, synchronous=NORMAL,
+single writer) is compared with SQLite's defaults (rollback journal,
+synchronous=FULL).
+
+Run with: python -m benchmarks.bench_sqlite [processes] [clients] [seconds]
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+USERS = 20
+PACKS_PER_USER = 2
+INITIAL_ACTIVITIES = 50
+
+CONFIGS = {
+    "tuned (wal, normal)": {
+        "SQLITE_JOURNAL_MODE": "wal",
+        "SQLITE_SYNCHRONOUS": "normal",
+    },
+    "default (delete, full)": {
+        "SQLITE_JOURNAL_MODE": "delete",
+        "SQLITE_SYNCHRONOUS": "full",
+    },
+}
+MIXES = {"read-only": 0.0, "90/10 read/write": 0.1, "50/50 read/write": 0.5}
+
+READS = [
+    "/api/v1/packs?details=true",
+    "/api/v1/packs/{pack}",
+    "/api/v1/packs/{pack}/dashboard",
+    "/api/v1/packs/{pack}/dog",
+    "/api/v1/packs/{pack}/activity-types",
+    "/api/v1/packs/{pack}/activities?limit=20",
+    "/api/v1/packs/{pack}/leaderboard",
+    "/api/v1/packs/{pack}/analytics",
+]
+
+
+def configure(database: Path, config: dict) -> None:
+    """Environment for an app process; must run before importing app."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    os.environ["JOB_WORKERS"] = "0"
+    os.environ.update(config)
+
+
+def setup(database: Path, config: dict, fixture: Path) -> None:
+    configure(database, config)
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    users = []
+    with TestClient(app) as client:
+        for n in range(USERS):
+            auth = client.post(
+                "/api/v1/auth/signup",
+                json={
+                    "email": f"user{n}@example.com",
+                    "password": "x" * 8,
+                    "name": f"U{n}",
+                },
+            ).json()
+            headers = {"Authorization": f"Bearer {auth['access_token']}"}
+            packs = []
+            for p in range(PACKS_PER_USER):
+                pack = client.post(
+                    "/api/v1/packs", json={"name": f"Pack {n}-{p}"}, headers=headers
+                ).json()
+                client.post(
+                    f"/api/v1/packs/{pack['id']}/dog",
+                    json={"name": "Rex"},
+                    headers=headers,
+                )
+                types = client.get(
+                    f"/api/v1/packs/{pack['id']}/activity-types", headers=headers
+                ).json()
+                for _ in range(INITIAL_ACTIVITIES):
+                    client.post(
+                        f"/api/v1/packs/{pack['id']}/activities",
+                        json={"activity_type_id": random.choice(types)["id"]},
+                        headers=headers,
+                    )
+                packs.append({"id": pack["id"], "types": [t["id"] for t in types]})
+            users.append({"headers": headers, "packs": packs})
+    fixture.write_text(json.dumps(users))
+
+
+async def run_clients(users, clients: int, seconds: float, write_ratio: float):
+    import httpx
+
+    from app.main import app
+
+    latencies = {"read": [], "write": []}
+    errors = 0
+    # Unhandled errors (e.g. "database is locked") count as failed requests
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    deadline = time.perf_counter() + seconds
+
+    async def client_loop():
+        nonlocal errors
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+            while time.perf_counter() < deadline:
+                user = random.choice(users)
+                pack = random.choice(user["packs"])
+                started = time.perf_counter()
+                if random.random() < write_ratio:
+                    kind = "write"
+                    if random.random() < 0.8:
+                        response = await c.post(
+                            f"/api/v1/packs/{pack['id']}/activities",
+                            json={"activity_type_id": random.choice(pack["types"])},
+                            headers=user["headers"],
+                        )
+                    else:
+                        response = await c.patch(
+                            f"/api/v1/packs/{pack['id']}/dog",
+                            json={"name": f"Rex {random.randint(1, 99)}"},
+                            headers=user["headers"],
+                        )
+                else:
+                    kind = "read"
+                    path = random.choice(READS).format(pack=pack["id"])
+                    response = await c.get(path, headers=user["headers"])
+                if response.status_code >= 400:
+                    errors += 1
+                latencies[kind].append(time.perf_counter() - started)
+
+    await asyncio.gather(*(client_loop() for _ in range(clients)))
+    return latencies, errors
+
+
+def worker(database, config, fixture, clients, seconds, write_ratio, results):
+    configure(database, config)
+    users = json.loads(fixture.read_text())
+    latencies, errors = asyncio.run(run_clients(users, clients, seconds, write_ratio))
+    results.put((latencies, errors))
+
+
+def percentile(values: list[float], q: float) -> float:
+    return statistics.quantiles(values, n=100)[q - 1] * 1000 if len(values) > 1 else 0.0
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    context = multiprocessing.get_context("spawn")
+    print(f"{processes} processes x {clients} clients, {seconds:.0f}s per run\n")
+    print(
+        f"{'config':<24} {'mix':<18} {'reads/s':>9} {'writes/s':>9} "
+        f"{'read p99':>9} {'write p99':>10} {'errors':>7}"
+    )
+
+    for config_name, config in CONFIGS.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            database = Path(tmp) / "bench.db"
+            fixture = Path(tmp) / "fixture.json"
+            setup_process = context.Process(
+                target=setup, args=(database, config, fixture)
+            )
+            setup_process.start()
+            setup_process.join()
+
+            for mix_name, write_ratio in MIXES.items():
+                results = context.Queue()
+                workers = [
+                    context.Process(
+                        target=worker,
+                        args=(
+                            database,
+                            config,
+                            fixture,
+                            clients,
+                            seconds,
+                            write_ratio,
+                            results,
+                        ),
+                    )
+                    for _ in range(processes)
+                ]
+                for process in workers:
+                    process.start()
+                outcomes = [results.get() for _ in workers]
+                for process in workers:
+                    process.join()
+
+                reads = [v for latencies, _ in outcomes for v in latencies["read"]]
+                writes = [v for latencies, _ in outcomes for v in latencies["write"]]
+                errors = sum(e for _, e in outcomes)
+                print(
+                    f"{config_name:<24} {mix_name:<18} {len(reads) / seconds:>9,.0f} "
+                    f"{len(writes) / seconds:>9,.0f} {percentile(reads, 99):>7.1f}ms "
+                    f"{percentile(writes, 99):>8.1f}ms {errors:>7}"
+                )
+
+
+if __name__ == "__main__":
+    main()
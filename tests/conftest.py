@@ -0,0 +1,87 @@
+"""Shared fixtures: a database for unit tests, and the HTTP API."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401
+from app.cache.bus import bus
+from app.config import settings
+from app.db import Base, ReadSessionLocal, SessionLocal, create_db_engine
+from app.main import app
+from app.models import Pack, User
+from app.seed.activity_types import seed_activity_types
+from app.sharding import shards
+
+
+@pytest.fixture
+def db_engine(tmp_path):
+    """An engine on a fresh SQLite database with every table created."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session(db_engine):
+    """A session on db_engine, closed after the test."""
+    session = Session(bind=db_engine)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    """
+    A TestClient for the whole app on a fresh SQLite database. The lifespan
+    doesn't run, so no background workers are started.
+    """
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'api.db'}")
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setitem(SessionLocal.kw, "bind", engine)
+    monkeypatch.setitem(ReadSessionLocal.kw, "bind", engine)
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    with SessionLocal() as db:
+        seed_activity_types(db)
+
+    yield TestClient(app)
+
+    # IDs start over in the next test's database: drop what was cached here,
+    # on every shard a test may have added
+    pack_ids, user_ids = set(), set()
+    for shard_sessionmaker in shards.sessionmakers:
+        with shard_sessionmaker() as db:
+            pack_ids.update(pack_id for (pack_id,) in db.query(Pack.id))
+            user_ids.update(user_id for (user_id,) in db.query(User.id))
+    bus.publish(
+        *(
+            f"pack:{pack_id}:{kind}"
+            for pack_id in pack_ids
+            for kind in (
+                "members",
+                "dog",
+                "activities",
+                "activity_types",
+                "invitations",
+                "schedules",
+            )
+        ),
+        *(f"user:{user_id}:packs" for user_id in user_ids),
+    )
+    engine.dispose()
+
+
+@pytest.fixture
+def signup(api):
+    """Sign up a user and return the Authorization header for them."""
+
+    def sign_up(email: str = "owner@example.com") -> dict[str, str]:
+        response = api.post(
+            "/api/v1/auth/signup",
+            json={"email": email, "password": "password123", "name": email},
+        )
+        assert response.status_code == 201, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return sign_up
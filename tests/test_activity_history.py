@@ -0,0 +1,119 @@
+"""Tests for the activity history formats and encodings."""
+
+import pytest
+from starlette.requests import Request
+
+from app.encoding import wants_msgpack
+
+
+@pytest.fixture
+def history(api, signup):
+    """A pack with two logged activities; returns its history URL and headers."""
+    headers = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=headers).json()[
+        "id"
+    ]
+    api.post(f"/api/v1/packs/{pack_id}/dog", json={"name": "Rex"}, headers=headers)
+    type_id = api.get(
+        f"/api/v1/packs/{pack_id}/activity-types", headers=headers
+    ).json()[0]["id"]
+    for notes in ("first", "second"):
+        logged = api.post(
+            f"/api/v1/packs/{pack_id}/activities",
+            json={"activity_type_id": type_id, "notes": notes},
+            headers=headers,
+        )
+        assert logged.status_code == 201
+    return f"/api/v1/packs/{pack_id}/activities", headers
+
+
+def test_compact_format_side_loads_users_and_types(api, history):
+    """Test that format=compact sends each user and activity type once."""
+    url, headers = history
+    page = api.get(url, params={"format": "compact"}, headers=headers).json()
+
+    assert [a["notes"] for a in page["activities"]] == ["second", "first"]
+    assert "user" not in page["activities"][0]
+    user_id = str(page["activities"][0]["user_id"])
+    type_id = str(page["activities"][0]["activity_type_id"])
+    assert list(page["users"]) == [user_id]
+    assert page["users"][user_id]["email"] == "owner@example.com"
+    assert list(page["activity_types"]) == [type_id]
+
+    narrowed = api.get(
+        url, params={"format": "compact", "fields": "notes"}, headers=headers
+    ).json()
+    assert [set(a) for a in narrowed["activities"]] == [{"id", "notes"}] * 2
+    assert narrowed["users"] == {}
+    assert narrowed["activity_types"] == {}
+
+
+def test_fields_narrow_full_activities(api, history):
+    """Test that ?fields= picks fields, details included, and rejects unknowns."""
+    url, headers = history
+    page = api.get(url, params={"fields": "notes,user"}, headers=headers).json()
+    assert [set(a) for a in page] == [{"id", "notes", "user"}] * 2
+    assert page[0]["user"]["email"] == "owner@example.com"
+
+    response = api.get(url, params={"fields": "notes,password"}, headers=headers)
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+    invalid = api.get(url, params={"format": "tiny"}, headers=headers)
+    assert invalid.status_code == 422
+
+
+def test_msgpack_is_negotiated_through_accept(api, history):
+    """Test that MessagePack is sent only when the Accept header prefers it."""
+    msgpack = pytest.importorskip("msgpack")
+    url, headers = history
+    json_page = api.get(url, headers=headers).json()
+
+    packed = api.get(url, headers={**headers, "Accept": "application/msgpack"})
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(packed.content) == json_page
+
+    compact = api.get(
+        url,
+        params={"format": "compact"},
+        headers={**headers, "Accept": "application/x-msgpack"},
+    )
+    assert msgpack.unpackb(compact.content)["activities"][0]["notes"] == "second"
+
+    refused = api.get(url, headers={**headers, "Accept": "application/msgpack;q=0"})
+    assert refused.headers["content-type"] == "application/json"
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        ("application/msgpack", True),
+        ("application/json;q=0.5, application/msgpack", True),
+        ("Application/MsgPack ; q=0.8, */*;q=0.1", True),
+        ("application/msgpack;q=0", False),
+        ("application/msgpack; q=0.0", False),
+        ("application/msgpack;q=0.5, application/json", False),
+        ("application/msgpack;q=oops", False),
+        ("application/msgpack-ish, text/html", False),
+        ("*/*", False),
+        ("", False),
+    ],
+)
+def test_wants_msgpack_parses_accept(accept, expected):
+    """Test that Accept media types and q values are parsed, not substring-matched."""
+    request = Request(
+        {"type": "http", "headers": [(b"accept", accept.encode())] if accept else []}
+    )
+    assert wants_msgpack(request) is expected
+
+
+def test_openapi_documents_both_shapes(api):
+    """Test that the schema declares the compact shape and MessagePack."""
+    operation = api.get("/openapi.json").json()["paths"][
+        "/api/v1/packs/{pack_id}/activities"
+    ]["get"]
+    content = operation["responses"]["200"]["content"]
+    assert "application/msgpack" in content
+    shapes = content["application/json"]["schema"]["anyOf"]
+    assert {"$ref": "#/components/schemas/CompactActivityHistory"} in shapes
+    assert "format" in [p["name"] for p in operation["parameters"]]
@@ -0,0 +1,91 @@
+"""Tests for the vectorized activity analytics."""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.analytics.activity_stats import (
+    compute_analytics,
+    fetch_columns,
+    moving_average,
+)
+from app.db import SessionLocal
+
+
+def epoch(moment: datetime) -> int:
+    return int(moment.replace(tzinfo=timezone.utc).timestamp())
+
+
+def test_heatmap_intervals_and_daily_counts():
+    start = datetime(2024, 1, 1)  # a Monday
+    walks = [start + timedelta(hours=8 + 24 * day) for day in range(4)]
+    meals = [start + timedelta(days=2, hours=18)]
+    timestamps = np.array([epoch(m) for m in walks + meals])
+    type_ids = np.array([1] * len(walks) + [2] * len(meals))
+
+    result = compute_analytics(
+        timestamps, type_ids, start, start + timedelta(days=5), window_days=2
+    )
+
+    assert result["total"] == 5
+    assert [result["heatmap"][day][8] for day in range(7)] == [1, 1, 1, 1, 0, 0, 0]
+    assert result["heatmap"][2][18] == 1
+
+    walk, meal = result["activity_types"]
+    assert walk["activity_type_id"] == 1
+    assert walk["intervals"] == {
+        "mean_hours": 24.0,
+        "p90_hours": 24.0,
+        "regularity": 1.0,
+    }
+    assert walk["daily_counts"] == [1, 1, 1, 1, 0]
+    assert walk["moving_average"] == [1.0, 1.0, 1.0, 1.0, 0.5]
+    assert meal["intervals"]["mean_hours"] is None
+
+
+def test_moving_average_window_longer_than_series():
+    assert moving_average(np.array([2, 4]), 7).tolist() == [2.0, 3.0]
+
+
+def test_fetch_columns_reads_a_packs_range(api, signup):
+    """Test that fetch_columns returns epoch seconds and type IDs in [start, end)."""
+    headers = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=headers).json()[
+        "id"
+    ]
+    api.post(f"/api/v1/packs/{pack_id}/dog", json={"name": "Rex"}, headers=headers)
+    type_id = api.get(
+        f"/api/v1/packs/{pack_id}/activity-types", headers=headers
+    ).json()[0]["id"]
+    start = datetime(2024, 1, 1)
+    for hours in (1, 25, 24 * 10):
+        api.post(
+            f"/api/v1/packs/{pack_id}/activities",
+            json={
+                "activity_type_id": type_id,
+                "logged_at": (start + timedelta(hours=hours)).isoformat(),
+            },
+            headers=headers,
+        )
+
+    with SessionLocal() as db:
+        timestamps, type_ids = fetch_columns(
+            db, pack_id, start, start + timedelta(days=5)
+        )
+        empty = fetch_columns(db, pack_id + 1, start, start + timedelta(days=5))
+    assert sorted(timestamps.tolist()) == [
+        epoch(start + timedelta(hours=1)),
+        epoch(start + timedelta(hours=25)),
+    ]
+    assert type_ids.tolist() == [type_id, type_id]
+    assert empty[0].size == 0 and empty[1].size == 0
+
+    # An aware start and a naive end are both taken as UTC
+    response = api.get(
+        f"/api/v1/packs/{pack_id}/analytics",
+        params={"start": "2024-01-01T02:00:00+02:00", "end": "2024-01-06T00:00:00"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["start"] == "2024-01-01T00:00:00"
+    assert response.json()["total"] == 2
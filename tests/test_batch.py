@@ -0,0 +1,150 @@
+"""Tests for the batch endpoint."""
+
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.auth import deps
+from app.auth.jwt import create_access_token
+from app.config import settings
+from app.db import Base, create_db_engine, get_db
+from app.models import User
+from app.routers import batch
+
+
+def batch_client(tmp_path, monkeypatch) -> tuple[TestClient, list[str]]:
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'batch.db'}")
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        user = User(email="owner@example.com", password_hash="x", name="Owner")
+        db.add(user)
+        db.commit()
+        token = create_access_token(user.id)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    decoded = []
+    decode_token = deps.decode_token
+    monkeypatch.setattr(
+        deps, "decode_token", lambda t: decoded.append(t) or decode_token(t)
+    )
+
+    notes: list[str] = []
+    stub = APIRouter()
+
+    @stub.get("/notes")
+    async def list_notes(current_user: User = Depends(deps.get_current_user)):
+        return {"user": current_user.email, "notes": notes}
+
+    @stub.post("/notes", status_code=201)
+    async def add_note(note: dict, current_user: User = Depends(deps.get_current_user)):
+        notes.append(note["text"])
+        return {"count": len(notes)}
+
+    @stub.get("/missing")
+    async def missing(current_user: User = Depends(deps.get_current_user)):
+        raise HTTPException(status_code=404, detail="Nothing here")
+
+    api = FastAPI()
+    api.include_router(stub, prefix="/api/v1")
+    api.include_router(batch.router, prefix="/api/v1")
+    api.dependency_overrides[get_db] = override_get_db
+    client = TestClient(api, headers={"Authorization": f"Bearer {token}"})
+    return client, decoded
+
+
+def test_sub_requests_run_in_order_with_their_own_status(tmp_path, monkeypatch):
+    """Test that responses keep request order and reads see earlier writes."""
+    client, decoded = batch_client(tmp_path, monkeypatch)
+    response = client.post(
+        "/api/v1/batch",
+        json={
+            "requests": [
+                {"path": "/api/v1/notes"},
+                {"method": "POST", "path": "/api/v1/notes", "body": {"text": "a"}},
+                {"path": "/api/v1/notes?x=1"},
+                {"path": "/api/v1/missing"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["responses"]
+    assert [r["status"] for r in results] == [200, 201, 200, 404]
+    assert results[0]["body"] == {"user": "owner@example.com", "notes": []}
+    assert results[2]["body"]["notes"] == ["a"]
+    assert results[3]["body"] == {"detail": "Nothing here"}
+    # The token was only checked for the batch itself
+    assert len(decoded) == 1
+
+
+def test_batches_over_their_limits_are_rejected(tmp_path, monkeypatch):
+    """Test the request count, cost and nesting limits."""
+    client, _ = batch_client(tmp_path, monkeypatch)
+    monkeypatch.setattr(settings, "batch_max_requests", 3)
+    monkeypatch.setattr(settings, "batch_max_cost", 6)
+    monkeypatch.setattr(settings, "batch_write_cost", 4)
+
+    read = {"path": "/api/v1/notes"}
+    write = {"method": "POST", "path": "/api/v1/notes", "body": {"text": "a"}}
+    for requests in (
+        [read] * 4,
+        [write, write],
+        [{"method": "POST", "path": "/api/v1/batch", "body": {"requests": [read]}}],
+    ):
+        response = client.post("/api/v1/batch", json={"requests": requests})
+        assert response.status_code == 400
+    assert client.post("/api/v1/batch", json={"requests": [write, read]}).is_success
+
+
+def test_reads_after_a_write_see_changed_memberships(api, signup):
+    """
+    Test that leaving a pack in a batch takes effect for the rest of it,
+    even though the token still lists the pack.
+    """
+    owner = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=owner).json()["id"]
+    invitation = api.post(
+        f"/api/v1/packs/{pack_id}/invitations",
+        json={"email": "member@example.com"},
+        headers=owner,
+    ).json()
+    member = signup("member@example.com")
+    accepted = api.post(
+        "/api/v1/packs/invitations/accept",
+        json={"token": invitation["token"]},
+        headers=member,
+    )
+    assert accepted.status_code == 200
+    member_id = api.get("/api/v1/auth/me", headers=member).json()["id"]
+
+    # A fresh token carries the membership
+    login = api.post(
+        "/api/v1/auth/login",
+        json={"email": "member@example.com", "password": "password123"},
+    ).json()
+    member = {"Authorization": f"Bearer {login['access_token']}"}
+
+    response = api.post(
+        "/api/v1/batch",
+        json={
+            "requests": [
+                {"method": "GET", "path": f"/api/v1/packs/{pack_id}"},
+                {
+                    "method": "DELETE",
+                    "path": f"/api/v1/packs/{pack_id}/members/{member_id}",
+                },
+                {"method": "GET", "path": f"/api/v1/packs/{pack_id}"},
+                {"method": "GET", "path": f"/api/v1/packs/{pack_id}/activities"},
+            ]
+        },
+        headers=member,
+    )
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()["responses"]] == [200, 204, 403, 403]
@@ -0,0 +1,92 @@
+"""Tests for the cross-worker cache invalidation bus."""
+
+import time
+
+import pytest
+from pydantic import ValidationError
+
+from app.cache.bus import (
+    InMemoryHub,
+    InMemoryTransport,
+    InvalidationBus,
+    Transport,
+    UnixSocketTransport,
+)
+from app.cache.local import LocalCache
+from app.config import Settings
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_invalidation_reaches_other_workers():
+    """Test that a write in one worker evicts the key in another worker."""
+    hub = InMemoryHub()
+    worker_a = InvalidationBus(InMemoryTransport(hub))
+    worker_b = InvalidationBus(InMemoryTransport(hub))
+    worker_a.start()
+    worker_b.start()
+    cache_a = LocalCache(worker_a)
+    cache_b = LocalCache(worker_b)
+    cache_a.set("pack:1:members", ["alice"])
+    cache_b.set("pack:1:members", ["alice"])
+    cache_b.set("pack:2:members", ["bob"])
+
+    worker_a.publish("pack:1:members")
+
+    assert cache_a.get("pack:1:members") is None
+    assert cache_b.get("pack:1:members") is None
+    assert cache_b.get("pack:2:members") == ["bob"]
+    assert worker_b.metrics()["received"] == 1
+    assert worker_b.metrics()["lag_ms"]["samples"] == 1
+
+
+def test_cache_staleness_is_bounded():
+    worker = InvalidationBus(InMemoryTransport())
+    cache = LocalCache(worker, max_staleness=0.05)
+    cache.set("pack:1:dog", "Rex")
+
+    # Nothing is served until the bus is running
+    assert cache.get("pack:1:dog") is None
+    worker.start()
+    assert cache.get("pack:1:dog") == "Rex"
+
+    time.sleep(0.06)
+    assert cache.get("pack:1:dog") is None
+
+
+def test_unix_socket_transport(tmp_path):
+    worker_a = InvalidationBus(UnixSocketTransport(str(tmp_path)))
+    worker_b = InvalidationBus(UnixSocketTransport(str(tmp_path)))
+    received = []
+    worker_b.subscribe(received.append)
+    worker_a.start()
+    worker_b.start()
+    try:
+        worker_a.publish("pack:3:activity_types")
+        assert wait_for(lambda: received == [["pack:3:activity_types"]])
+    finally:
+        worker_a.stop()
+        worker_b.stop()
+
+
+def test_transport_is_checked_up_front():
+    """Test that a misspelled or incomplete transport fails before any message."""
+    with pytest.raises(ValidationError):
+        Settings(cache_bus_transport="postgress")
+
+    class Unsendable(Transport):
+        def start(self, deliver):
+            pass
+
+        def stop(self):
+            pass
+
+    with pytest.raises(TypeError):
+        Unsendable()
@@ -0,0 +1,59 @@
+"""Tests for single-flight request coalescing."""
+
+import asyncio
+import threading
+
+from app.cache.bus import InMemoryTransport, InvalidationBus
+from app.cache.coalesce import Coalescer
+
+
+def make_coalescer(cache_seconds: float = 0.0) -> tuple[Coalescer, InvalidationBus]:
+    local_bus = InvalidationBus(InMemoryTransport())
+    local_bus.start()
+    return Coalescer(local_bus, cache_seconds=cache_seconds), local_bus
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    """Test that callers arriving while a computation runs get its result."""
+    coalescer, _ = make_coalescer()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return b"page"
+
+    async def storm():
+        flights = [
+            asyncio.ensure_future(coalescer.run("history", "pack:1:x", ("p",), compute))
+            for _ in range(10)
+        ]
+        other = asyncio.ensure_future(
+            coalescer.run("history", "pack:1:x", ("q",), lambda: b"other")
+        )
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(*flights), await other
+
+    results, other = asyncio.run(storm())
+    assert results == [b"page"] * 10 and other == b"other"
+    assert len(calls) == 1
+    metrics = coalescer.metrics()["routes"]["history"]
+    assert metrics["computed"] == 2 and metrics["joined"] == 9
+    assert metrics["collapse_ratio"] == 0.8182
+
+
+def test_micro_cache_is_dropped_by_invalidation():
+    """Test that a write's bus key forces the next read to recompute."""
+    coalescer, local_bus = make_coalescer(cache_seconds=60)
+    versions = iter([b"v1", b"v2"])
+
+    async def read():
+        return await coalescer.run("history", "pack:1:x", (), lambda: next(versions))
+
+    assert asyncio.run(read()) == b"v1"
+    assert asyncio.run(read()) == b"v1"
+    local_bus.publish("pack:1:x")
+    assert asyncio.run(read()) == b"v2"
+    assert coalescer.metrics()["routes"]["history"]["cached"] == 1
@@ -0,0 +1,106 @@
+"""Tests for the pack dashboard endpoint."""
+
+import threading
+
+from sqlalchemy import event
+
+from app.db import SessionLocal
+from app.routers import dashboard
+
+
+def test_dashboard_returns_everything_in_one_call(api, signup):
+    """Test that the dashboard bundles the pack, dog, types and newest activities."""
+    headers = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=headers).json()[
+        "id"
+    ]
+    url = f"/api/v1/packs/{pack_id}/dashboard"
+
+    empty = api.get(url, headers=headers).json()
+    assert empty["me"]["email"] == "owner@example.com"
+    assert [m["role"] for m in empty["pack"]["members"]] == ["owner"]
+    assert empty["dog"] is None
+    assert empty["recent_activities"] == []
+
+    api.post(f"/api/v1/packs/{pack_id}/dog", json={"name": "Rex"}, headers=headers)
+    type_id = empty["activity_types"][0]["id"]
+    logged = [
+        api.post(
+            f"/api/v1/packs/{pack_id}/activities",
+            json={
+                "activity_type_id": type_id,
+                "notes": notes,
+                "logged_at": logged_at,
+            },
+            headers=headers,
+        ).json()["id"]
+        for notes, logged_at in (
+            ("older", "2030-01-01T08:00:00"),
+            ("tied", "2030-01-01T09:00:00"),
+            ("tied", "2030-01-01T09:00:00"),
+            ("tied", "2030-01-01T09:00:00"),
+        )
+    ]
+
+    dashboard = api.get(url, params={"activities_limit": 2}, headers=headers).json()
+    assert dashboard["dog"]["name"] == "Rex"
+    # Activities logged at the same moment come newest first, every time
+    assert [a["id"] for a in dashboard["recent_activities"]] == [
+        logged[3],
+        logged[2],
+    ]
+    assert dashboard["recent_activities"][0]["activity_type"]["id"] == type_id
+
+
+def test_dashboard_is_for_members_only(api, signup):
+    """Test that outsiders get 403 and a missing pack 404."""
+    owner = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=owner).json()["id"]
+    outsider = signup("outsider@example.com")
+
+    response = api.get(f"/api/v1/packs/{pack_id}/dashboard", headers=outsider)
+    assert response.status_code == 403
+    response = api.get(f"/api/v1/packs/{pack_id + 1}/dashboard", headers=owner)
+    assert response.status_code == 404
+
+
+def test_dashboard_releases_its_own_connections(api, signup, monkeypatch):
+    """Test that a dashboard holds at most one connection per lookup."""
+    # Keep all four lookups' connections checked out at the same time
+    barrier = threading.Barrier(4, timeout=5)
+    for name in ("_pack_with_members", "_dog", "_activity_types", "_recent_activities"):
+        lookup = getattr(dashboard, name)
+
+        def overlapping(*args, lookup=lookup):
+            result = lookup(*args)
+            barrier.wait()
+            return result
+
+        monkeypatch.setattr(dashboard, name, overlapping)
+    headers = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=headers).json()[
+        "id"
+    ]
+    engine = SessionLocal.kw["bind"]
+    lock = threading.Lock()
+    checked_out = {"now": 0, "peak": 0}
+
+    def on_checkout(*args):
+        with lock:
+            checked_out["now"] += 1
+            checked_out["peak"] = max(checked_out["peak"], checked_out["now"])
+
+    def on_checkin(*args):
+        with lock:
+            checked_out["now"] -= 1
+
+    event.listen(engine, "checkout", on_checkout)
+    event.listen(engine, "checkin", on_checkin)
+    try:
+        response = api.get(f"/api/v1/packs/{pack_id}/dashboard", headers=headers)
+    finally:
+        event.remove(engine, "checkout", on_checkout)
+        event.remove(engine, "checkin", on_checkin)
+    assert response.status_code == 200
+    assert response.json()["me"]["email"] == "owner@example.com"
+    assert checked_out["peak"] == 4
@@ -0,0 +1,156 @@
+"""Tests for dog photo upload and serving."""
+
+import io
+
+import pytest
+from PIL import Image
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import SessionLocal
+from app.media import photos
+from app.models.dog import Dog
+from app.routers import dogs
+
+
+def png(color: str, size: int = 600) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pack_with_dog(api, signup, tmp_path, monkeypatch):
+    """A pack with a dog; thumbnails are made synchronously on upload."""
+    monkeypatch.setattr(settings, "media_root", str(tmp_path / "media"))
+    monkeypatch.setattr(
+        dogs,
+        "schedule_thumbnails",
+        lambda key: photos.make_thumbnails(
+            str(photos.original_path(key)),
+            key,
+            settings.photo_thumbnail_sizes,
+            str(photos.photos_root()),
+        ),
+    )
+    headers = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=headers).json()[
+        "id"
+    ]
+    api.post(f"/api/v1/packs/{pack_id}/dog", json={"name": "Rex"}, headers=headers)
+    return pack_id, headers
+
+
+def upload(api, pack_id, headers, content: bytes, media_type="image/png"):
+    return api.post(
+        f"/api/v1/packs/{pack_id}/dog/photo",
+        files={"photo": ("rex", content, media_type)},
+        headers=headers,
+    )
+
+
+def test_only_current_versioned_urls_are_immutable(api, pack_with_dog):
+    """Test that a new upload isn't hidden by year-long caching of the old one."""
+    pack_id, headers = pack_with_dog
+    first = upload(api, pack_id, headers, png("red")).json()
+    assert set(first["thumbnail_urls"]) == {"128", "512"}
+
+    for url in (first["photo_url"], first["thumbnail_urls"]["128"]):
+        response = api.get(url, headers=headers)
+        assert response.status_code == 200
+        assert "immutable" in response.headers["cache-control"]
+        revalidated = api.get(
+            url, headers={**headers, "If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+
+    unversioned = api.get(f"/api/v1/packs/{pack_id}/dog/photo", headers=headers)
+    assert unversioned.headers["cache-control"] == "private, no-cache"
+
+    second = upload(api, pack_id, headers, png("blue")).json()
+    assert second["photo_url"] != first["photo_url"]
+    stale = api.get(first["photo_url"], headers=headers)
+    assert stale.headers["cache-control"] == "private, no-cache"
+    assert stale.content == api.get(second["photo_url"], headers=headers).content
+
+
+def test_upload_checks_type_and_size(api, pack_with_dog, monkeypatch):
+    """Test that uploads are limited by type and size and need a photo field."""
+    pack_id, headers = pack_with_dog
+    monkeypatch.setattr(settings, "photo_max_bytes", 1000)
+
+    assert upload(api, pack_id, headers, bytes(1001)).status_code == 413
+    assert upload(api, pack_id, headers, b"GIF89a", "image/gif").status_code == 415
+    missing = api.post(
+        f"/api/v1/packs/{pack_id}/dog/photo",
+        files={"other": ("rex", b"x", "image/png")},
+        headers=headers,
+    )
+    assert missing.status_code == 400
+    malformed = api.post(
+        f"/api/v1/packs/{pack_id}/dog/photo",
+        content=b"--other\r\nnot a part",
+        headers={**headers, "Content-Type": "multipart/form-data; boundary=b"},
+    )
+    assert malformed.status_code == 400
+    assert list((photos.photos_root() / "tmp").iterdir()) == []
+
+
+def test_photo_is_not_stored_for_a_deleted_dog(api, pack_with_dog, monkeypatch):
+    """Test that a dog deleted while its photo streams in leaves no file behind."""
+    pack_id, headers = pack_with_dog
+
+    async def receive_then_delete_dog(request):
+        received = await photos.receive_photo_upload(request)
+        with SessionLocal() as db:
+            db.query(Dog).filter(Dog.pack_id == pack_id).delete()
+            db.commit()
+        return received
+
+    monkeypatch.setattr(dogs, "receive_photo_upload", receive_then_delete_dog)
+    assert upload(api, pack_id, headers, png("red")).status_code == 404
+    assert not (photos.photos_root() / "originals").exists()
+    assert list((photos.photos_root() / "tmp").iterdir()) == []
+
+
+def test_upload_releases_the_connection_while_streaming(
+    api, pack_with_dog, monkeypatch
+):
+    """Test that no transaction is open while the body is read."""
+    pack_id, headers = pack_with_dog
+    opened: list[Session] = []
+    in_transaction = []
+
+    def record_session(session, transaction, connection):
+        opened.append(session)
+
+    async def receive_photo_upload(request):
+        in_transaction.append(any(session.in_transaction() for session in opened))
+        return await photos.receive_photo_upload(request)
+
+    monkeypatch.setattr(dogs, "receive_photo_upload", receive_photo_upload)
+    event.listen(Session, "after_begin", record_session)
+    try:
+        assert upload(api, pack_id, headers, png("red")).status_code == 200
+    finally:
+        event.remove(Session, "after_begin", record_session)
+    assert opened
+    assert in_transaction == [False]
+
+
+def test_thumbnails_and_range_requests(api, pack_with_dog):
+    """Test serving a thumbnail and part of the original."""
+    pack_id, headers = pack_with_dog
+    original = png("green")
+    dog = upload(api, pack_id, headers, original).json()
+
+    thumbnail = api.get(dog["thumbnail_urls"]["128"], headers=headers)
+    assert thumbnail.headers["content-type"] == "image/jpeg"
+    assert Image.open(io.BytesIO(thumbnail.content)).size == (128, 128)
+    assert api.get(f"{dog['photo_url']}&size=64", headers=headers).status_code == 400
+
+    partial = api.get(dog["photo_url"], headers={**headers, "Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.content == original[:10]
+    assert partial.headers["content-range"] == f"bytes 0-9/{len(original)}"
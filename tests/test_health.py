@@ -1,8 +1,12 @@
 """Basic health check tests."""
 
+import pytest
 from fastapi.testclient import TestClient
+from pydantic import ValidationError
 
+from app.config import Settings
 from app.main import app
+from app.startup import warm_serializers
 
 client = TestClient(app)
 
@@ -12,3 +16,23 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json()["status"] == "healthy"
+
+
+def test_startup_report_before_boot_finishes():
+    """Test that the startup report is a 503, not a crash, without a lifespan."""
+    response = client.get("/health/startup")
+    assert response.status_code == 503
+
+
+def test_warm_serializers_builds_openapi(monkeypatch):
+    """Test that warming builds OpenAPI; every response model is already complete."""
+    monkeypatch.setattr(app, "openapi_schema", None)
+    assert warm_serializers(app) == 0
+    assert app.openapi_schema is not None
+
+
+def test_startup_mode_is_validated():
+    """Test that a misspelled startup mode fails at boot instead of creating tables."""
+    assert Settings(startup_mode="verify").startup_mode == "verify"
+    with pytest.raises(ValidationError):
+        Settings(startup_mode="verfiy")
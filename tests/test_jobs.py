@@ -0,0 +1,134 @@
+"""Tests for the job queue and its workers."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.config import settings
+from app.jobs import worker
+from app.jobs.queue import enqueue, handlers
+from app.models import Job
+
+
+@pytest.fixture
+def queue_db(db_engine, monkeypatch):
+    session_factory = sessionmaker(bind=db_engine)
+    monkeypatch.setattr(worker.shards, "sessionmakers", [session_factory])
+    monkeypatch.setattr(worker.shards, "engines", [db_engine])
+    monkeypatch.setattr(settings, "job_retry_base_seconds", 10.0)
+    return session_factory
+
+
+def job_row(session_factory, job_id: int) -> Job:
+    with session_factory() as db:
+        return db.get(Job, job_id)
+
+
+def test_claims_runnable_jobs_oldest_first(queue_db, monkeypatch):
+    """Test that claiming skips delayed and already claimed jobs."""
+    runs = []
+    monkeypatch.setitem(handlers, "record", lambda db, payload: runs.append(payload))
+    with queue_db() as db:
+        later = enqueue(db, "record", {"n": 0}, delay=timedelta(hours=1))
+        first = enqueue(db, "record", {"n": 1})
+        db.flush()
+        first.run_at -= timedelta(seconds=1)
+        second = enqueue(db, "record", {"n": 2})
+        db.commit()
+        later_id, first_id, second_id = later.id, first.id, second.id
+
+    claimed_first, claimed_second = worker.claim_job(), worker.claim_job()
+    assert [claimed_first[0], claimed_second[0]] == [first_id, second_id]
+    assert worker.claim_job() is None
+
+    worker.run_job(*claimed_first)
+    done = job_row(queue_db, first_id)
+    assert (done.status, done.attempts) == ("done", 1)
+    assert runs == [{"n": 1}]
+    assert job_row(queue_db, later_id).status == "pending"
+
+
+def test_failures_back_off_then_dead_letter(queue_db, monkeypatch):
+    """Test that failing jobs are retried later, then marked failed."""
+
+    def fail(db, payload):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(handlers, "fail", fail)
+    with queue_db() as db:
+        failing = enqueue(db, "fail", max_attempts=2)
+        db.commit()
+        job_id = failing.id
+
+    worker.run_job(*worker.claim_job())
+    retried = job_row(queue_db, job_id)
+    assert retried.status == "pending"
+    assert retried.last_error == "RuntimeError: boom"
+    delay = (retried.run_at - datetime.utcnow()).total_seconds()
+    assert 7 < delay <= 12  # 10s base with up to 20% jitter
+    assert worker.claim_job() is None  # not before run_at
+
+    with queue_db() as db:
+        db.get(Job, job_id).run_at = datetime.utcnow()
+        db.commit()
+    worker.run_job(*worker.claim_job())
+    failed = job_row(queue_db, job_id)
+    assert (failed.status, failed.attempts) == ("failed", 2)
+    assert failed.finished_at is not None
+
+
+def test_crashed_jobs_are_reclaimed_and_stale_leases_lose(queue_db, monkeypatch):
+    """Test that a reclaimed job's outcome can't be recorded by the old lease."""
+    runs = []
+    monkeypatch.setitem(handlers, "record", lambda db, payload: runs.append(payload))
+    with queue_db() as db:
+        recorded = enqueue(db, "record", {"n": 1})
+        db.commit()
+        job_id = recorded.id
+
+    assert worker.claim_job() is not None
+    assert worker.claim_job() is None  # still leased
+    # The worker holding it crashes, and the visibility timeout passes
+    stale_lease = datetime.utcnow() - timedelta(
+        seconds=settings.job_visibility_timeout_seconds + 1
+    )
+    with queue_db() as db:
+        db.get(Job, job_id).locked_at = stale_lease
+        db.commit()
+
+    reclaimed_id, lease = worker.claim_job()
+    assert reclaimed_id == job_id
+    worker.run_job(job_id, stale_lease)  # the first worker, waking up late
+    assert job_row(queue_db, job_id).status == "running"
+
+    worker.run_job(job_id, lease)
+    recovered = job_row(queue_db, job_id)
+    assert (recovered.status, recovered.attempts) == ("done", 2)
+
+
+def test_worker_survives_a_failing_job(queue_db, monkeypatch):
+    """Test that an error outside the handler doesn't stop the worker task."""
+    ran = []
+
+    def run_job(job_id, lease, shard=0):
+        ran.append(job_id)
+        if len(ran) == 1:
+            raise RuntimeError("database went away")
+
+    claims = iter([(1, datetime.utcnow()), (2, datetime.utcnow())])
+    monkeypatch.setattr(worker, "claim_job", lambda shard: next(claims, None))
+    monkeypatch.setattr(worker, "run_job", run_job)
+
+    async def main():
+        job_worker = worker.JobWorker(concurrency=1, poll_seconds=0.01)
+        job_worker.start()
+        await asyncio.sleep(0.1)
+        alive = not job_worker._tasks[0].done()
+        await job_worker.stop()
+        return alive
+
+    assert asyncio.run(main())
+    assert ran == [1, 2]
@@ -0,0 +1,110 @@
+"""Tests for JWT signing and verification."""
+
+import time
+
+import pytest
+from jose import jwt as jose_jwt
+
+from app.auth.jwt import (
+    TokenVerifier,
+    _b64encode,
+    create_access_token,
+    decode_token,
+)
+from app.config import settings
+
+
+def test_access_token_round_trip():
+    """Test that an access token decodes to the same user."""
+    token_data = decode_token(create_access_token(42))
+    assert token_data.user_id == 42
+    assert token_data.type == "access"
+
+
+def test_accepts_tokens_signed_by_python_jose():
+    """Test that tokens issued before the fast path still verify."""
+    payload = {"sub": "7", "exp": int(time.time()) + 60, "type": "refresh"}
+    token = jose_jwt.encode(payload, settings.jwt_secret_key, algorithm="HS256")
+    token_data = decode_token(token)
+    assert token_data.user_id == 7
+    assert token_data.type == "refresh"
+
+
+def test_rejects_expired_token():
+    verifier = TokenVerifier("secret")
+    token = verifier.encode(
+        {"sub": "1", "exp": int(time.time()) - 10, "type": "access"}
+    )
+    with pytest.raises(ValueError, match="expired"):
+        verifier.decode(token)
+
+
+def test_rejects_tampered_token():
+    verifier = TokenVerifier("secret")
+    token = verifier.encode(
+        {"sub": "1", "exp": int(time.time()) + 60, "type": "access"}
+    )
+    forged_payload = (
+        TokenVerifier("secret")
+        .encode({"sub": "2", "exp": int(time.time()) + 60, "type": "access"})
+        .split(".")[1]
+    )
+    header, _, signature = token.split(".")
+    with pytest.raises(ValueError):
+        verifier.decode(f"{header}.{forged_payload}.{signature}")
+    with pytest.raises(ValueError):
+        TokenVerifier("other-secret").decode(token)
+
+
+def test_rejects_other_algorithms():
+    payload = {"sub": "1", "exp": int(time.time()) + 60, "type": "access"}
+    token = jose_jwt.encode(payload, "secret", algorithm="HS512")
+    with pytest.raises(ValueError, match="alg"):
+        TokenVerifier("secret").decode(token)
+
+
+def test_key_rotation_by_kid():
+    """Test that tokens signed with any configured key id are accepted."""
+    payload = {"sub": "1", "exp": int(time.time()) + 60, "type": "access"}
+    old = TokenVerifier("legacy", keys={"k1": "one"}, active_kid="k1")
+    new = TokenVerifier("legacy", keys={"k1": "one", "k2": "two"}, active_kid="k2")
+    retired = TokenVerifier("legacy", keys={"k2": "two"}, active_kid="k2")
+
+    assert new.decode(old.encode(payload)).user_id == 1
+    assert new.decode(TokenVerifier("legacy").encode(payload)).user_id == 1
+    with pytest.raises(ValueError, match="Unknown key id"):
+        retired.decode(old.encode(payload))
+
+
+def test_active_kid_must_be_configured():
+    with pytest.raises(ValueError):
+        TokenVerifier("secret", keys={"k1": "one"}, active_kid="k2")
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        b'["HS256"]',
+        b'{"alg": "HS256", "kid": ["k1"]}',
+        b'{"alg": "HS256", "kid": {"k": 1}}',
+        b'{"alg": "HS256", "kid": 1}',
+        b'{"alg": "HS256"',
+        b"\xff\xfe",
+    ],
+)
+def test_malformed_headers_are_invalid_tokens(header):
+    """Test that a malformed header is a ValueError, never a crash."""
+    verifier = TokenVerifier("legacy", keys={"k1": "one"}, active_kid="k1")
+    payload = verifier.encode({"sub": "1", "exp": int(time.time()) + 60})
+    token = ".".join([_b64encode(header), *payload.split(".")[1:]])
+    with pytest.raises(ValueError, match="Invalid token"):
+        verifier.decode(token)
+
+
+def test_malformed_header_is_unauthorized(api):
+    """Test that the API answers 401, not 500, to a malformed header."""
+    header = _b64encode(b'{"alg": "HS256", "kid": []}')
+    response = api.get(
+        "/api/v1/auth/me", headers={"Authorization": f"Bearer {header}.e30.sig"}
+    )
+    assert response.status_code == 401
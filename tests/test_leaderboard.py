@@ -0,0 +1,154 @@
+"""Tests for the materialized leaderboard counters."""
+
+from datetime import date, datetime
+
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.models  # noqa: F401
+from app.db import SessionLocal
+from app.leaderboard import counters
+from app.models import ActivityCounter, ActivityLog, ActivityType, Dog, Pack, User
+
+
+def snapshot(session: Session) -> dict:
+    return {
+        (c.pack_id, c.month, c.user_id, c.activity_type_id): c.count
+        for c in session.query(ActivityCounter)
+    }
+
+
+def test_incremental_counters_match_a_rebuild(db_engine, db_session, monkeypatch):
+    """Test that counters kept by record_contribution equal recomputed ones."""
+    session = db_session
+    owner, member = (
+        User(id=user_id, email=f"{user_id}@example.com", password_hash="x", name="U")
+        for user_id in (1, 2)
+    )
+    pack = Pack(id=1, name="Pack", creator=owner)
+    session.add_all([owner, member, pack, Dog(id=1, name="Rex", pack=pack)])
+    session.add_all(
+        ActivityType(id=type_id, name=name, icon="pawprint", color="#000000", pack=pack)
+        for type_id, name in ((1, "Walk"), (2, "Feed"))
+    )
+    session.flush()
+
+    logged = [
+        (1, 1, datetime(2024, 1, 3, 8)),
+        (1, 1, datetime(2024, 1, 31, 23, 59)),
+        (1, 2, datetime(2024, 1, 5)),
+        (2, 1, datetime(2024, 1, 9)),
+        (1, 1, datetime(2024, 2, 1)),
+    ]
+    for user_id, activity_type_id, logged_at in logged:
+        session.add(
+            ActivityLog(
+                pack_id=1,
+                dog_id=1,
+                activity_type_id=activity_type_id,
+                user_id=user_id,
+                logged_at=logged_at,
+            )
+        )
+        counters.record_contribution(session, 1, user_id, activity_type_id, logged_at)
+    session.commit()
+
+    incremental = snapshot(session)
+    assert incremental == {
+        (1, date(2024, 1, 1), 1, 1): 2,
+        (1, date(2024, 1, 1), 1, 2): 1,
+        (1, date(2024, 1, 1), 2, 1): 1,
+        (1, date(2024, 2, 1), 1, 1): 1,
+    }
+
+    monkeypatch.setattr(
+        counters.shards, "sessionmakers", [sessionmaker(bind=db_engine)]
+    )
+    assert counters.rebuild_packs([1]) == 4
+    session.expire_all()
+    assert snapshot(session) == incremental
+
+
+def test_leaderboard_reads_the_same_after_a_chunked_rebuild(api, signup):
+    """
+    Test that GET /leaderboard ranks members by what they logged that month,
+    including members who logged nothing, and that counters rebuilt one pack
+    per chunk give the same leaderboards.
+    """
+    owner = signup()
+    member = signup("member@example.com")
+    pack_ids = [
+        api.post("/api/v1/packs", json={"name": f"P{i}"}, headers=owner).json()["id"]
+        for i in range(3)
+    ]
+    pack_id = pack_ids[1]
+    invitation = api.post(
+        f"/api/v1/packs/{pack_id}/invitations",
+        json={"email": "member@example.com"},
+        headers=owner,
+    ).json()
+    api.post(
+        "/api/v1/packs/invitations/accept",
+        json={"token": invitation["token"]},
+        headers=member,
+    )
+
+    def log(pack_id: int, headers: dict, type_index: int, logged_at: str):
+        type_ids = [
+            activity_type["id"]
+            for activity_type in api.get(
+                f"/api/v1/packs/{pack_id}/activity-types", headers=headers
+            ).json()
+        ]
+        response = api.post(
+            f"/api/v1/packs/{pack_id}/activities",
+            json={"activity_type_id": type_ids[type_index], "logged_at": logged_at},
+            headers=headers,
+        )
+        assert response.status_code == 201, response.text
+        return type_ids[type_index]
+
+    for each_pack_id in pack_ids:
+        api.post(
+            f"/api/v1/packs/{each_pack_id}/dog", json={"name": "Rex"}, headers=owner
+        )
+        log(each_pack_id, owner, 0, "2024-01-20T12:00:00Z")
+    walk = log(pack_id, owner, 0, "2024-01-31T23:59:00Z")
+    feed = log(pack_id, owner, 1, "2024-01-05T08:00:00Z")
+    log(pack_id, member, 1, "2024-02-01T00:00:00Z")
+
+    def boards() -> list[list[tuple]]:
+        boards = []
+        for month in ("2024-01", "2024-02"):
+            response = api.get(
+                f"/api/v1/packs/{pack_id}/leaderboard",
+                params={"month": month},
+                headers=member,
+            )
+            assert response.status_code == 200
+            boards.append(
+                [
+                    (entry["user"]["email"], entry["total"], entry["by_activity_type"])
+                    for entry in response.json()["entries"]
+                ]
+            )
+        return boards
+
+    expected = [
+        [
+            ("owner@example.com", 3, {str(walk): 2, str(feed): 1}),
+            ("member@example.com", 0, {}),
+        ],
+        [
+            ("member@example.com", 1, {str(feed): 1}),
+            ("owner@example.com", 0, {}),
+        ],
+    ]
+    assert boards() == expected
+
+    with SessionLocal() as db:
+        db.query(ActivityCounter).delete()
+        db.commit()
+    assert [[entry[1] for entry in board] for board in boards()] == [[0, 0], [0, 0]]
+
+    assert counters.rebuild(chunk_size=1) == 5
+    assert boards() == expected
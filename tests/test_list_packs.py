@@ -0,0 +1,86 @@
+"""Tests for listing a user's packs."""
+
+
+def create_packs(api, headers, count: int) -> list[int]:
+    return [
+        api.post("/api/v1/packs", json={"name": f"P{i}"}, headers=headers).json()["id"]
+        for i in range(count)
+    ]
+
+
+def test_pages_follow_the_cursor(api, signup):
+    """Test that pages split at the limit and the last page has no cursor."""
+    headers = signup()
+    pack_ids = create_packs(api, headers, 4)
+    # Someone else's pack never shows up
+    create_packs(api, signup("other@example.com"), 1)
+
+    seen = []
+    cursors = []
+    params = {"limit": 2}
+    while True:
+        response = api.get("/api/v1/packs", params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen += [pack["id"] for pack in page]
+        cursor = response.headers.get("X-Next-Cursor")
+        cursors.append(cursor)
+        if cursor is None:
+            break
+        params["after_id"] = cursor
+
+    assert seen == pack_ids
+    # Exactly two full pages: the second fills the limit and ends the list
+    assert cursors == [str(pack_ids[1]), None]
+
+    unpaged = api.get("/api/v1/packs", headers=headers)
+    assert [pack["id"] for pack in unpaged.json()] == pack_ids
+    assert "X-Next-Cursor" not in unpaged.headers
+
+    past_the_end = api.get(
+        "/api/v1/packs", params={"limit": 2, "after_id": pack_ids[-1]}, headers=headers
+    )
+    assert past_the_end.json() == []
+    assert "X-Next-Cursor" not in past_the_end.headers
+
+
+def test_details_flag(api, signup):
+    """Test that details=true adds the dog, member count and last activity."""
+    headers = signup()
+    with_dog, without_dog = create_packs(api, headers, 2)
+    api.post(f"/api/v1/packs/{with_dog}/dog", json={"name": "Rex"}, headers=headers)
+    type_id = api.get(
+        f"/api/v1/packs/{with_dog}/activity-types", headers=headers
+    ).json()[0]["id"]
+    api.post(
+        f"/api/v1/packs/{with_dog}/activities",
+        json={"activity_type_id": type_id, "logged_at": "2030-01-01T08:00:00"},
+        headers=headers,
+    )
+
+    plain = api.get("/api/v1/packs", headers=headers).json()
+    assert [pack["role"] for pack in plain] == ["owner", "owner"]
+    assert all(pack["member_count"] is None for pack in plain)
+    assert all(pack["dog_name"] is None for pack in plain)
+
+    detailed = api.get(
+        "/api/v1/packs", params={"details": True}, headers=headers
+    ).json()
+    assert detailed[0]["dog_name"] == "Rex"
+    assert detailed[0]["member_count"] == 1
+    assert detailed[0]["last_activity_at"] == "2030-01-01T08:00:00"
+    assert detailed[1]["id"] == without_dog
+    assert detailed[1]["dog_name"] is None
+    assert detailed[1]["member_count"] == 1
+    assert detailed[1]["last_activity_at"] is None
+
+
+def test_invalid_cursor_and_limit_are_rejected(api, signup):
+    """Test that a cursor that isn't a pack ID and an out-of-range limit get 422."""
+    headers = signup()
+    create_packs(api, headers, 1)
+
+    for params in ({"after_id": "abc"}, {"limit": 0}, {"limit": 201}):
+        response = api.get("/api/v1/packs", params=params, headers=headers)
+        assert response.status_code == 422, params
@@ -0,0 +1,46 @@
+"""Tests for the maintenance tasks."""
+
+from datetime import datetime, timedelta
+
+import app.models  # noqa: F401
+from app.config import settings
+from app.maintenance.registry import Budget
+from app.maintenance.tasks import purge_invitations, refresh_statistics
+from app.models import Pack, PackInvitation, User
+
+
+def invitation(token: str, expires_at: datetime) -> PackInvitation:
+    return PackInvitation(
+        pack_id=1,
+        email=f"{token}@example.com",
+        token=token,
+        invited_by=1,
+        expires_at=expires_at,
+    )
+
+
+def test_purge_deletes_only_long_expired_invitations_in_batches(
+    db_session, monkeypatch
+):
+    """Test that the purge works through old invitations batch by batch."""
+    session = db_session
+    owner = User(id=1, email="owner@example.com", password_hash="x", name="Owner")
+    session.add_all([owner, Pack(id=1, name="Pack", creator=owner)])
+    now = datetime.utcnow()
+    session.add_all(invitation(f"old{i}", now - timedelta(days=60)) for i in range(5))
+    session.add(invitation("recent", now - timedelta(days=1)))
+    session.add(invitation("pending", now + timedelta(days=7)))
+    session.commit()
+    monkeypatch.setattr(settings, "maintenance_batch_size", 2)
+
+    assert purge_invitations(session, Budget(10)) == {"deleted": 5, "complete": True}
+    assert {i.token for i in session.query(PackInvitation)} == {"recent", "pending"}
+
+
+def test_tasks_stop_when_the_budget_is_spent(db_session):
+    """Test that a task with no budget left does no work."""
+    assert refresh_statistics(db_session, Budget(0)) == {
+        "analyzed": [],
+        "complete": False,
+    }
+    assert refresh_statistics(db_session, Budget(10))["complete"]
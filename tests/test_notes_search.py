@@ -0,0 +1,69 @@
+"""Tests for the in-process notes index used when Postgres isn't available."""
+
+from datetime import datetime
+
+import app.models  # noqa: F401
+from app.models import ActivityLog, ActivityType, Dog, Pack, User
+from app.search.notes import NotesIndex, PackNotesIndex
+
+
+def test_all_terms_must_match_and_last_term_is_a_prefix():
+    index = PackNotesIndex()
+    index.add(1, "Vomited after dinner", datetime(2024, 1, 1))
+    index.add(2, "Vet said 2 pills", datetime(2024, 1, 2))
+    index.add(3, "dinner, then vomit again", datetime(2024, 1, 3))
+
+    assert {activity_id for activity_id, _ in index.search("vom")} == {1, 3}
+    assert [activity_id for activity_id, _ in index.search("vet pil")] == [2]
+    assert index.search("vet dinner") == []
+    assert index.search("  ") == []
+
+
+def test_ties_are_broken_by_newest_logged_at():
+    index = PackNotesIndex()
+    index.add(1, "walk", datetime(2024, 1, 3))
+    index.add(2, "walk", datetime(2024, 1, 1))
+    index.add(3, "walk walk", datetime(2024, 1, 2))
+
+    assert [activity_id for activity_id, _ in index.search("walk")] == [3, 1, 2]
+
+
+def test_index_catches_up_without_invalidations(db_session):
+    """Test that new activities are found and deleted ones dropped."""
+    db = db_session
+    user = User(email="owner@example.com", password_hash="x", name="Owner")
+    pack = Pack(name="Pack", creator=user)
+    dog = Dog(name="Rex", pack=pack)
+    walk = ActivityType(name="Walk", icon="figure.walk", color="#00ff00", pack=pack)
+
+    def log(notes: str) -> ActivityLog:
+        activity = ActivityLog(
+            pack=pack,
+            dog=dog,
+            activity_type=walk,
+            user=user,
+            notes=notes,
+            logged_at=datetime.utcnow(),
+        )
+        db.add(activity)
+        db.commit()
+        return activity
+
+    first = log("muddy park walk")
+    index = NotesIndex(max_staleness=3600)
+    assert [i for i, _ in index.search(db, pack.id, "park")] == [first.id]
+
+    # No bus message for this one
+    second = log("park again")
+    assert {i for i, _ in index.search(db, pack.id, "park")} == {first.id, second.id}
+
+    db.delete(first)
+    db.commit()
+    index.invalidate([f"pack:{pack.id}:activities"])
+    assert [i for i, _ in index.search(db, pack.id, "park")] == [second.id]
+
+    # Without the message, deletions are noticed after max_staleness
+    db.delete(second)
+    db.commit()
+    index.max_staleness = 0
+    assert index.search(db, pack.id, "park") == []
@@ -0,0 +1,38 @@
+"""Tests for purging deleted packs."""
+
+from datetime import datetime
+
+import app.models  # noqa: F401
+from app.config import settings
+from app.jobs.tasks import purge_pack
+from app.models import ActivityLog, ActivityType, Dog, Job, Pack, PackMember, User
+
+
+def test_purge_removes_activities_in_batches_then_the_pack(db_session, monkeypatch):
+    """Test that each purge run deletes one batch and the last one cascades."""
+    session = db_session
+    user = User(email="owner@example.com", password_hash="x", name="Owner")
+    pack = Pack(name="Pack", creator=user, deleted_at=datetime.utcnow())
+    dog = Dog(name="Rex", pack=pack)
+    walk = ActivityType(name="Walk", icon="figure.walk", color="#00ff00", pack=pack)
+    session.add_all([user, pack, dog, walk])
+    session.add(PackMember(pack=pack, user=user, role="owner"))
+    session.add_all(
+        ActivityLog(pack=pack, dog=dog, activity_type=walk, user=user, logged_at=t)
+        for t in [datetime(2024, 1, day) for day in range(1, 8)]
+    )
+    session.commit()
+    monkeypatch.setattr(settings, "pack_purge_batch_size", 3)
+    pack_id = pack.id
+
+    runs = 0
+    while session.get(Pack, pack_id) is not None:
+        purge_pack(session, {"pack_id": pack_id})
+        session.commit()
+        session.expire_all()
+        runs += 1
+
+    assert runs == 4  # 3 + 3 + 1 activities, then the pack
+    assert session.query(Job).filter(Job.name == "purge_pack").count() == 3
+    for model in (ActivityLog, ActivityType, Dog, PackMember):
+        assert session.query(model).filter(model.pack_id == pack_id).count() == 0
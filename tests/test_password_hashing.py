@@ -0,0 +1,38 @@
+from app.auth import password
+from app.config import settings
+
+
+def test_lower_cost_hashes_need_rehash(monkeypatch):
+    """Test that hashes below the current cost are flagged and upgraded."""
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    old_hash = password.hash_password("correct horse")
+    assert password.hash_cost(old_hash) == 4
+    assert not password.needs_rehash(old_hash)
+
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+    assert password.needs_rehash(old_hash)
+    new_hash = password.hash_password("correct horse")
+    assert password.hash_cost(new_hash) == 5
+    assert password.verify_password("correct horse", new_hash)
+    assert not password.verify_password("wrong", new_hash)
+
+    # Never downgraded
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    assert not password.needs_rehash(new_hash)
+
+    timings = {(t["operation"], t["rounds"]): t for t in password.metrics()["timings"]}
+    assert timings[("hash", 5)]["count"] >= 1
+    assert sum(timings[("verify", 5)]["histogram"].values()) >= 2
+
+
+def test_calibrate_picks_highest_cost_within_budget(monkeypatch):
+    """Test that calibration stops at the cost limit or the time budget."""
+    monkeypatch.setattr(password, "MIN_ROUNDS", 4)
+    monkeypatch.setattr(password, "MAX_ROUNDS", 6)
+    monkeypatch.setattr(password, "_rounds", None)
+
+    assert password.calibrate(budget_ms=10_000) == 6
+    assert password.current_rounds() == 6
+
+    # Costs only double from the minimum, so a tiny budget keeps the minimum
+    assert password.calibrate(budget_ms=0.001) == 4
@@ -0,0 +1,81 @@
+"""Tests for the request profiler."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.config import settings
+from app.profiling import middleware
+from app.profiling.store import ProfileStore
+
+
+def profiled_app(tmp_path, monkeypatch) -> tuple[TestClient, ProfileStore]:
+    engine = create_engine(f"sqlite:///{tmp_path / 'profiling.db'}")
+    api = FastAPI()
+
+    @api.get("/ping")
+    def ping():
+        with engine.connect() as conn:
+            return {"answer": conn.execute(text("SELECT 42")).scalar()}
+
+    @api.get("/retry")
+    def retry():
+        with engine.connect() as conn:
+            try:
+                conn.execute(text("SELECT * FROM missing"))
+            except OperationalError:
+                conn.rollback()
+            return {"answer": conn.execute(text("SELECT 42")).scalar()}
+
+    store = ProfileStore(str(tmp_path / "profiles"), max_profiles=2)
+    monkeypatch.setattr(middleware, "store", store)
+    monkeypatch.setattr(settings, "admin_token", "secret")
+    monkeypatch.setattr(settings, "profile_sample_rate", 0.0)
+    return TestClient(middleware.ProfilingMiddleware(api)), store
+
+
+def test_only_authorized_requests_are_profiled(tmp_path, monkeypatch):
+    """Test that X-Profile needs the admin token to take a profile."""
+    client, store = profiled_app(tmp_path, monkeypatch)
+
+    assert "x-profile-id" not in client.get("/ping").headers
+    response = client.get("/ping", headers={"X-Profile": "1", "X-Admin-Token": "no"})
+    assert "x-profile-id" not in response.headers
+    assert store.list() == []
+
+    response = client.get(
+        "/ping", headers={"X-Profile": "1", "X-Admin-Token": "secret"}
+    )
+    assert response.json() == {"answer": 42}
+    profile = store.get(response.headers["x-profile-id"])
+    assert profile["status"] == 200
+    assert [s["statement"] for s in profile["sql"]] == ["SELECT 42"]
+    assert store.raw_path(profile["id"]) is not None
+
+
+def test_failed_statements_are_timed_too(tmp_path, monkeypatch):
+    """Test that a statement that raises is listed with its error."""
+    client, store = profiled_app(tmp_path, monkeypatch)
+    headers = {"X-Profile": "1", "X-Admin-Token": "secret"}
+
+    for _ in range(2):
+        response = client.get("/retry", headers=headers)
+        assert response.json() == {"answer": 42}
+        sql = store.get(response.headers["x-profile-id"])["sql"]
+        assert [(s["statement"], "error" in s) for s in sql] == [
+            ("SELECT * FROM missing", True),
+            ("SELECT 42", False),
+        ]
+        assert sql[0]["error"] == "OperationalError: no such table: missing"
+
+
+def test_store_keeps_only_the_newest_profiles(tmp_path, monkeypatch):
+    """Test that old profiles are pruned and unknown IDs are rejected."""
+    client, store = profiled_app(tmp_path, monkeypatch)
+    headers = {"X-Profile": "1", "X-Admin-Token": "secret"}
+    ids = [client.get("/ping", headers=headers).headers["x-profile-id"] for _ in "abc"]
+
+    assert [p["id"] for p in store.list()] == ids[:0:-1]
+    assert store.get(ids[0]) is None
+    assert store.get("../../etc/passwd") is None
@@ -0,0 +1,105 @@
+"""Tests for read-replica routing with read-your-writes stickiness."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, update
+
+import app.models  # noqa: F401
+from app import db as db_module
+from app.config import settings
+from app.models import Item, User
+
+
+def _primary_with_user(tmp_path, monkeypatch):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    db_module.Base.metadata.create_all(bind=primary)
+    monkeypatch.setattr(db_module, "engine", primary)
+    monkeypatch.setattr(db_module, "read_engine", object())
+    with db_module.SessionLocal(bind=primary) as session:
+        session.add(User(email="a@example.com", name="A", password_hash="x"))
+        session.commit()
+    return primary
+
+
+def _last_write_at(primary):
+    with db_module.SessionLocal(bind=primary) as session:
+        return session.query(User.last_write_at).filter(User.id == 1).scalar()
+
+
+def test_reads_stick_to_primary_after_write(tmp_path, monkeypatch):
+    """
+    Test that a write stamps the user's row, and reads go to the primary for
+    read_your_writes_seconds after it.
+    """
+    primary = _primary_with_user(tmp_path, monkeypatch)
+    assert _last_write_at(primary) is None
+    assert not db_module.reads_use_primary(None)
+
+    session = db_module.SessionLocal(bind=primary)
+    session.info["user_id"] = 1
+    session.add(Item(name="Widget", description="", price=1.0))
+    session.add(Item(name="Gadget", description="", price=2.0))
+    session.commit()
+    session.close()
+
+    # Any worker loading the user sees the write
+    last_write_at = _last_write_at(primary)
+    assert last_write_at is not None
+    assert db_module.reads_use_primary(last_write_at)
+    assert not db_module.reads_use_primary(last_write_at - timedelta(minutes=1))
+
+    monkeypatch.setattr(settings, "read_your_writes_seconds", 0)
+    assert not db_module.reads_use_primary(last_write_at)
+
+
+def test_bulk_writes_stick_and_rollbacks_do_not(tmp_path, monkeypatch):
+    """Test that bulk UPDATEs count as writes and rolled back ones don't."""
+    primary = _primary_with_user(tmp_path, monkeypatch)
+
+    session = db_module.SessionLocal(bind=primary)
+    session.info["user_id"] = 1
+    session.execute(update(Item).values(price=2.0))
+    session.rollback()
+    assert _last_write_at(primary) is None
+
+    session.execute(update(Item).values(price=3.0))
+    session.commit()
+    session.close()
+    assert _last_write_at(primary) >= datetime.utcnow() - timedelta(minutes=1)
+
+
+def test_read_only_sessions_do_not_stick(tmp_path, monkeypatch):
+    primary = _primary_with_user(tmp_path, monkeypatch)
+
+    session = db_module.SessionLocal(bind=primary)
+    session.info["user_id"] = 1
+    session.query(Item).all()
+    session.commit()
+    session.close()
+
+    assert _last_write_at(primary) is None
+
+
+def test_writes_are_not_stamped_without_a_lagging_replica(tmp_path, monkeypatch):
+    """Test that the user's row is only updated when a replica could lag."""
+    primary = _primary_with_user(tmp_path, monkeypatch)
+    statements = []
+    event.listen(
+        primary,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    sqlite_reader = object()
+    monkeypatch.setattr(db_module, "_sqlite_reader", sqlite_reader)
+    # No replica, then read connections on the primary's own SQLite file
+    for read_engine in (primary, sqlite_reader):
+        monkeypatch.setattr(db_module, "read_engine", read_engine)
+        session = db_module.SessionLocal(bind=primary)
+        session.info["user_id"] = 1
+        session.add(Item(name="Widget", description="", price=1.0))
+        session.commit()
+        session.close()
+
+    assert _last_write_at(primary) is None
+    assert not [s for s in statements if s.startswith("UPDATE users")]
@@ -0,0 +1,62 @@
+"""Tests for the per-pack recent-activities ring."""
+
+import json
+from datetime import datetime, timedelta
+
+from app.cache.bus import InMemoryTransport, InvalidationBus
+from app.cache.recent_activities import RecentActivities
+
+START = datetime(2024, 1, 1)
+
+
+def entry(activity_id: int, minutes: int) -> tuple[datetime, int, bytes]:
+    return START + timedelta(minutes=minutes), activity_id, b'{"id":%d}' % activity_id
+
+
+def page(ring: RecentActivities, pack_id: int, limit: int) -> list[int] | None:
+    body = ring.first_page(pack_id, limit)
+    return None if body is None else [a["id"] for a in json.loads(body)]
+
+
+def make_ring(**kwargs) -> tuple[RecentActivities, InvalidationBus]:
+    local_bus = InvalidationBus(InMemoryTransport())
+    local_bus.start()
+    return RecentActivities(invalidation_bus=local_bus, **kwargs), local_bus
+
+
+def test_added_and_backdated_activities_keep_the_window_exact():
+    """Test that the ring always holds the newest activities in order."""
+    ring, local_bus = make_ring(per_pack=3, max_bytes=10_000)
+    assert page(ring, 1, 2) is None
+    ring.fill(1, ring.generation(1), [entry(1, 10), entry(2, 20), entry(3, 30)])
+    assert page(ring, 1, 3) == [3, 2, 1]
+
+    ring.add(1, entry(4, 40))
+    local_bus.publish("pack:1:activities")  # this worker's own write
+    assert page(ring, 1, 3) == [4, 3, 2]
+
+    ring.add(1, entry(5, 25))  # backdated into the window
+    local_bus.publish("pack:1:activities")
+    ring.add(1, entry(6, 0))  # backdated past the window
+    local_bus.publish("pack:1:activities")
+    assert page(ring, 1, 3) == [4, 3, 5]
+    assert page(ring, 1, 4) is None  # more than the ring holds
+
+
+def test_other_writers_and_memory_cap_drop_rings():
+    """Test that remote writes and the memory cap evict packs."""
+    ring, local_bus = make_ring(per_pack=2, max_bytes=600)
+    generation = ring.generation(1)
+    local_bus.publish("pack:1:activities")  # a write while loading
+    ring.fill(1, generation, [entry(1, 1)])
+    assert page(ring, 1, 1) is None
+
+    ring.fill(1, ring.generation(1), [entry(1, 1), entry(2, 2)])
+    ring.fill(2, ring.generation(2), [entry(3, 1), entry(4, 2)])
+    assert page(ring, 1, 1) == [2]
+    ring.fill(3, ring.generation(3), [entry(5, 1), entry(6, 2)])
+    assert page(ring, 2, 1) is None  # least recently used
+    assert page(ring, 1, 1) == [2]
+
+    local_bus.publish("pack:1:activities")  # another worker's write
+    assert page(ring, 1, 1) is None
@@ -0,0 +1,94 @@
+"""Tests for care schedules and the reminder tick."""
+
+from datetime import datetime, timedelta
+
+import app.models  # noqa: F401
+from app.models import ActivityType, CareSchedule, Pack, User
+from app.reminders import engine as reminders
+
+
+def test_tick_works_through_more_than_one_batch(db_session, monkeypatch):
+    """Test that notified schedules don't block newly overdue ones."""
+    session = db_session
+    user = User(email="owner@example.com", password_hash="x", name="Owner")
+    pack = Pack(name="Pack", creator=user)
+    session.add_all([user, pack])
+    session.flush()
+    now = datetime(2024, 1, 10)
+    for minutes in (30, 20, 10):
+        activity_type = ActivityType(
+            name=f"Every {minutes}", icon="pills", color="#000000", pack=pack
+        )
+        session.add(activity_type)
+        session.flush()
+        session.add(
+            CareSchedule(
+                pack_id=pack.id,
+                activity_type_id=activity_type.id,
+                interval_minutes=minutes,
+                next_due_at=now - timedelta(minutes=minutes),
+                created_by=user.id,
+            )
+        )
+    session.commit()
+    fired_for = []
+    monkeypatch.setattr(reminders, "_overdue_hooks", [fired_for.append])
+
+    assert [reminders.tick(session, now, batch_size=2) for _ in range(3)] == [2, 1, 0]
+    assert len({schedule.id for schedule in fired_for}) == 3
+
+
+def test_schedule_endpoints_follow_logged_activities(api, signup):
+    """Test creating, listing and satisfying a schedule through the API."""
+    headers = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=headers).json()[
+        "id"
+    ]
+    api.post(f"/api/v1/packs/{pack_id}/dog", json={"name": "Rex"}, headers=headers)
+    medication = next(
+        t["id"]
+        for t in api.get(
+            f"/api/v1/packs/{pack_id}/activity-types", headers=headers
+        ).json()
+        if t["name"] == "Medication"
+    )
+
+    created = api.post(
+        f"/api/v1/packs/{pack_id}/schedules",
+        json={"activity_type_id": medication, "interval_minutes": 720},
+        headers=headers,
+    )
+    assert created.status_code == 201
+    assert created.json()["is_overdue"]  # never logged: due straight away
+    overdue = api.get(f"/api/v1/packs/{pack_id}/schedules/overdue", headers=headers)
+    assert [s["id"] for s in overdue.json()] == [created.json()["id"]]
+
+    # Timezone-aware times are stored as naive UTC
+    logged = api.post(
+        f"/api/v1/packs/{pack_id}/activities",
+        json={"activity_type_id": medication, "logged_at": "2030-01-01T12:00:00+02:00"},
+        headers=headers,
+    )
+    assert logged.status_code == 201
+    assert logged.json()["logged_at"] == "2030-01-01T10:00:00"
+
+    # A backdated activity doesn't move the schedule back
+    api.post(
+        f"/api/v1/packs/{pack_id}/activities",
+        json={"activity_type_id": medication, "logged_at": "2029-12-31T00:00:00Z"},
+        headers=headers,
+    )
+    (schedule,) = api.get(f"/api/v1/packs/{pack_id}/schedules", headers=headers).json()
+    assert schedule["last_logged_at"] == "2030-01-01T10:00:00"
+    assert schedule["next_due_at"] == "2030-01-01T22:00:00"
+    assert not schedule["is_overdue"]
+    assert (
+        api.get(f"/api/v1/packs/{pack_id}/schedules/overdue", headers=headers).json()
+        == []
+    )
+
+    deleted = api.delete(
+        f"/api/v1/packs/{pack_id}/schedules/{schedule['id']}", headers=headers
+    )
+    assert deleted.status_code == 204
+    assert api.get(f"/api/v1/packs/{pack_id}/schedules", headers=headers).json() == []
@@ -0,0 +1,186 @@
+"""Tests for the consistent-hash shard router."""
+
+from collections import Counter
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, SessionLocal, create_db_engine
+from app.jobs import worker
+from app.jobs.tasks import queue_user_copy
+from app.models import Job, Pack, User
+from app.seed.activity_types import seed_activity_types
+from app.sharding import ShardRouter, shards
+
+
+def make_router(count: int) -> ShardRouter:
+    engines = [create_engine("sqlite://") for _ in range(count)]
+    return ShardRouter(engines, [sessionmaker(bind=e) for e in engines])
+
+
+def test_packs_spread_evenly_over_shards():
+    """Test that pack IDs are spread roughly evenly."""
+    router = make_router(3)
+    counts = Counter(router.shard_for(pack_id) for pack_id in range(1, 30001))
+
+    assert set(counts) == {0, 1, 2}
+    assert all(8000 < count < 12000 for count in counts.values())
+
+
+def test_adding_a_shard_only_moves_packs_onto_it():
+    """Test that a new shard takes packs from the others without reshuffling."""
+    before = make_router(3)
+    after = make_router(4)
+
+    moved = [
+        pack_id
+        for pack_id in range(1, 10001)
+        if before.shard_for(pack_id) != after.shard_for(pack_id)
+    ]
+
+    assert all(after.shard_for(pack_id) == 3 for pack_id in moved)
+    assert 1500 < len(moved) < 3500
+
+
+@pytest.fixture
+def second_shard(api, tmp_path, monkeypatch):
+    """A second, empty shard next to the API's database."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'shard1.db'}")
+    Base.metadata.create_all(bind=engine)
+    shard_sessionmaker = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with shard_sessionmaker() as db:
+        seed_activity_types(db)
+    # Modules hold on to the shards object, so it takes on the state of a
+    # router built for both databases, hash ring included
+    router = ShardRouter(
+        [SessionLocal.kw["bind"], engine], [SessionLocal, shard_sessionmaker]
+    )
+    for name, value in vars(router).items():
+        monkeypatch.setattr(shards, name, value)
+    yield shard_sessionmaker
+    engine.dispose()
+
+
+def shard_copy(shard_sessionmaker, email: str) -> User | None:
+    with shard_sessionmaker() as db:
+        return db.query(User).filter(User.email == email).first()
+
+
+def run_jobs() -> int:
+    ran = 0
+    while (claim := worker.claim_job(0)) is not None:
+        worker.run_job(*claim, 0)
+        ran += 1
+    return ran
+
+
+def test_signup_copies_the_user_to_every_shard(api, signup, second_shard):
+    """Test that a new user is on the other shards before their next request."""
+    signup()
+    assert shard_copy(second_shard, "owner@example.com") is not None
+    with SessionLocal() as db:
+        assert [job.name for job in db.query(Job)] == ["copy_user"]
+    assert run_jobs() == 1  # copying again changes nothing
+
+
+def test_failed_user_copies_are_retried(api, signup, second_shard, monkeypatch):
+    """Test that the queued job copies a user the signup couldn't."""
+
+    def unavailable(user):
+        raise ConnectionError("shard 1 is down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(shards, "copy_user", unavailable)
+        signup()
+        assert shard_copy(second_shard, "owner@example.com") is None
+
+    assert run_jobs() == 1
+    assert shard_copy(second_shard, "owner@example.com") is not None
+
+
+def test_changed_users_are_copied_again(api, signup, second_shard):
+    """Test that copy_user jobs send the primary's current row."""
+    signup()
+    run_jobs()
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.email == "owner@example.com").one()
+        user.name = "Renamed"
+        queue_user_copy(db, user.id)
+        db.commit()
+
+    assert shard_copy(second_shard, "owner@example.com").name == "owner@example.com"
+    assert run_jobs() == 1
+    assert shard_copy(second_shard, "owner@example.com").name == "Renamed"
+
+
+def test_packs_work_across_shards(api, signup, second_shard):
+    """
+    Test creating, using, listing and joining a pack that lives on the
+    second shard, next to one on the primary.
+    """
+    owner = signup()
+    pack_ids = [
+        api.post("/api/v1/packs", json={"name": f"P{i}"}, headers=owner).json()["id"]
+        for i in range(4)
+    ]
+    placement = {pack_id: shards.shard_for(pack_id) for pack_id in pack_ids}
+    assert set(placement.values()) == {0, 1}
+    pack_id = next(p for p in pack_ids if placement[p] == 1)
+
+    with second_shard() as db:
+        assert db.get(Pack, pack_id) is not None
+    with SessionLocal() as db:
+        assert db.get(Pack, pack_id) is None
+
+    # Dog, activity and history all on the pack's shard
+    assert (
+        api.post(
+            f"/api/v1/packs/{pack_id}/dog", json={"name": "Rex"}, headers=owner
+        ).status_code
+        == 201
+    )
+    type_id = api.get(f"/api/v1/packs/{pack_id}/activity-types", headers=owner).json()[
+        0
+    ]["id"]
+    logged = api.post(
+        f"/api/v1/packs/{pack_id}/activities",
+        json={"activity_type_id": type_id, "notes": "walk"},
+        headers=owner,
+    )
+    assert logged.status_code == 201
+    assert logged.json()["user"]["email"] == "owner@example.com"
+    history = api.get(
+        f"/api/v1/packs/{pack_id}/activities", params={"limit": 5}, headers=owner
+    )
+    assert [a["notes"] for a in history.json()] == ["walk"]
+
+    # The pack list merges every shard's page
+    listed = api.get("/api/v1/packs", params={"details": True}, headers=owner).json()
+    assert [p["id"] for p in listed] == sorted(pack_ids)
+    overview = next(p for p in listed if p["id"] == pack_id)
+    assert overview["dog_name"] == "Rex"
+    assert overview["role"] == "owner"
+
+    # An invitation token is found on whichever shard holds it
+    invitation = api.post(
+        f"/api/v1/packs/{pack_id}/invitations",
+        json={"email": "member@example.com"},
+        headers=owner,
+    ).json()
+    member = signup("member@example.com")
+    accepted = api.post(
+        "/api/v1/packs/invitations/accept",
+        json={"token": invitation["token"]},
+        headers=member,
+    )
+    assert accepted.status_code == 200
+    assert accepted.json()["id"] == pack_id
+    assert [p["id"] for p in api.get("/api/v1/packs", headers=member).json()] == [
+        pack_id
+    ]
+    pack = api.get(f"/api/v1/packs/{pack_id}", headers=member).json()
+    assert sorted(m["user"]["email"] for m in pack["members"]) == [
+        "member@example.com",
+        "owner@example.com",
+    ]
@@ -0,0 +1,46 @@
+"""Tests for the slow query log."""
+
+from sqlalchemy import create_engine, text
+
+from app.db import SlowQueryLog, fingerprint, redact, watch_slow_queries
+
+
+def test_fingerprint_ignores_literals_and_in_list_length():
+    """Test that statements differing only in values share a fingerprint."""
+    one = fingerprint("SELECT * FROM dogs WHERE pack_id = 3 AND id IN (?, ?)")
+    other = fingerprint("SELECT *\n FROM dogs WHERE pack_id = 41 AND id IN (?, ?, ?)")
+    assert one == other == "SELECT * FROM dogs WHERE pack_id = ? AND id IN (?+)"
+    assert fingerprint("SELECT name FROM users WHERE email = 'a@b.c'") == (
+        "SELECT name FROM users WHERE email = ?"
+    )
+    assert fingerprint("SELECT %(id_1)s::int") == "SELECT ?::int"
+
+
+def test_redact_keeps_only_harmless_values():
+    """Test that strings are redacted and IDs kept."""
+    assert redact({"id": 7, "email": "a@b.c", "ok": None}) == {
+        "id": 7,
+        "email": "<redacted>",
+        "ok": None,
+    }
+    assert redact((1, "secret")) == [1, "<redacted>"]
+
+
+def test_slow_statements_are_aggregated_with_plans(tmp_path, monkeypatch):
+    """Test that slow statements are counted per fingerprint and explained."""
+    log = SlowQueryLog(max_fingerprints=10, explain_count=1)
+    monkeypatch.setattr("app.db.slow_queries", log)
+    engine = create_engine(f"sqlite:///{tmp_path / 'slow.db'}")
+    watch_slow_queries(engine, threshold_ms=0)
+
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE dogs (id INTEGER PRIMARY KEY, name TEXT)"))
+        for dog_id in (1, 2, 3):
+            conn.execute(text("SELECT name FROM dogs WHERE id = :id"), {"id": dog_id})
+
+    [select] = [e for e in log.report() if e["fingerprint"].startswith("SELECT")]
+    assert select["count"] == 3
+    assert select["last_params"] == [3]
+    assert len(select["plans"]) == 1
+    assert "dogs" in select["plans"][0]["plan"]
+    assert select["routes"] == {None: 3}
@@ -0,0 +1,86 @@
+"""Tests for the tuned SQLite engines."""
+
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401
+from app.config import settings
+from app.db import Base, create_db_engine
+from app.models import Item
+
+
+def test_pragmas_and_lazy_write_transactions(db_engine):
+    """Test that writes are transactional although reads hold no transaction."""
+    engine = db_engine
+    reader = create_db_engine(str(engine.url), readonly=True)
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        assert connection.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+
+    session = Session(bind=engine)
+    assert session.query(Item).count() == 0
+    session.add(Item(name="Leash", description="", price=1.0))
+    session.flush()
+    session.execute(text("UPDATE items SET price = 2.0"))
+    session.rollback()
+    assert session.query(Item).count() == 0
+
+    session.add(Item(name="Leash", description="", price=1.0))
+    session.commit()
+    session.close()
+
+    with Session(bind=reader) as read_session:
+        assert read_session.query(Item.name).scalar() == "Leash"
+        read_session.rollback()
+
+
+def test_concurrent_writers_queue_instead_of_failing(db_engine):
+    """Test that writers in many threads all commit."""
+    engine = db_engine
+    errors = []
+
+    def write(worker: int):
+        try:
+            for i in range(20):
+                with Session(bind=engine) as session:
+                    session.query(Item).count()
+                    session.add(Item(name=f"{worker}-{i}", description="", price=1.0))
+                    session.commit()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    with Session(bind=engine) as session:
+        assert session.query(Item).count() == 160
+
+
+def test_writer_that_cannot_get_the_lock_fails(tmp_path, monkeypatch):
+    """Test that a writer gives up after the busy timeout instead of writing."""
+    # The engine reads the timeout when it's created, so not db_engine
+    monkeypatch.setattr(settings, "sqlite_busy_timeout_ms", 100)
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+    Base.metadata.create_all(bind=engine)
+
+    with Session(bind=engine) as holder, Session(bind=engine) as waiter:
+        holder.add(Item(name="Leash", description="", price=1.0))
+        holder.flush()
+        waiter.add(Item(name="Ball", description="", price=1.0))
+        with pytest.raises(OperationalError, match="database is locked"):
+            waiter.flush()
+        waiter.rollback()
+        holder.commit()
+
+        waiter.add(Item(name="Ball", description="", price=1.0))
+        waiter.commit()
+        assert waiter.query(Item).count() == 2
@@ -0,0 +1,103 @@
+"""Tests for pack roles carried in access tokens."""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.requests import Request
+
+import app.models  # noqa: F401
+from app.auth.deps import get_current_user
+from app.auth.jwt import create_access_token, decode_token
+from app.auth.memberships import (
+    bump_membership_version,
+    decode_memberships,
+    encode_memberships,
+)
+from app.config import settings
+from app.db import SessionLocal
+from app.models import User
+from app.routers import auth
+from app.routers.packs import verify_pack_member
+
+
+def test_memberships_round_trip_compactly():
+    """Test that hundreds of packs encode to a few bytes each."""
+    roles = {
+        pack_id: ("member", "admin", "owner")[pack_id % 3]
+        for pack_id in range(1000, 1300)
+    }
+    roles[10**9] = "owner"
+    encoded = encode_memberships(roles)
+    assert decode_memberships(encoded) == roles
+    assert len(encoded) < 2 * len(roles)
+    assert decode_memberships(encode_memberships({})) == {}
+
+    with pytest.raises(ValueError):
+        decode_memberships(encoded[:-2])
+
+
+def test_pack_roles_are_used_only_while_current(db_session):
+    """Test that token roles skip the database until the version is bumped."""
+    db = db_session
+    user = User(email="owner@example.com", password_hash="x", name="Owner")
+    db.add(user)
+    db.commit()
+    token = create_access_token(user.id, {7: "owner", 9: "member"}, 0)
+
+    def authenticate() -> User:
+        db.expire_all()
+        request = Request({"type": "http", "headers": []})
+        credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+        return asyncio.run(get_current_user(request, credentials, db))
+
+    current = authenticate()
+    assert current.pack_roles == {7: "owner", 9: "member"}
+    # No session needed while the roles decide
+    member = asyncio.run(verify_pack_member(7, current, None, ["owner"]))
+    assert member.role == "owner"
+    with pytest.raises(HTTPException) as denied:
+        asyncio.run(verify_pack_member(9, current, None, ["owner", "admin"]))
+    assert denied.value.status_code == 403
+
+    bump_membership_version(db, user.id)
+    stale = authenticate()
+    assert stale.pack_roles is None
+    # Falls back to the database, where the pack doesn't exist
+    with pytest.raises(HTTPException) as missing:
+        asyncio.run(verify_pack_member(7, stale, db))
+    assert missing.value.status_code == 404
+
+
+def test_login_token_version_is_read_before_its_roles(api, signup, monkeypatch):
+    """
+    Test that a membership change while login loads the roles leaves the
+    token's version behind, even when login has rehashed the password.
+    """
+    headers = signup()
+    pack = api.post("/api/v1/packs", json={"name": "Pack"}, headers=headers).json()
+    user_id = api.get("/api/v1/auth/me", headers=headers).json()["id"]
+    with SessionLocal() as db:
+        version = db.get(User, user_id).membership_version
+    load_memberships = auth.load_memberships
+
+    async def load_then_change(user_id: int) -> dict[int, str]:
+        roles = await load_memberships(user_id)
+        with SessionLocal() as db:
+            bump_membership_version(db, user_id)
+        return roles
+
+    monkeypatch.setattr(auth, "load_memberships", load_then_change)
+    monkeypatch.setattr(settings, "bcrypt_rounds", settings.bcrypt_rounds + 1)
+    response = api.post(
+        "/api/v1/auth/login",
+        json={"email": "owner@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+    token = decode_token(response.json()["access_token"])
+    assert token.mv == version
+    assert decode_memberships(token.pm) == {pack["id"]: "owner"}
+
+    with SessionLocal() as db:
+        assert db.get(User, user_id).membership_version == version + 1
@@ -0,0 +1,281 @@
+"""Tests for webhook delivery against a stub receiver."""
+
+import asyncio
+import json
+from datetime import datetime
+
+import httpcore
+import httpx
+import pytest
+from fastapi import FastAPI, Request, Response
+from sqlalchemy.orm import Session, sessionmaker
+
+import app.models  # noqa: F401
+from app.config import settings
+from app.models import Pack, User, WebhookEvent, WebhookSubscription
+from app.webhooks import destinations
+from app.webhooks import sender as webhook_sender
+from app.webhooks.outbox import record_event
+from app.webhooks.sender import SIGNATURE_HEADER, WebhookSender, verify_signature
+
+
+def stub_receiver(status_code: int = 200) -> tuple[FastAPI, list[dict]]:
+    """A receiver that checks signatures and records what it was sent."""
+    receiver = FastAPI()
+    received = []
+
+    @receiver.post("/hooks/{name}")
+    async def hook(name: str, request: Request):
+        body = await request.body()
+        received.append(
+            {
+                "name": name,
+                "signed": verify_signature(
+                    f"secret-{name}", request.headers[SIGNATURE_HEADER], body
+                ),
+                "events": json.loads(body)["events"],
+            }
+        )
+        return Response(status_code=status_code)
+
+    return receiver, received
+
+
+# Where test hostnames resolve to; anything else is resolved for real
+ADDRESSES = {"stub": ["93.184.216.34"], "intranet": ["93.184.216.34", "10.0.0.5"]}
+real_resolve = destinations._resolve
+
+
+async def fake_resolve(host: str, port: int) -> list[str]:
+    return ADDRESSES.get(host) or await real_resolve(host, port)
+
+
+def setup_outbox(session: Session, monkeypatch, hosts=("stub", "stub")) -> None:
+    monkeypatch.setattr(destinations, "_resolve", fake_resolve)
+    monkeypatch.setattr(
+        webhook_sender.shards, "sessionmakers", [sessionmaker(bind=session.get_bind())]
+    )
+    owner = User(id=1, email="owner@example.com", password_hash="x", name="Owner")
+    session.add_all([owner, Pack(id=1, name="Pack", creator=owner)])
+    session.flush()
+    for host, name, event_types in zip(hosts, ("a", "b"), (None, ["dog.updated"])):
+        session.add(
+            WebhookSubscription(
+                pack_id=1,
+                url=f"http://{host}/hooks/{name}",
+                secret=f"secret-{name}",
+                event_types=event_types,
+                created_by=1,
+            )
+        )
+    session.commit()
+
+
+def deliver(receiver: FastAPI) -> int:
+    async def run():
+        sender = WebhookSender(1, transport=httpx.ASGITransport(app=receiver))
+        try:
+            return await sender.deliver_due()
+        finally:
+            await sender.stop()
+
+    return asyncio.run(run())
+
+
+def test_events_are_batched_signed_and_filtered(db_session, monkeypatch):
+    """Test that each subscription gets its matching events in signed batches."""
+    session = db_session
+    setup_outbox(session, monkeypatch)
+    monkeypatch.setattr(settings, "webhook_batch_size", 2)
+    for i in range(3):
+        record_event(session, 1, "activity.logged", {"id": i})
+    record_event(session, 1, "dog.updated", {"name": "Rex"})
+    session.commit()
+
+    receiver, received = stub_receiver()
+    assert deliver(receiver) == 5
+
+    assert all(call["signed"] for call in received)
+    batches = sorted(
+        (call["name"], [e["type"] for e in call["events"]]) for call in received
+    )
+    assert batches == [
+        ("a", ["activity.logged", "activity.logged"]),
+        ("a", ["activity.logged", "dog.updated"]),
+        ("b", ["dog.updated"]),
+    ]
+    assert {e.status for e in session.query(WebhookEvent)} == {"delivered"}
+    assert deliver(receiver) == 0
+
+
+def test_failed_deliveries_are_retried_later(db_session, monkeypatch):
+    """Test that a failing endpoint gets its events back off and retried."""
+    session = db_session
+    setup_outbox(session, monkeypatch)
+    record_event(session, 1, "dog.updated", {"name": "Rex"})
+    session.commit()
+
+    receiver, received = stub_receiver(status_code=503)
+    assert deliver(receiver) == 0
+    assert len(received) == 2
+
+    session.expire_all()
+    for event in session.query(WebhookEvent):
+        assert event.status == "pending"
+        assert event.attempts == 1
+        assert event.last_error == "HTTP 503"
+        assert event.next_attempt_at > datetime.utcnow()
+    assert deliver(receiver) == 0
+    assert len(received) == 2  # not due again yet
+
+
+class RecordingStream(httpcore.AsyncMockStream):
+    """A connection that answers 204 and records what was written to it."""
+
+    def __init__(self, written: list[bytes]):
+        super().__init__([b"HTTP/1.1 204 No Content\r\n\r\n"])
+        self.written = written
+
+    async def write(self, buffer: bytes, timeout: float | None = None) -> None:
+        self.written.append(buffer)
+
+
+class RecordingBackend(httpcore.AsyncMockBackend):
+    """A network backend that records which addresses were dialed."""
+
+    def __init__(self):
+        super().__init__([])
+        self.dialed: list[tuple[str, int]] = []
+        self.written: list[bytes] = []
+
+    async def connect_tcp(self, host, port, *args, **kwargs):
+        self.dialed.append((host, port))
+        return RecordingStream(self.written)
+
+
+def deliver_through(backend: RecordingBackend) -> int:
+    """Deliver with the production transport over a recording backend."""
+
+    async def run():
+        transport = destinations.PublicHTTPTransport(network_backend=backend)
+        sender = WebhookSender(1, transport=transport)
+        try:
+            return await sender.deliver_due()
+        finally:
+            await sender.stop()
+
+    return asyncio.run(run())
+
+
+def test_non_public_destinations_are_not_dialed(db_session, monkeypatch):
+    """Test that hosts resolving to private or loopback addresses are skipped."""
+    session = db_session
+    setup_outbox(session, monkeypatch, hosts=("intranet", "127.0.0.1"))
+    record_event(session, 1, "dog.updated", {"name": "Rex"})
+    session.commit()
+
+    backend = RecordingBackend()
+    assert deliver_through(backend) == 0
+    assert backend.dialed == []
+
+    session.expire_all()
+    errors = sorted(event.last_error for event in session.query(WebhookEvent))
+    assert errors == [
+        "ConnectError: Webhook host 127.0.0.1 is not a public address",
+        "ConnectError: Webhook host intranet is not a public address",
+    ]
+
+
+def test_delivery_dials_the_address_it_vetted(db_session, monkeypatch):
+    """
+    Test that the connection goes to the address that was checked, keeping
+    the host name in the request, and that a host rebound to loopback after
+    passing the subscription check is not reached.
+    """
+    session = db_session
+    setup_outbox(session, monkeypatch, hosts=("hooks.example",) * 2)
+    address = {"hooks.example": "93.184.216.34"}
+
+    async def rebinding_resolve(host: str, port: int) -> list[str]:
+        return [address[host]]
+
+    monkeypatch.setattr(destinations, "_resolve", rebinding_resolve)
+    asyncio.run(destinations.check_destination("http://hooks.example/hooks/a"))
+
+    record_event(session, 1, "dog.updated", {"name": "Rex"})
+    session.commit()
+    backend = RecordingBackend()
+    assert deliver_through(backend) == 2
+    assert set(backend.dialed) == {("93.184.216.34", 80)}
+    assert b"Host: hooks.example\r\n" in b"".join(backend.written)
+
+    # The name now answers with loopback
+    address["hooks.example"] = "127.0.0.1"
+    record_event(session, 1, "dog.updated", {"name": "Max"})
+    session.commit()
+    backend = RecordingBackend()
+    assert deliver_through(backend) == 0
+    assert backend.dialed == []
+
+
+def test_second_lookup_is_the_one_dialed(monkeypatch):
+    """
+    Test that a resolver answering differently on the second lookup can't
+    slip an internal address past the first.
+    """
+    answers = [["93.184.216.34"], ["169.254.169.254"]]
+
+    async def resolve(host: str, port: int) -> list[str]:
+        return answers.pop(0)
+
+    monkeypatch.setattr(destinations, "_resolve", resolve)
+    backend = RecordingBackend()
+    network = destinations.PublicNetworkBackend(backend)
+
+    asyncio.run(destinations.check_destination("https://hooks.example/"))
+    with pytest.raises(httpcore.ConnectError, match="not a public address"):
+        asyncio.run(network.connect_tcp("hooks.example", 443))
+    assert backend.dialed == []
+
+
+def test_is_public_address():
+    assert destinations.is_public_address("93.184.216.34")
+    assert destinations.is_public_address("2606:2800:220:1::1")
+    for address in (
+        "127.0.0.1",
+        "10.1.2.3",
+        "172.16.0.1",
+        "192.168.1.1",
+        "169.254.169.254",
+        "100.64.0.1",
+        "0.0.0.0",
+        "224.0.0.1",
+        "::1",
+        "fe80::1%eth0",
+        "fd00::1",
+        "::ffff:127.0.0.1",
+    ):
+        assert not destinations.is_public_address(address), address
+
+
+def test_subscriptions_to_non_public_hosts_are_rejected(api, signup):
+    """Test that creating a webhook for an internal address is a 400."""
+    headers = signup()
+    pack_id = api.post("/api/v1/packs", json={"name": "P"}, headers=headers).json()[
+        "id"
+    ]
+    url = f"/api/v1/packs/{pack_id}/webhooks"
+
+    for target in (
+        "http://127.0.0.1:8000/admin",
+        "http://[::1]/",
+        "http://169.254.169.254/latest/meta-data/",
+        "https://10.0.0.1/hook",
+        "http://[::ffff:192.168.0.1]/",
+    ):
+        response = api.post(url, json={"url": target}, headers=headers)
+        assert response.status_code == 400, target
+        assert "not a public address" in response.json()["detail"]
+
+    created = api.post(url, json={"url": "https://93.184.216.34/hook"}, headers=headers)
+    assert created.status_code == 201